@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+ASSA-GDO Privilege-Aware Attack Graph
+=====================================
+
+Grafo di attacco orientato i cui stati sono coppie (nodo, livello di
+privilegio), costruito dai Node.privileges e da probabilità di
+propagazione direzionali.
+
+Modello:
+- i livelli di privilegio di un nodo sono ordinati per valore crescente
+  (es. device 0.1 < user 0.3 < admin 0.9); un nodo senza privilegi ha il
+  solo livello implicito 'none' con valore 1.0;
+- chi entra in un nodo per movimento laterale ottiene il livello più basso;
+- l'escalation dal livello k al livello k+1 dello stesso nodo ha
+  probabilità pari alla vulnerabilità normalizzata V (CVSS / 10);
+- il movimento laterale u -> v dallo stato (u, livello) ha probabilità
+  propagation_prob(u -> v) * valore del livello: con privilegi più alti
+  su u l'attaccante si muove più facilmente. Un nx.DiGraph fornisce
+  probabilità distinte per direzione; un nx.Graph è trattato come
+  simmetrico.
+
+Lo stato è rappresentato in array (stati ordinati per nodo e livello) e
+gli archi in una matrice CSR orientata, così che ASSA e percorsi critici
+restino vettoriali anche se il numero di stati cresce con i livelli.
+
+Author: GIST Framework Research
+License: MIT
+Version: 1.0
+"""
+
+import numpy as np
+import networkx as nx
+from scipy import sparse
+from typing import Dict, Iterator, List, Optional, Tuple
+import itertools
+import logging
+
+from assa_sparse import (CRITICAL_TYPES, DEFAULT_PROPAGATION_PROB, EXPOSURE_THRESHOLD,
+                         iter_probable_paths)
+
+logger = logging.getLogger(__name__)
+
+IMPLICIT_LEVEL = 'none'
+
+
+class PrivilegeAttackGraph:
+    """
+    Grafo prodotto (nodo, privilegio) per ASSA e percorsi critici orientati.
+    """
+
+    def __init__(self,
+                 node_ids: List[str],
+                 types: np.ndarray,
+                 cvss: np.ndarray,
+                 exposure: np.ndarray,
+                 privileges: List[Dict[str, float]],
+                 arc_sources: np.ndarray,
+                 arc_targets: np.ndarray,
+                 arc_probs: np.ndarray):
+        """
+        Costruisce il grafo prodotto da array di nodi e archi orientati.
+
+        Args:
+            node_ids: Identificativi dei nodi
+            types: Tipo per nodo
+            cvss: CVSS score per nodo
+            exposure: Esposizione (0-1) per nodo
+            privileges: Livello -> valore per nodo
+            arc_sources: Nodo di origine di ogni arco orientato
+            arc_targets: Nodo di destinazione di ogni arco orientato
+            arc_probs: Probabilità di propagazione di ogni arco orientato
+        """
+        n = len(node_ids)
+        self.node_ids = list(node_ids)
+        self.types = np.asarray(types, dtype=object)
+        self.cvss = np.asarray(cvss, dtype=float)
+        self.exposure = np.asarray(exposure, dtype=float)
+        self.vulnerability = np.minimum(self.cvss / 10.0, 1.0)
+
+        # Stati ordinati per nodo e valore del livello
+        levels = [sorted(p.items(), key=lambda item: item[1]) if p else [(IMPLICIT_LEVEL, 1.0)]
+                  for p in privileges]
+        counts = np.array([len(node_levels) for node_levels in levels], dtype=np.int64)
+        self.state_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.state_indptr[1:])
+        self.state_node = np.repeat(np.arange(n), counts)
+        self.state_level = np.array([name for node_levels in levels for name, _ in node_levels],
+                                    dtype=object)
+        self.state_weight = np.array([value for node_levels in levels for _, value in node_levels],
+                                     dtype=float)
+        n_states = len(self.state_node)
+
+        # Escalation: stato k -> stato k+1 dello stesso nodo
+        escalation_from = np.flatnonzero(self.state_node[:-1] == self.state_node[1:])
+        escalation_to = escalation_from + 1
+        escalation_prob = self.vulnerability[self.state_node[escalation_from]]
+
+        # Movimento laterale: ogni stato di u -> stato di ingresso di v
+        arc_sources = np.asarray(arc_sources, dtype=np.int64)
+        arc_targets = np.asarray(arc_targets, dtype=np.int64)
+        arc_probs = np.asarray(arc_probs, dtype=float)
+        per_arc = counts[arc_sources]
+        lateral_arc = np.repeat(np.arange(len(arc_sources)), per_arc)
+        offsets = np.arange(per_arc.sum()) - np.repeat(np.cumsum(per_arc) - per_arc, per_arc)
+        lateral_from = self.state_indptr[arc_sources][lateral_arc] + offsets
+        lateral_to = self.state_indptr[arc_targets][lateral_arc]
+        lateral_prob = arc_probs[lateral_arc] * self.state_weight[lateral_from]
+
+        rows = np.concatenate([escalation_from, lateral_from])
+        cols = np.concatenate([escalation_to, lateral_to])
+        probs = np.concatenate([escalation_prob, lateral_prob])
+        self.adjacency = sparse.csr_matrix((probs, (rows, cols)), shape=(n_states, n_states))
+        self.adjacency.sort_indices()
+
+    @property
+    def n_states(self) -> int:
+        return len(self.state_node)
+
+    @classmethod
+    def from_networkx(cls, G: nx.Graph,
+                      default_prob: float = DEFAULT_PROPAGATION_PROB) -> 'PrivilegeAttackGraph':
+        """
+        Costruisce il grafo prodotto da un grafo networkx con nodi Node.
+
+        Args:
+            G: nx.DiGraph (archi orientati) o nx.Graph (archi simmetrici)
+            default_prob: Probabilità degli archi senza propagation_prob
+        """
+        node_ids = list(G.nodes())
+        data = [G.nodes[n]['data'] for n in node_ids]
+        position = {node_id: i for i, node_id in enumerate(node_ids)}
+
+        arcs = [(position[u], position[v], p)
+                for u, v, p in G.edges(data='propagation_prob', default=default_prob)]
+        if not G.is_directed():
+            arcs += [(v, u, p) for u, v, p in arcs if u != v]
+        arcs = np.array(arcs, dtype=float).reshape(-1, 3)
+
+        return cls(
+            node_ids=node_ids,
+            types=np.array([node.type for node in data], dtype=object),
+            cvss=np.array([node.cvss_score for node in data], dtype=float),
+            exposure=np.array([node.exposure for node in data], dtype=float),
+            privileges=[dict(node.privileges) for node in data],
+            arc_sources=arcs[:, 0].astype(np.int64),
+            arc_targets=arcs[:, 1].astype(np.int64),
+            arc_probs=arcs[:, 2]
+        )
+
+    @classmethod
+    def from_compact(cls, infrastructure) -> 'PrivilegeAttackGraph':
+        """
+        Costruisce il grafo prodotto da una CompactInfrastructure (assa_graph).
+
+        Gli elementi dell'adiacenza CSR sono usati come archi orientati.
+        """
+        n = infrastructure.n_nodes
+        rows = np.repeat(np.arange(n), np.diff(infrastructure.indptr))
+        return cls(
+            node_ids=infrastructure.node_ids.tolist(),
+            types=infrastructure.types.astype(object),
+            cvss=infrastructure.cvss,
+            exposure=infrastructure.exposure,
+            privileges=[infrastructure.privileges(i) for i in range(n)],
+            arc_sources=rows,
+            arc_targets=infrastructure.indices,
+            arc_probs=infrastructure.probs
+        )
+
+    def state_label(self, state: int) -> Tuple[str, str]:
+        """Coppia (nodo, livello) di uno stato."""
+        return self.node_ids[self.state_node[state]], self.state_level[state]
+
+    def entry_states(self, nodes: np.ndarray) -> np.ndarray:
+        """Stato di ingresso (livello più basso) dei nodi."""
+        return self.state_indptr[nodes]
+
+    def top_states(self, nodes: np.ndarray) -> np.ndarray:
+        """Stato di privilegio massimo dei nodi."""
+        return self.state_indptr[np.asarray(nodes) + 1] - 1
+
+    # ------------------------------------------------------------------
+    # ASSA
+    # ------------------------------------------------------------------
+
+    def state_scores(self, alpha: float = 0.73, org_factor: float = 1.0) -> np.ndarray:
+        """
+        Score ASSA per stato.
+
+        V * E del nodo, pesato dal valore del livello e amplificato dagli
+        archi uscenti dello stato: prodotto di (1 + alpha * p).
+        """
+        adjacency = self.adjacency
+        log_terms = sparse.csr_matrix(
+            (np.log1p(alpha * adjacency.data), adjacency.indices, adjacency.indptr),
+            shape=adjacency.shape
+        )
+        propagation = np.exp(np.asarray(log_terms.sum(axis=1)).ravel())
+        base = (self.vulnerability * self.exposure)[self.state_node] * self.state_weight
+        return base * propagation * org_factor
+
+    def calculate_assa(self, alpha: float = 0.73, org_factor: float = 1.0) -> Tuple[float, Dict]:
+        """
+        ASSA orientato: per nodo lo score dello stato peggiore.
+
+        Returns:
+            total_assa: Score totale
+            component_scores: Dictionary con score per componente
+        """
+        scores = self.state_scores(alpha, org_factor)
+        node_scores = np.maximum.reduceat(scores, self.state_indptr[:-1])
+        return float(node_scores.sum()), dict(zip(self.node_ids, node_scores.tolist()))
+
+    # ------------------------------------------------------------------
+    # Percorsi critici
+    # ------------------------------------------------------------------
+
+    def iter_critical_paths(self, threshold: float = 0.05, max_hops: int = 8) -> Iterator[Dict]:
+        """
+        Percorsi dall'ingresso dei nodi esposti al privilegio massimo sui
+        nodi critici, dal più probabile.
+
+        Args:
+            threshold: Soglia di probabilità del percorso (più bassa dello 0.7
+                non orientato: i pesi dei livelli e le escalation riducono
+                la probabilità dei percorsi)
+            max_hops: Numero massimo di transizioni (laterali ed escalation)
+
+        Yields:
+            Dictionary con path (coppie nodo, livello), nodes, probability,
+            escalations e risk_score
+        """
+        exposed = np.flatnonzero(self.exposure > EXPOSURE_THRESHOLD)
+        critical = np.flatnonzero(np.isin(self.types, CRITICAL_TYPES))
+        is_target = np.zeros(self.n_states, dtype=bool)
+        is_target[self.top_states(critical)] = True
+        risk = ((self.vulnerability * self.exposure)[self.state_node] * self.state_weight).tolist()
+
+        for path, prob in iter_probable_paths(self.adjacency, self.entry_states(exposed),
+                                              is_target, threshold, max_hops):
+            nodes = [self.node_ids[self.state_node[s]] for s in path]
+            total_risk = 0
+            for s in path:
+                total_risk += risk[s]
+            yield {
+                'path': [self.state_label(s) for s in path],
+                'nodes': [node for node, _ in itertools.groupby(nodes)],
+                'probability': prob,
+                'escalations': len(path) - len(set(nodes)),
+                'risk_score': total_risk / len(path)
+            }
+
+    def critical_paths(self, threshold: float = 0.05, max_hops: int = 8,
+                       k: Optional[int] = None) -> List[Dict]:
+        """Percorsi critici ordinati per risk_score decrescente."""
+        paths = itertools.islice(self.iter_critical_paths(threshold, max_hops), k)
+        return sorted(paths, key=lambda x: x['risk_score'], reverse=True)
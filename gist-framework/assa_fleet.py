@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+ASSA-GDO Fleet Evaluation
+=========================
+
+Valutazione ASSA di una flotta di organizzazioni, ciascuna con il proprio
+grafo infrastrutturale compatto (.npz di assa_graph) e org_factor.
+
+Ogni organizzazione è valutata in un processo del pool: il worker apre il
+grafo con CompactInfrastructure.load(mmap=True), così che gli array siano
+pagine del file condivise tra processi tramite la page cache, senza copie
+né serializzazione dal processo principale. Per ogni organizzazione sono
+calcolati ASSA, percorsi critici e portafoglio di mitigazioni (CELF sui
+nodi con score più alto).
+
+Ogni risultato è aggiunto subito a un checkpoint NDJSON accanto al report:
+un'esecuzione interrotta riprende saltando le organizzazioni già valutate.
+La prima riga del checkpoint registra le opzioni di valutazione, e la
+ripresa è rifiutata se le opzioni correnti sono diverse.
+Al termine il report consolidato (una riga per organizzazione) è scritto
+in Parquet, o in CSV se il nome del file lo richiede.
+
+Author: GIST Framework Research
+License: MIT
+Version: 1.0
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import json
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+ManifestInput = Union[str, pd.DataFrame, List[Dict]]
+
+CHECKPOINT_SUFFIX = '.progress.jsonl'
+
+
+def load_manifest(source: ManifestInput) -> pd.DataFrame:
+    """
+    Elenco delle organizzazioni da valutare.
+
+    Args:
+        source: Directory di file .npz (organizzazione = nome del file,
+            org_factor 1.0), file manifest CSV/JSON/JSONL/Parquet, DataFrame
+            o lista di dizionari con colonne path, organization (opzionale)
+            e org_factor (opzionale). I path relativi di un manifest su file
+            sono risolti rispetto alla sua directory.
+
+    Returns:
+        DataFrame con colonne organization, path, org_factor
+
+    Raises:
+        ValueError: Se manca la colonna path o ci sono organizzazioni duplicate
+    """
+    base = None
+    if isinstance(source, str) and os.path.isdir(source):
+        files = sorted(name for name in os.listdir(source) if name.endswith('.npz'))
+        manifest = pd.DataFrame({'path': [os.path.join(source, name) for name in files]})
+    elif isinstance(source, str):
+        base = os.path.dirname(os.path.abspath(source))
+        if source.endswith(('.parquet', '.pq')):
+            manifest = pd.read_parquet(source)
+        elif source.endswith('.jsonl'):
+            manifest = pd.read_json(source, lines=True)
+        elif source.endswith('.json'):
+            manifest = pd.read_json(source)
+        else:
+            manifest = pd.read_csv(source)
+    else:
+        manifest = pd.DataFrame(source)
+
+    if 'path' not in manifest.columns:
+        raise ValueError("Il manifest deve contenere la colonna 'path'")
+    manifest = manifest.copy()
+    paths = manifest['path'].astype(str)
+    if base is not None:
+        paths = paths.map(lambda p: p if os.path.isabs(p) else os.path.join(base, p))
+    manifest['path'] = paths
+    if 'organization' not in manifest.columns:
+        manifest['organization'] = paths.map(lambda p: os.path.splitext(os.path.basename(p))[0])
+    manifest['organization'] = manifest['organization'].astype(str)
+    if 'org_factor' not in manifest.columns:
+        manifest['org_factor'] = 1.0
+    manifest['org_factor'] = manifest['org_factor'].fillna(1.0).astype(float)
+
+    duplicated = manifest['organization'][manifest['organization'].duplicated()].unique()
+    if len(duplicated):
+        raise ValueError(f"Organizzazioni duplicate nel manifest: {list(duplicated[:5])}")
+    return manifest[['organization', 'path', 'org_factor']].reset_index(drop=True)
+
+
+def _evaluate_organization(task: Dict) -> Dict:
+    """Valuta una organizzazione (eseguita nei worker)."""
+    from assa_gdo_calculator import ASSA_GDO
+    from assa_graph import CompactInfrastructure
+    from assa_mitigation import MitigationOptimizer
+    from assa_sparse import SparseASSA
+
+    start = time.perf_counter()
+    row = {'organization': task['organization'], 'path': task['path'],
+           'org_factor': task['org_factor']}
+    try:
+        infrastructure = CompactInfrastructure.load(task['path'], mmap=True)
+        engine = SparseASSA(infrastructure, org_factor=task['org_factor'], alpha=ASSA_GDO.ALPHA)
+
+        scores = engine.node_scores()
+        total = float(scores.sum())
+        top = int(np.argmax(scores)) if len(scores) else None
+
+        paths = engine.critical_paths(task['path_threshold'], task['max_hops'], task['max_paths'])
+        worst = max(paths, key=lambda x: x['probability']) if paths else None
+
+        mitigations = {'mitigations': [], 'total_cost': 0.0, 'total_risk_reduction': 0.0}
+        if len(scores) and task['budget'] > 0:
+            k = min(task['mitigation_candidates'], len(scores))
+            candidates = np.argpartition(-scores, k - 1)[:k]
+            optimizer = MitigationOptimizer(
+                candidates=[str(infrastructure.node_ids[i]) for i in candidates],
+                infrastructure=infrastructure, org_factor=task['org_factor']
+            )
+            mitigations = optimizer.optimize(task['budget'], mode='celf')
+
+        row.update({
+            'status': 'ok',
+            'error': None,
+            'n_nodes': infrastructure.n_nodes,
+            'n_edges': infrastructure.n_edges,
+            'assa_total': total,
+            'assa_mean': total / len(scores) if len(scores) else 0.0,
+            'top_node': str(infrastructure.node_ids[top]) if top is not None else None,
+            'top_node_score': float(scores[top]) if top is not None else None,
+            'critical_paths': len(paths),
+            'top_path': ' -> '.join(worst['path']) if worst else None,
+            'top_path_probability': worst['probability'] if worst else None,
+            'mitigation_count': len(mitigations['mitigations']),
+            'mitigation_cost': float(mitigations['total_cost']),
+            'mitigation_risk_reduction': float(mitigations['total_risk_reduction']),
+            'mitigation_nodes': ';'.join(m['node'] for m in mitigations['mitigations']),
+        })
+    except Exception as e:
+        row.update({'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+    row['elapsed_seconds'] = round(time.perf_counter() - start, 3)
+    return row
+
+
+def _read_checkpoint(checkpoint: str) -> Tuple[Optional[Dict], Dict[str, Dict]]:
+    """
+    Opzioni e risultati già registrati; una riga finale troncata è ignorata.
+
+    Returns:
+        Opzioni di valutazione del checkpoint (None se assenti) e
+        risultati per organizzazione
+    """
+    options, done = None, {}
+    if not os.path.exists(checkpoint):
+        return options, done
+    with open(checkpoint) as handle:
+        for line in handle:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Riga del checkpoint incompleta ignorata")
+                continue
+            if 'checkpoint_options' in row:
+                options = row['checkpoint_options']
+                continue
+            done[row['organization']] = row
+    return options, done
+
+
+class FleetEvaluator:
+    """
+    Valutazione ASSA parallela di una flotta di organizzazioni con ripresa.
+    """
+
+    def __init__(self,
+                 manifest: ManifestInput,
+                 budget: float = 100000,
+                 path_threshold: float = 0.7,
+                 max_hops: int = 5,
+                 max_paths: Optional[int] = 100,
+                 mitigation_candidates: int = 200):
+        """
+        Inizializza la valutazione.
+
+        Args:
+            manifest: Directory di .npz o manifest (vedi load_manifest)
+            budget: Budget di mitigazione per organizzazione (0 = nessuna)
+            path_threshold: Soglia di probabilità dei percorsi critici
+            max_hops: Lunghezza massima dei percorsi critici
+            max_paths: Percorsi più probabili considerati per organizzazione
+            mitigation_candidates: Nodi con score più alto candidati alla mitigazione
+        """
+        self.manifest = load_manifest(manifest)
+        self.options = {
+            'budget': budget,
+            'path_threshold': path_threshold,
+            'max_hops': max_hops,
+            'max_paths': max_paths,
+            'mitigation_candidates': mitigation_candidates,
+        }
+
+    def run(self,
+            output_path: str,
+            n_jobs: Optional[int] = 1,
+            resume: bool = True,
+            progress: Optional[Callable[[Dict], None]] = None,
+            log_every: int = 10,
+            keep_checkpoint: bool = False) -> pd.DataFrame:
+        """
+        Valuta la flotta e scrive il report consolidato.
+
+        Args:
+            output_path: Report .parquet (o .csv)
+            n_jobs: Processi (1 = nel processo corrente, None = tutti i core)
+            resume: Se True salta le organizzazioni già valutate con successo
+                nel checkpoint di un'esecuzione precedente
+            progress: Callback chiamata dopo ogni organizzazione con
+                avanzamento e throughput
+            log_every: Frequenza (in organizzazioni) dei messaggi di avanzamento
+            keep_checkpoint: Se False il checkpoint è rimosso a report scritto
+
+        Returns:
+            Report consolidato, nell'ordine del manifest
+
+        Raises:
+            ValueError: Se il checkpoint da riprendere è stato prodotto con
+                opzioni di valutazione diverse
+        """
+        checkpoint = output_path + CHECKPOINT_SUFFIX
+        options = json.loads(json.dumps(self.options))
+        done = {}
+        if resume:
+            saved_options, done = _read_checkpoint(checkpoint)
+            if (saved_options or done) and saved_options != options:
+                raise ValueError(
+                    f"Checkpoint {checkpoint} prodotto con opzioni diverse "
+                    f"({saved_options} invece di {options}): usare resume=False"
+                )
+        elif os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        completed = {org for org, row in done.items() if row.get('status') == 'ok'}
+
+        tasks = [
+            dict(self.options, **record)
+            for record in self.manifest.to_dict('records')
+            if record['organization'] not in completed
+        ]
+        if completed:
+            logger.info(f"Ripresa: {len(completed)} organizzazioni già valutate, {len(tasks)} da valutare")
+
+        tracker = _ProgressTracker(len(tasks), progress, log_every)
+        with open(checkpoint, 'a+') as handle:
+            # Una riga troncata da un'interruzione non deve assorbire la successiva
+            if handle.tell() > 0:
+                handle.seek(handle.tell() - 1)
+                if handle.read(1) != '\n':
+                    handle.write('\n')
+            else:
+                handle.write(json.dumps({'checkpoint_options': options}) + '\n')
+
+            def record(row: Dict) -> None:
+                handle.write(json.dumps(row, default=str) + '\n')
+                handle.flush()
+                done[row['organization']] = row
+                tracker.update(row)
+
+            if n_jobs == 1:
+                for task in tasks:
+                    record(_evaluate_organization(task))
+            else:
+                workers = n_jobs or os.cpu_count() or 1
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    pending = set()
+                    for task in tasks:
+                        pending.add(pool.submit(_evaluate_organization, task))
+                        # Finestra limitata: i risultati sono registrati appena pronti
+                        if len(pending) >= 2 * workers:
+                            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in finished:
+                                record(future.result())
+                    for future in wait(pending).done:
+                        record(future.result())
+
+        order = {org: i for i, org in enumerate(self.manifest['organization'])}
+        rows = sorted((row for org, row in done.items() if org in order),
+                      key=lambda row: order[row['organization']])
+        report = pd.DataFrame(rows)
+        if output_path.endswith('.csv'):
+            report.to_csv(output_path, index=False)
+        else:
+            report.to_parquet(output_path, index=False)
+        if not keep_checkpoint:
+            os.remove(checkpoint)
+
+        failed = int((report['status'] != 'ok').sum()) if len(report) else 0
+        logger.info(f"Flotta valutata: {len(report)} organizzazioni ({failed} errori) -> {output_path}")
+        return report
+
+
+class _ProgressTracker:
+    """Avanzamento e throughput (organizzazioni e nodi al secondo)."""
+
+    def __init__(self, total: int, callback: Optional[Callable[[Dict], None]], log_every: int):
+        self.total = total
+        self.callback = callback
+        self.log_every = max(1, log_every)
+        self.done = 0
+        self.failed = 0
+        self.nodes = 0
+        self.start = time.perf_counter()
+
+    def update(self, row: Dict) -> None:
+        self.done += 1
+        self.failed += row.get('status') != 'ok'
+        self.nodes += row.get('n_nodes') or 0
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        status = {
+            'done': self.done,
+            'total': self.total,
+            'failed': self.failed,
+            'elapsed_seconds': round(elapsed, 2),
+            'organizations_per_second': round(rate, 3),
+            'nodes_per_second': round(self.nodes / elapsed, 1) if elapsed > 0 else 0.0,
+            'eta_seconds': round((self.total - self.done) / rate, 1) if rate > 0 else None,
+        }
+        if self.done % self.log_every == 0 or self.done == self.total:
+            logger.info(
+                f"{self.done}/{self.total} organizzazioni, {status['organizations_per_second']}/s, "
+                f"{status['nodes_per_second']:,.0f} nodi/s, ETA {status['eta_seconds']}s"
+            )
+        if self.callback is not None:
+            self.callback(status)
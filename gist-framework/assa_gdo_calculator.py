@@ -35,6 +35,38 @@ class ASSA_GDO:
     tecniche e fattori organizzativi
     """
 
+    # Costo base della mitigazione per tipo di nodo (euro)
+    MITIGATION_BASE_COSTS = {
+        'pos': 500,       # Patch/update POS
+        'server': 5000,   # Harden server
+        'network': 3000,  # Segment network
+        'iot': 200,       # Update firmware
+        'database': 8000, # Encrypt and secure DB
+    }
+    DEFAULT_MITIGATION_COST = 1000
+
+    # Efficacia della mitigazione per tipo di nodo (0-1)
+    MITIGATION_EFFECTIVENESS = {
+        'pos': 0.70,      # Patch generalmente efficaci
+        'server': 0.80,   # Hardening molto efficace
+        'network': 0.85,  # Segmentazione molto efficace
+        'iot': 0.60,      # Aggiornamenti IoT limitati
+        'database': 0.90  # Encryption molto efficace
+    }
+    DEFAULT_MITIGATION_EFFECTIVENESS = 0.70
+
+    # Raccomandazione della mitigazione per tipo di nodo
+    MITIGATION_RECOMMENDATIONS = {
+        'pos': "Aggiornare firmware POS, implementare network segmentation",
+        'server': "Hardening OS, patch management automatico, monitoring avanzato",
+        'network': "Microsegmentazione, Zero Trust architecture, monitoring traffico",
+        'iot': "Aggiornamento firmware, isolamento VLAN, monitoring anomalie",
+        'database': "Crittografia at-rest/in-transit, access control, audit logging"
+    }
+    DEFAULT_MITIGATION_RECOMMENDATION = "Revisione configurazione sicurezza"
+
+    ALPHA = 0.73  # Fattore di amplificazione calibrato
+
     def __init__(self, infrastructure: nx.Graph, org_factor: float = 1.0):
         """
         Inizializza il calcolatore ASSA-GDO
@@ -45,7 +77,7 @@ class ASSA_GDO:
         """
         self.G = infrastructure
         self.org_factor = org_factor
-        self.alpha = 0.73  # Fattore di amplificazione calibrato
+        self.alpha = self.ALPHA
 
     def calculate_assa(self) -> Tuple[float, Dict]:
         """
@@ -85,51 +117,98 @@ class ASSA_GDO:
 
         return total_assa, component_scores
 
+    def sparse_engine(self):
+        """
+        Compila il grafo nel motore vettoriale CSR (assa_sparse.SparseASSA)
+
+        Da preferire a calculate_assa per grafi con milioni di nodi;
+        i risultati coincidono.
+        """
+        from assa_sparse import SparseASSA
+        return SparseASSA(self.G, org_factor=self.org_factor, alpha=self.alpha)
+
+    def service_engine(self, service_probs: Optional[Dict[str, float]] = None,
+                       max_pairwise: int = 8):
+        """
+        Motore vettoriale con archi impliciti tra nodi che condividono
+        servizi (assa_services): i servizi diffusi su più di max_pairwise
+        nodi sono collegati tramite un hub virtuale
+
+        Args:
+            service_probs: Probabilità di movimento laterale per servizio
+            max_pairwise: Soglia oltre la quale si usa l'hub virtuale nei
+                percorsi critici (gli score non ne dipendono)
+        """
+        from assa_services import ServiceIndex
+        index = ServiceIndex(self.G, service_probs=service_probs, max_pairwise=max_pairwise)
+        return index.engine(org_factor=self.org_factor, alpha=self.alpha)
+
     def _normalize_cvss(self, cvss: float) -> float:
         """Normalizza CVSS score a range 0-1"""
         return min(cvss / 10.0, 1.0)
 
-    def identify_critical_paths(self, threshold: float = 0.7) -> List[List[str]]:
+    def identify_critical_paths(self, threshold: float = 0.7,
+                                max_hops: int = 5,
+                                k: Optional[int] = None) -> List[Dict]:
         """
         Identifica percorsi critici nella rete con alta probabilità
         di propagazione
 
+        La ricerca è best-first sui pesi -log(p) con potatura dei prefissi
+        sotto soglia (assa_sparse.iter_probable_paths), invece di enumerare
+        tutti i percorsi semplici per ogni coppia sorgente/target.
+
         Args:
             threshold: Soglia di criticità (default 0.7)
+            max_hops: Lunghezza massima dei percorsi in archi (default 5)
+            k: Limita la ricerca ai k percorsi più probabili (default tutti)
 
         Returns:
             Lista di percorsi critici
         """
-        critical_paths = []
-
-        # Trova nodi ad alta esposizione
-        exposed_nodes = [n for n in self.G.nodes()
-                        if self.G.nodes[n]['data'].exposure > 0.5]
-
-        # Trova nodi critici (high value targets)
-        critical_nodes = [n for n in self.G.nodes()
-                         if self.G.nodes[n]['data'].type in ['server', 'database']]
-
-        # Calcola percorsi da nodi esposti a nodi critici
-        for source in exposed_nodes:
-            for target in critical_nodes:
-                if source != target:
-                    try:
-                        paths = list(nx.all_simple_paths(
-                            self.G, source, target, cutoff=5
-                        ))
-                        for path in paths:
-                            path_prob = self._calculate_path_probability(path)
-                            if path_prob > threshold:
-                                critical_paths.append({
-                                    'path': path,
-                                    'probability': path_prob,
-                                    'risk_score': self._calculate_path_risk(path)
-                                })
-                    except nx.NetworkXNoPath:
-                        continue
-
-        return sorted(critical_paths, key=lambda x: x['risk_score'], reverse=True)
+        return self.sparse_engine().critical_paths(threshold, max_hops, k)
+
+    def iter_critical_paths(self, threshold: float = 0.7, max_hops: int = 5):
+        """Generatore lazy dei percorsi critici, dal più probabile"""
+        return self.sparse_engine().iter_critical_paths(threshold, max_hops)
+
+    def attack_graph(self):
+        """
+        Grafo di attacco orientato (nodo, livello di privilegio)
+
+        Usa Node.privileges e la direzione degli archi se il grafo è un
+        nx.DiGraph (assa_attack_graph.PrivilegeAttackGraph).
+        """
+        from assa_attack_graph import PrivilegeAttackGraph
+        return PrivilegeAttackGraph.from_networkx(self.G)
+
+    def simulate_compromise(self, n_trials: int = 10000, n_jobs: Optional[int] = 1,
+                            seed: Optional[int] = None) -> Dict:
+        """
+        Probabilità di compromissione dei nodi critici attraverso qualsiasi
+        percorso, per percolazione Monte Carlo (assa_percolation)
+
+        Args:
+            n_trials: Numero di prove
+            n_jobs: Processi da usare
+            seed: Seme per la riproducibilità
+
+        Returns:
+            Dictionary con probabilità per target e intervalli di confidenza
+        """
+        from assa_percolation import AttackPercolationSimulator
+        return AttackPercolationSimulator(self.G).run(n_trials, n_jobs=n_jobs, seed=seed)
+
+    def recommend_segmentation(self, per_target: int = 0) -> Dict:
+        """
+        Regole firewall dal taglio minimo tra nodi esposti e nodi critici
+        (assa_segmentation), ordinate per riduzione di ASSA
+
+        Args:
+            per_target: Numero di target critici con un taglio dedicato
+        """
+        from assa_segmentation import SegmentationAdvisor
+        return SegmentationAdvisor(self).recommend(per_target=per_target)
 
     def _calculate_path_probability(self, path: List[str]) -> float:
         """Calcola probabilità di compromissione lungo un percorso"""
@@ -149,17 +228,21 @@ class ASSA_GDO:
             total_risk += node_risk
         return total_risk / len(path)
 
-    def recommend_mitigations(self, budget: float = 100000) -> Dict:
+    def recommend_mitigations(self, budget: float = 100000,
+                              component_scores: Optional[Dict] = None) -> Dict:
         """
         Raccomanda mitigazioni ottimali dato un budget
 
         Args:
             budget: Budget disponibile in euro
+            component_scores: Score per componente già calcolati
+                (default: ricalcolati con calculate_assa)
 
         Returns:
             Dictionary con mitigazioni raccomandate e ROI atteso
         """
-        _, component_scores = self.calculate_assa()
+        if component_scores is None:
+            _, component_scores = self.calculate_assa()
 
         # Ordina componenti per criticità
         sorted_components = sorted(
@@ -206,17 +289,29 @@ class ASSA_GDO:
             'budget_utilization': round((budget - remaining_budget) / budget * 100, 1)
         }
 
+    def optimize_mitigations(self, budget: float = 100000, mode: str = 'auto',
+                             candidates: Optional[List[str]] = None) -> Dict:
+        """
+        Selezione ottima delle mitigazioni con effetti di propagazione
+
+        A differenza di recommend_mitigations considera tutti i candidati e
+        la riduzione del fattore di propagazione dei vicini
+        (assa_mitigation.MitigationOptimizer).
+
+        Args:
+            budget: Budget disponibile in euro
+            mode: 'exact' (branch and bound), 'celf' (lazy greedy) o 'auto'
+            candidates: Nodi mitigabili (default tutti)
+
+        Returns:
+            Dictionary con mitigazioni selezionate, ROI e ASSA prima/dopo
+        """
+        from assa_mitigation import MitigationOptimizer
+        return MitigationOptimizer(self, candidates).optimize(budget, mode)
+
     def _estimate_mitigation_cost(self, node: Node) -> float:
         """Stima costo di mitigazione per tipo di nodo"""
-        base_costs = {
-            'pos': 500,       # Patch/update POS
-            'server': 5000,   # Harden server
-            'network': 3000,  # Segment network
-            'iot': 200,       # Update firmware
-            'database': 8000, # Encrypt and secure DB
-        }
-
-        base_cost = base_costs.get(node.type, 1000)
+        base_cost = self.MITIGATION_BASE_COSTS.get(node.type, self.DEFAULT_MITIGATION_COST)
 
         # Aggiusta per severità
         severity_multiplier = 1 + (node.cvss_score / 10)
@@ -225,31 +320,19 @@ class ASSA_GDO:
 
     def _estimate_effectiveness(self, node: Node) -> float:
         """Stima efficacia della mitigazione (0-1)"""
-        effectiveness_map = {
-            'pos': 0.70,      # Patch generalmente efficaci
-            'server': 0.80,   # Hardening molto efficace
-            'network': 0.85,  # Segmentazione molto efficace
-            'iot': 0.60,      # Aggiornamenti IoT limitati
-            'database': 0.90  # Encryption molto efficace
-        }
-        return effectiveness_map.get(node.type, 0.70)
+        return self.MITIGATION_EFFECTIVENESS.get(node.type,
+                                                 self.DEFAULT_MITIGATION_EFFECTIVENESS)
 
     def _get_specific_recommendation(self, node: Node) -> str:
         """Genera raccomandazione specifica per tipo di nodo"""
-        recommendations = {
-            'pos': "Aggiornare firmware POS, implementare network segmentation",
-            'server': "Hardening OS, patch management automatico, monitoring avanzato",
-            'network': "Microsegmentazione, Zero Trust architecture, monitoring traffico",
-            'iot': "Aggiornamento firmware, isolamento VLAN, monitoring anomalie",
-            'database': "Crittografia at-rest/in-transit, access control, audit logging"
-        }
-        return recommendations.get(node.type, "Revisione configurazione sicurezza")
+        return self.MITIGATION_RECOMMENDATIONS.get(node.type,
+                                                   self.DEFAULT_MITIGATION_RECOMMENDATION)
 
     def generate_report(self) -> Dict:
         """Genera report completo ASSA-GDO"""
         total_assa, component_scores = self.calculate_assa()
         critical_paths = self.identify_critical_paths()
-        mitigations = self.recommend_mitigations()
+        mitigations = self.recommend_mitigations(component_scores=component_scores)
 
         # Analisi distribuzione componenti
         scores_by_type = {}
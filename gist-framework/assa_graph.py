@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+ASSA-GDO Compact Infrastructure Graph
+=====================================
+
+Rappresentazione compatta, basata su array, dell'infrastruttura GDO per
+inventari di intere flotte (milioni di asset), dove un grafo networkx con
+un oggetto Node per nodo occupa gigabyte prima di iniziare lo scoring.
+
+- tipi, servizi e livelli di privilegio sono internati in vocabolari e
+  memorizzati come codici interi;
+- servizi e privilegi per nodo sono liste in formato CSR (indptr + valori);
+- gli archi sono un'adiacenza CSR simmetrica delle probabilità di
+  propagazione.
+
+Il caricamento avviene in blocco da inventari CSV/Parquet di asset e
+liste di archi; il salvataggio usa un .npz non compresso i cui array
+possono essere mappati in memoria al caricamento.
+
+Author: GIST Framework Research
+License: MIT
+Version: 1.0
+"""
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+from scipy import sparse
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Sequence, Union
+import struct
+import zipfile
+import logging
+
+from assa_gdo_calculator import Node
+from assa_sparse import CompiledInfrastructure, DEFAULT_PROPAGATION_PROB
+
+logger = logging.getLogger(__name__)
+
+TableInput = Union[str, pd.DataFrame]
+
+LIST_SEPARATOR = ';'
+PRIVILEGE_SEPARATOR = ':'
+
+
+@dataclass
+class CompactInfrastructure:
+    """
+    Infrastruttura GDO in array NumPy.
+
+    Attributes:
+        node_ids: Identificativi dei nodi (array di stringhe)
+        type_names: Vocabolario dei tipi di nodo
+        type_codes: Codice del tipo per nodo (indice in type_names)
+        cvss: CVSS score per nodo
+        exposure: Esposizione (0-1) per nodo
+        service_names: Vocabolario dei servizi
+        service_indptr: Offset CSR dei servizi per nodo
+        service_codes: Codici dei servizi (indici in service_names)
+        privilege_names: Vocabolario dei livelli di privilegio
+        privilege_indptr: Offset CSR dei privilegi per nodo
+        privilege_codes: Codici dei privilegi (indici in privilege_names)
+        privilege_values: Valore associato a ogni privilegio
+        indptr: Offset CSR degli archi per nodo
+        indices: Vicini (adiacenza simmetrica)
+        probs: Probabilità di propagazione per elemento di adiacenza
+    """
+    node_ids: np.ndarray
+    type_names: np.ndarray
+    type_codes: np.ndarray
+    cvss: np.ndarray
+    exposure: np.ndarray
+    service_names: np.ndarray
+    service_indptr: np.ndarray
+    service_codes: np.ndarray
+    privilege_names: np.ndarray
+    privilege_indptr: np.ndarray
+    privilege_codes: np.ndarray
+    privilege_values: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    probs: np.ndarray
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def n_edges(self) -> int:
+        """Numero di archi non orientati (i self-loop contano una volta)."""
+        rows = np.repeat(np.arange(self.n_nodes), np.diff(self.indptr))
+        n_loops = int(np.count_nonzero(rows == self.indices))
+        return (len(self.indices) - n_loops) // 2 + n_loops
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria occupata dagli array."""
+        return sum(getattr(self, f.name).nbytes for f in fields(self))
+
+    @property
+    def adjacency(self) -> sparse.csr_matrix:
+        """Adiacenza CSR delle probabilità di propagazione (senza copie)."""
+        return sparse.csr_matrix((self.probs, self.indices, self.indptr),
+                                 shape=(self.n_nodes, self.n_nodes))
+
+    @property
+    def types(self) -> np.ndarray:
+        """Tipo di ciascun nodo come stringa."""
+        return self.type_names[self.type_codes]
+
+    def services(self, i: int) -> List[str]:
+        """Servizi del nodo i."""
+        codes = self.service_codes[self.service_indptr[i]:self.service_indptr[i + 1]]
+        return self.service_names[codes].tolist()
+
+    def privileges(self, i: int) -> Dict[str, float]:
+        """Privilegi del nodo i."""
+        start, stop = self.privilege_indptr[i], self.privilege_indptr[i + 1]
+        names = self.privilege_names[self.privilege_codes[start:stop]]
+        return dict(zip(names.tolist(), self.privilege_values[start:stop].tolist()))
+
+    def node(self, i: int) -> Node:
+        """Ricostruisce il Node del nodo i."""
+        return Node(
+            id=str(self.node_ids[i]),
+            type=str(self.type_names[self.type_codes[i]]),
+            cvss_score=float(self.cvss[i]),
+            exposure=float(self.exposure[i]),
+            privileges=self.privileges(i),
+            services=self.services(i)
+        )
+
+    def compile(self) -> CompiledInfrastructure:
+        """Vista per il motore SparseASSA."""
+        return CompiledInfrastructure(
+            node_ids=self.node_ids.tolist(),
+            types=self.types.astype(object),
+            cvss=np.asarray(self.cvss, dtype=float),
+            exposure=np.asarray(self.exposure, dtype=float),
+            adjacency=self.adjacency
+        )
+
+    # ------------------------------------------------------------------
+    # Costruzione
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_tables(cls,
+                    nodes: TableInput,
+                    edges: TableInput,
+                    default_prob: float = DEFAULT_PROPAGATION_PROB) -> 'CompactInfrastructure':
+        """
+        Carica in blocco un inventario di asset e una lista di archi.
+
+        Inventario (una riga per asset): colonne id, type, cvss_score,
+        exposure e opzionali services ('payment;inventory') e privileges
+        ('user:0.3;admin:0.9'). Lista di archi: colonne source, target e
+        opzionale propagation_prob. Gli archi ripetuti mantengono l'ultima
+        occorrenza, come add_edge su nx.Graph.
+
+        Args:
+            nodes: DataFrame o file CSV/Parquet dell'inventario
+            edges: DataFrame o file CSV/Parquet degli archi
+            default_prob: Probabilità per archi senza propagation_prob
+
+        Returns:
+            Infrastruttura compatta
+
+        Raises:
+            ValueError: Se colonne mancanti, id duplicati o archi verso nodi sconosciuti
+        """
+        nodes = _read_table(nodes)
+        edges = _read_table(edges)
+        _require_columns(nodes, ('id', 'type', 'cvss_score', 'exposure'), 'inventario')
+        _require_columns(edges, ('source', 'target'), 'lista archi')
+
+        index = pd.Index(nodes['id'].astype(str))
+        node_ids = np.asarray(index, dtype=str)
+        if not index.is_unique:
+            raise ValueError("Identificativi di nodo duplicati nell'inventario")
+
+        type_codes, type_names = pd.factorize(nodes['type'].astype(str))
+        service_indptr, service_codes, service_names = _intern_lists(
+            nodes['services'] if 'services' in nodes else None, len(nodes)
+        )
+        privilege_indptr, privilege_codes, privilege_names, privilege_values = _intern_privileges(
+            nodes['privileges'] if 'privileges' in nodes else None, len(nodes)
+        )
+
+        sources = index.get_indexer(edges['source'].astype(str))
+        targets = index.get_indexer(edges['target'].astype(str))
+        unknown = (sources < 0) | (targets < 0)
+        if unknown.any():
+            raise ValueError(f"{int(unknown.sum())} archi verso nodi non presenti nell'inventario")
+        probs = (edges['propagation_prob'].fillna(default_prob).to_numpy(dtype=float)
+                 if 'propagation_prob' in edges else np.full(len(edges), default_prob))
+
+        infrastructure = cls._from_arrays(
+            node_ids=node_ids,
+            type_names=np.asarray(type_names, dtype=str),
+            type_codes=type_codes.astype(np.uint8 if len(type_names) < 256 else np.int32),
+            cvss=nodes['cvss_score'].to_numpy(dtype=float),
+            exposure=nodes['exposure'].to_numpy(dtype=float),
+            service_names=service_names,
+            service_indptr=service_indptr,
+            service_codes=service_codes,
+            privilege_names=privilege_names,
+            privilege_indptr=privilege_indptr,
+            privilege_codes=privilege_codes,
+            privilege_values=privilege_values,
+            sources=sources, targets=targets, probs=probs
+        )
+        logger.info(f"Infrastruttura caricata: {infrastructure.n_nodes:,} nodi, "
+                    f"{infrastructure.n_edges:,} archi, {infrastructure.nbytes / 1e6:.1f} MB")
+        return infrastructure
+
+    @classmethod
+    def from_networkx(cls, G: nx.Graph,
+                      default_prob: float = DEFAULT_PROPAGATION_PROB) -> 'CompactInfrastructure':
+        """Converte un grafo networkx con nodi Node nell'attributo 'data'."""
+        data = [G.nodes[n]['data'] for n in G.nodes()]
+        nodes = pd.DataFrame({
+            'id': [str(n) for n in G.nodes()],
+            'type': [node.type for node in data],
+            'cvss_score': [node.cvss_score for node in data],
+            'exposure': [node.exposure for node in data],
+            'services': [LIST_SEPARATOR.join(node.services) for node in data],
+            'privileges': [LIST_SEPARATOR.join(f"{k}{PRIVILEGE_SEPARATOR}{v}"
+                                               for k, v in node.privileges.items())
+                           for node in data],
+        })
+        edges = pd.DataFrame(
+            [(str(u), str(v), p) for u, v, p in G.edges(data='propagation_prob', default=default_prob)],
+            columns=['source', 'target', 'propagation_prob']
+        )
+        return cls.from_tables(nodes, edges, default_prob)
+
+    @classmethod
+    def _from_arrays(cls, sources: np.ndarray, targets: np.ndarray,
+                     probs: np.ndarray, **attributes) -> 'CompactInfrastructure':
+        """Costruisce l'adiacenza CSR simmetrica da una lista di archi non orientati."""
+        n = len(attributes['node_ids'])
+        index_dtype = np.int32 if n < 2 ** 31 else np.int64
+
+        # Deduplica archi non orientati mantenendo l'ultima occorrenza
+        low, high = np.minimum(sources, targets), np.maximum(sources, targets)
+        keys = low.astype(np.int64) * n + high
+        _, last = np.unique(keys[::-1], return_index=True)
+        keep = len(keys) - 1 - last
+        low, high, probs = low[keep], high[keep], probs[keep]
+
+        loops = low == high
+        rows = np.concatenate([low, high[~loops]])
+        cols = np.concatenate([high, low[~loops]])
+        values = np.concatenate([probs, probs[~loops]])
+        order = np.argsort(rows.astype(np.int64) * n + cols, kind='stable')
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+
+        return cls(indptr=indptr, indices=cols[order].astype(index_dtype),
+                   probs=values[order], **attributes)
+
+    # ------------------------------------------------------------------
+    # Conversioni e persistenza
+    # ------------------------------------------------------------------
+
+    def to_networkx(self) -> nx.Graph:
+        """
+        Adattatore verso networkx per le analisi che lo richiedono.
+
+        Returns:
+            Grafo con Node nell'attributo 'data' e propagation_prob sugli archi
+        """
+        G = nx.Graph()
+        G.add_nodes_from((str(node_id), {'data': self.node(i)})
+                         for i, node_id in enumerate(self.node_ids))
+        rows = np.repeat(np.arange(self.n_nodes), np.diff(self.indptr))
+        upper = rows <= self.indices
+        ids = self.node_ids
+        G.add_edges_from(
+            (str(ids[u]), str(ids[v]), {'propagation_prob': float(p)})
+            for u, v, p in zip(rows[upper], self.indices[upper], self.probs[upper])
+        )
+        return G
+
+    def save(self, filename: str) -> str:
+        """
+        Salva in .npz non compresso, mappabile in memoria con load(mmap=True).
+
+        Returns:
+            Path del file salvato
+        """
+        np.savez(filename, **{f.name: getattr(self, f.name) for f in fields(self)})
+        if not filename.endswith('.npz'):
+            filename += '.npz'
+        logger.info(f"Infrastruttura salvata: {filename}")
+        return filename
+
+    @classmethod
+    def load(cls, filename: str, mmap: bool = True) -> 'CompactInfrastructure':
+        """
+        Carica un'infrastruttura salvata con save().
+
+        Args:
+            filename: File .npz
+            mmap: Se True gli array sono mappati in memoria in sola lettura
+                (nessuna copia: l'apertura è immediata anche per flotte intere)
+
+        Returns:
+            Infrastruttura compatta
+        """
+        if mmap:
+            arrays = _mmap_npz(filename)
+        else:
+            with np.load(filename) as data:
+                arrays = {name: data[name] for name in data.files}
+        return cls(**{f.name: arrays[f.name] for f in fields(cls)})
+
+
+def _read_table(table: TableInput) -> pd.DataFrame:
+    if isinstance(table, pd.DataFrame):
+        return table
+    if table.endswith(('.parquet', '.pq')):
+        return pd.read_parquet(table)
+    return pd.read_csv(table)
+
+
+def _require_columns(frame: pd.DataFrame, columns: Sequence[str], label: str):
+    missing = [c for c in columns if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Colonne mancanti nel file {label}: {missing}")
+
+
+def _intern_items(values: Optional[pd.Series], n: int):
+    """
+    Liste per riga (stringhe separate da ';') internate in formato CSR.
+
+    Il parsing avviene una volta per valore distinto della colonna (gli
+    inventari ripetono poche combinazioni), poi è espanso per riga con
+    operazioni vettoriali.
+
+    Returns:
+        indptr per riga, codici degli elementi, vocabolario degli elementi
+    """
+    if values is None:
+        return np.zeros(n + 1, dtype=np.int64), np.empty(0, dtype=np.int32), []
+
+    row_codes, distinct = pd.factorize(values.reset_index(drop=True))
+    vocabulary, items, distinct_lengths = {}, [], []
+    for value in distinct:
+        parts = [part for part in str(value).split(LIST_SEPARATOR) if part]
+        items.extend(vocabulary.setdefault(part, len(vocabulary)) for part in parts)
+        distinct_lengths.append(len(parts))
+    distinct_lengths = np.array(distinct_lengths + [0], dtype=np.int64)
+    distinct_indptr = np.zeros(len(distinct_lengths), dtype=np.int64)
+    np.cumsum(distinct_lengths[:-1], out=distinct_indptr[1:])
+
+    # Valori mancanti (codice -1) -> lista vuota
+    lengths = distinct_lengths[row_codes]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    positions = (np.repeat(distinct_indptr[row_codes] - indptr[:-1], lengths)
+                 + np.arange(indptr[-1]))
+    codes = np.asarray(items, dtype=np.int32)[positions]
+    return indptr, codes, list(vocabulary)
+
+
+def _intern_lists(values: Optional[pd.Series], n: int):
+    indptr, codes, vocabulary = _intern_items(values, n)
+    return indptr, codes, np.asarray(vocabulary, dtype=str)
+
+
+def _intern_privileges(values: Optional[pd.Series], n: int):
+    indptr, codes, vocabulary = _intern_items(values, n)
+    parsed = [item.rsplit(PRIVILEGE_SEPARATOR, 1) for item in vocabulary]
+    if any(len(parts) != 2 for parts in parsed):
+        raise ValueError(f"Privilegi non nel formato 'livello{PRIVILEGE_SEPARATOR}valore'")
+    name_codes, names = pd.factorize(pd.Series([parts[0] for parts in parsed], dtype=object))
+    item_values = np.array([float(parts[1]) for parts in parsed])
+    return (indptr, name_codes.astype(np.int32)[codes],
+            np.asarray(names, dtype=str), item_values[codes])
+
+
+def _mmap_npz(filename: str) -> Dict[str, np.ndarray]:
+    """Mappa in memoria gli array di un .npz non compresso."""
+    arrays = {}
+    with zipfile.ZipFile(filename) as archive, open(filename, 'rb') as handle:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+
+            # Header locale ZIP: 30 byte fissi + nome + campo extra
+            handle.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack('<HH', handle.read(4))
+            handle.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(handle)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(handle)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(handle)
+            if dtype.hasobject or 0 in shape:
+                handle.seek(info.header_offset + 30 + name_length + extra_length)
+                arrays[name] = np.lib.format.read_array(handle)
+                continue
+            arrays[name] = np.memmap(filename, dtype=dtype, mode='r', offset=handle.tell(),
+                                     shape=shape, order='F' if fortran_order else 'C')
+    return arrays
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+ASSA-GDO Incremental Maintenance
+================================
+
+Mantenimento incrementale dello score ASSA-GDO sotto modifiche
+dell'infrastruttura (nuovi POS, patch che cambiano il CVSS, regole
+firewall che alterano propagation_prob), senza ricalcolo completo.
+
+Ogni nodo conserva V_i * E_i e la somma dei log1p(alpha * P_ij) sui
+vicini: una modifica a un arco aggiorna solo i suoi due estremi, una
+modifica a un nodo solo il nodo stesso, la rimozione di un nodo i suoi
+vicini. Il totale è aggiornato per differenza e ogni modifica è
+registrata in un journal, così che un flusso di aggiornamenti dalla
+CMDB possa essere applicato e riletto in qualsiasi momento.
+
+Lo stato non osserva il grafo: le modifiche vanno applicate tramite i
+metodi di IncrementalASSA (che con sync_graph le riportano sul grafo);
+modifiche fatte direttamente sul grafo non sono viste e richiedono di
+ricreare l'istanza.
+
+Author: GIST Framework Research
+License: MIT
+Version: 1.0
+"""
+
+import numpy as np
+import networkx as nx
+from collections import deque
+from dataclasses import replace
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+import logging
+
+from assa_gdo_calculator import Node
+from assa_sparse import DEFAULT_PROPAGATION_PROB
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalASSA:
+    """
+    ASSA-GDO aggiornato in O(grado) per modifica, con journal delle modifiche.
+    """
+
+    OPERATIONS = ('add_node', 'update_node', 'remove_node', 'set_edge', 'remove_edge')
+
+    def __init__(self,
+                 infrastructure: nx.Graph,
+                 org_factor: float = 1.0,
+                 alpha: float = 0.73,
+                 sync_graph: bool = True,
+                 journal_size: int = 100000):
+        """
+        Inizializza lo stato incrementale da un grafo dell'infrastruttura.
+
+        Args:
+            infrastructure: Grafo con nodi Node nell'attributo 'data'
+            org_factor: Fattore organizzativo (default 1.0)
+            alpha: Fattore di amplificazione della propagazione
+            sync_graph: Se True le modifiche sono applicate anche al grafo,
+                che resta coerente per ASSA_GDO e le altre analisi
+            journal_size: Numero massimo di modifiche conservate nel journal
+        """
+        self.G = infrastructure
+        self.org_factor = org_factor
+        self.alpha = alpha
+        self.sync_graph = sync_graph
+        self.journal = deque(maxlen=journal_size)
+        self.sequence = 0
+
+        n = infrastructure.number_of_nodes()
+        capacity = max(16, 2 * n)
+        self._position: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._nodes: List[Optional[Node]] = []
+        self._neighbors: List[Dict[int, float]] = []
+        self._free: List[int] = []  # Posizioni liberate da remove_node
+        self._base = np.zeros(capacity)
+        self._log_factor = np.zeros(capacity)
+        self._scores = np.zeros(capacity)
+        self._active = np.zeros(capacity, dtype=bool)
+
+        for node_id in infrastructure.nodes():
+            self._allocate(node_id, infrastructure.nodes[node_id]['data'])
+        for u, v, p in infrastructure.edges(data='propagation_prob',
+                                            default=DEFAULT_PROPAGATION_PROB):
+            i, j = self._position[u], self._position[v]
+            self._neighbors[i][j] = p
+            self._neighbors[j][i] = p
+
+        for i in range(len(self._ids)):
+            self._refresh_node(i, recompute=True)
+        self.total = float(self._scores[:len(self._ids)].sum())
+
+    # ------------------------------------------------------------------
+    # Stato interno
+    # ------------------------------------------------------------------
+
+    def _allocate(self, node_id: str, node: Node) -> int:
+        """
+        Registra un nuovo nodo, riusando una posizione liberata da
+        remove_node o ampliando gli array se necessario.
+        """
+        if self._free:
+            # Il fattore e lo score della posizione sono già azzerati
+            i = self._free.pop()
+            self._ids[i] = node_id
+            self._nodes[i] = node
+            self._neighbors[i] = {}
+        else:
+            i = len(self._ids)
+            if i == len(self._base):
+                grow = len(self._base)
+                self._base = np.concatenate([self._base, np.zeros(grow)])
+                self._log_factor = np.concatenate([self._log_factor, np.zeros(grow)])
+                self._scores = np.concatenate([self._scores, np.zeros(grow)])
+                self._active = np.concatenate([self._active, np.zeros(grow, dtype=bool)])
+            self._ids.append(node_id)
+            self._nodes.append(node)
+            self._neighbors.append({})
+        self._position[node_id] = i
+        self._base[i] = min(node.cvss_score / 10.0, 1.0) * node.exposure
+        self._active[i] = True
+        return i
+
+    def _refresh_node(self, i: int, recompute: bool = False) -> float:
+        """
+        Aggiorna lo score del nodo i dal fattore di propagazione corrente
+        in O(1); con recompute il fattore è ricalcolato sui vicini in O(grado).
+        Restituisce la variazione.
+        """
+        if self._active[i]:
+            if recompute:
+                self._log_factor[i] = math.fsum(math.log1p(self.alpha * p)
+                                                for p in self._neighbors[i].values())
+            score = self._base[i] * math.exp(self._log_factor[i]) * self.org_factor
+        else:
+            score = 0.0
+        delta = score - float(self._scores[i])
+        self._scores[i] = score
+        return delta
+
+    def _index(self, node_id: str) -> int:
+        if node_id not in self._position:
+            raise KeyError(f"Nodo non presente: {node_id}")
+        return self._position[node_id]
+
+    def _record(self, operation: str, delta: float, **details) -> Dict:
+        delta = float(delta)
+        self.total += delta
+        self.sequence += 1
+        entry = {
+            'sequence': self.sequence,
+            'timestamp': datetime.now().isoformat(),
+            'operation': operation,
+            'delta_assa': delta,
+            'total_assa': self.total,
+            **details
+        }
+        self.journal.append(entry)
+        return entry
+
+    # ------------------------------------------------------------------
+    # Modifiche
+    # ------------------------------------------------------------------
+
+    def add_node(self, node: Node, edges: Optional[Dict[str, float]] = None) -> Dict:
+        """
+        Aggiunge un nodo con i suoi collegamenti.
+
+        Args:
+            node: Nuovo nodo dell'infrastruttura
+            edges: Vicini -> propagation_prob (opzionale)
+
+        Returns:
+            Voce del journal
+
+        Raises:
+            ValueError: Se nodo già presente o probabilità fuori range
+            KeyError: Se un vicino non è presente
+        """
+        if node.id in self._position:
+            raise ValueError(f"Nodo già presente: {node.id}")
+        # Verifica completa prima di modificare lo stato
+        edges = edges or {}
+        neighbors = {neighbor_id: self._index(neighbor_id) for neighbor_id in edges}
+        invalid = {k: v for k, v in edges.items() if not 0 <= v <= 1}
+        if invalid:
+            raise ValueError(f"Probabilità di propagazione fuori range [0,1]: {invalid}")
+
+        i = self._allocate(node.id, node)
+        if self.sync_graph:
+            self.G.add_node(node.id, data=node)
+
+        delta = 0.0
+        for neighbor_id, prob in edges.items():
+            delta += self._set_edge(i, neighbors[neighbor_id], prob, refresh_i=False)
+            if self.sync_graph:
+                self.G.add_edge(node.id, neighbor_id, propagation_prob=prob)
+        delta += self._refresh_node(i)
+        return self._record('add_node', delta, node=node.id)
+
+    def update_node(self, node_id: str, **changes) -> Dict:
+        """
+        Aggiorna gli attributi di un nodo (es. cvss_score dopo una patch).
+
+        Args:
+            node_id: Nodo da aggiornare
+            **changes: Attributi di Node da modificare
+
+        Returns:
+            Voce del journal
+        """
+        i = self._index(node_id)
+        unknown = set(changes) - set(Node.__dataclass_fields__) - {'id'}
+        if unknown or 'id' in changes:
+            raise ValueError(f"Attributi non modificabili: {unknown or {'id'}}")
+
+        node = replace(self._nodes[i], **changes)
+        self._nodes[i] = node
+        if self.sync_graph:
+            self.G.nodes[node_id]['data'] = node
+        self._base[i] = min(node.cvss_score / 10.0, 1.0) * node.exposure
+        delta = self._refresh_node(i)
+        return self._record('update_node', delta, node=node_id, changes=changes)
+
+    def remove_node(self, node_id: str) -> Dict:
+        """Rimuove un nodo e i suoi collegamenti (O(grado))."""
+        i = self._index(node_id)
+        delta = 0.0
+        for j in list(self._neighbors[i]):
+            delta += self._remove_edge(i, j, refresh_i=False)
+        self._active[i] = False
+        self._log_factor[i] = 0.0
+        delta += self._refresh_node(i)
+        del self._position[node_id]
+        self._ids[i] = None
+        self._nodes[i] = None
+        self._free.append(i)
+        if self.sync_graph:
+            self.G.remove_node(node_id)
+        return self._record('remove_node', delta, node=node_id)
+
+    def set_edge(self, u: str, v: str,
+                 propagation_prob: float = DEFAULT_PROPAGATION_PROB) -> Dict:
+        """Aggiunge un collegamento o ne modifica la probabilità di propagazione."""
+        if not 0 <= propagation_prob <= 1:
+            raise ValueError(f"Probabilità di propagazione fuori range [0,1]: {propagation_prob}")
+        delta = self._set_edge(self._index(u), self._index(v), propagation_prob)
+        if self.sync_graph:
+            self.G.add_edge(u, v, propagation_prob=propagation_prob)
+        return self._record('set_edge', delta, edge=(u, v), propagation_prob=propagation_prob)
+
+    def remove_edge(self, u: str, v: str) -> Dict:
+        """Rimuove un collegamento (es. nuova regola firewall che lo blocca)."""
+        i, j = self._index(u), self._index(v)
+        if j not in self._neighbors[i]:
+            raise KeyError(f"Collegamento non presente: {u} - {v}")
+        delta = self._remove_edge(i, j)
+        if self.sync_graph:
+            self.G.remove_edge(u, v)
+        return self._record('remove_edge', delta, edge=(u, v))
+
+    def _shift_edge(self, i: int, j: int, step: float, refresh_i: bool) -> float:
+        """
+        Somma step al fattore di propagazione dei due estremi e ne aggiorna
+        gli score; con refresh_i=False lo score di i è aggiornato dal chiamante.
+        """
+        self._log_factor[i] += step
+        delta = self._refresh_node(i) if refresh_i else 0.0
+        if i != j:
+            self._log_factor[j] += step
+            delta += self._refresh_node(j)
+        return delta
+
+    def _set_edge(self, i: int, j: int, prob: float, refresh_i: bool = True) -> float:
+        old = self._neighbors[i].get(j)
+        step = math.log1p(self.alpha * prob)
+        if old is not None:
+            step -= math.log1p(self.alpha * old)
+        self._neighbors[i][j] = prob
+        self._neighbors[j][i] = prob
+        return self._shift_edge(i, j, step, refresh_i)
+
+    def _remove_edge(self, i: int, j: int, refresh_i: bool = True) -> float:
+        step = -math.log1p(self.alpha * self._neighbors[i].pop(j))
+        if i != j:
+            del self._neighbors[j][i]
+        return self._shift_edge(i, j, step, refresh_i)
+
+    def apply(self, change: Dict) -> Dict:
+        """
+        Applica una modifica in formato dizionario (es. evento CMDB).
+
+        Esempi:
+            {'operation': 'update_node', 'node': 'pos_001', 'cvss_score': 3.1}
+            {'operation': 'set_edge', 'u': 'pos_001', 'v': 'server_main', 'propagation_prob': 0.2}
+            {'operation': 'add_node', 'node': Node(...), 'edges': {'network_core': 0.6}}
+
+        Returns:
+            Voce del journal
+        """
+        change = dict(change)
+        operation = change.pop('operation', None)
+        if operation not in self.OPERATIONS:
+            raise ValueError(f"Operazione non supportata: {operation}")
+        if operation == 'add_node':
+            return self.add_node(change['node'], change.get('edges'))
+        if operation in ('update_node', 'remove_node'):
+            node_id = change.pop('node')
+            return getattr(self, operation)(node_id, **change)
+        return getattr(self, operation)(change.pop('u'), change.pop('v'), **change)
+
+    def apply_stream(self, changes: Iterable[Dict]) -> int:
+        """Applica una sequenza di modifiche; restituisce il numero applicato."""
+        count = 0
+        for change in changes:
+            self.apply(change)
+            count += 1
+        return count
+
+    # ------------------------------------------------------------------
+    # Letture
+    # ------------------------------------------------------------------
+
+    def calculate_assa(self) -> Tuple[float, Dict]:
+        """
+        ASSA totale e per componente nello stato corrente
+
+        Returns:
+            total_assa: Score totale
+            component_scores: Dictionary con score per componente
+        """
+        n = len(self._ids)
+        active = np.flatnonzero(self._active[:n])
+        return self.total, {self._ids[i]: float(self._scores[i]) for i in active}
+
+    def node_score(self, node_id: str) -> float:
+        """Score corrente di un nodo."""
+        return float(self._scores[self._index(node_id)])
+
+    def top_k(self, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Nodi più vulnerabili nello stato corrente.
+
+        Returns:
+            Lista (node_id, score) in ordine decrescente
+        """
+        n = len(self._ids)
+        scores = np.where(self._active[:n], self._scores[:n], -np.inf)
+        k = min(k, int(self._active[:n].sum()))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self._ids[i], float(scores[i])) for i in top]
+
+    def rebuild(self) -> float:
+        """
+        Ricalcola tutti gli score e il totale da zero.
+
+        Annulla la deriva numerica accumulata dagli aggiornamenti per
+        differenza dei fattori di propagazione e del totale su flussi
+        molto lunghi.
+
+        Returns:
+            Differenza tra il totale ricalcolato e quello incrementale
+        """
+        for i in range(len(self._ids)):
+            self._refresh_node(i, recompute=True)
+        total = float(self._scores[:len(self._ids)].sum())
+        drift = total - self.total
+        self.total = total
+        return drift
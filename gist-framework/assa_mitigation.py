@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+ASSA-GDO Mitigation Optimizer
+=============================
+
+Selezione ottima delle mitigazioni sotto vincolo di budget, tenendo
+conto degli effetti di propagazione.
+
+Modello: mitigare il nodo i con efficacia e_i riduce la sua vulnerabilità
+di un fattore (1 - e_i), come in ASSA_GDO.recommend_mitigations, e riduce
+dello stesso fattore la probabilità di propagazione dei suoi archi, che
+abbassa il fattore di propagazione dei vicini. La riduzione totale di
+ASSA è monotona e submodulare nell'insieme dei nodi mitigati (ogni
+fattore del prodotto può solo diminuire), quindi:
+
+- la modalità 'exact' (branch and bound) usa come limite superiore il
+  knapsack frazionario sui guadagni marginali correnti;
+- la modalità 'celf' (lazy greedy costo-beneficio) rivaluta un candidato
+  solo quando arriva in cima alla coda, confrontando il risultato con la
+  migliore mitigazione singola.
+
+I guadagni marginali di tutti i candidati sono calcolati insieme
+sull'adiacenza CSR compilata da assa_sparse.
+
+Author: GIST Framework Research
+License: MIT
+Version: 1.0
+"""
+
+import numpy as np
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
+import heapq
+import logging
+
+from assa_gdo_calculator import ASSA_GDO
+from assa_sparse import SparseASSA, mirror_positions
+
+logger = logging.getLogger(__name__)
+
+
+class _MitigationState:
+    """Stato di ASSA sotto un insieme di mitigazioni, aggiornabile in O(grado)."""
+
+    def __init__(self, engine: SparseASSA, effectiveness: np.ndarray):
+        infra = engine.infrastructure
+        adjacency = infra.adjacency
+        n = infra.n_nodes
+
+        self.alpha = engine.alpha
+        self.org_factor = engine.org_factor
+        self.effectiveness = effectiveness
+        self.indptr = adjacency.indptr
+        self.indices = adjacency.indices
+        self.rows = np.repeat(np.arange(n), np.diff(adjacency.indptr))
+        self.offdiag = self.rows != self.indices
+
+        self.mirror = mirror_positions(adjacency)
+
+        self.data = adjacency.data.astype(float).copy()
+        self.base = engine.base_scores()
+        self.log_factor = np.bincount(self.rows, np.log1p(self.alpha * self.data), minlength=n)
+        self.scores = self.base * np.exp(self.log_factor) * self.org_factor
+        self.mitigated = np.zeros(n, dtype=bool)
+
+    def snapshot(self) -> Tuple:
+        return (self.data.copy(), self.base.copy(), self.log_factor.copy(),
+                self.scores.copy(), self.mitigated.copy())
+
+    def restore(self, snapshot: Tuple) -> None:
+        self.data, self.base, self.log_factor, self.scores, self.mitigated = \
+            (array.copy() for array in snapshot)
+
+    @property
+    def total(self) -> float:
+        return float(self.scores.sum())
+
+    def all_gains(self) -> np.ndarray:
+        """Guadagno marginale (riduzione di ASSA) di ogni nodo, vettoriale."""
+        n = len(self.base)
+        keep = 1 - self.effectiveness
+        reduction = np.log1p(self.alpha * self.data) - np.log1p(self.alpha * self.data * keep[self.rows])
+        row_reduction = np.bincount(self.rows, reduction, minlength=n)
+        neighbour_gain = np.bincount(
+            self.rows[self.offdiag],
+            (self.scores[self.indices] * -np.expm1(-reduction))[self.offdiag],
+            minlength=n
+        )
+        own_after = self.base * keep * np.exp(self.log_factor - row_reduction) * self.org_factor
+        gains = self.scores - own_after + neighbour_gain
+        gains[self.mitigated] = 0.0
+        return gains
+
+    def _row_reduction(self, i: int) -> Tuple[slice, np.ndarray]:
+        row = slice(self.indptr[i], self.indptr[i + 1])
+        data = self.data[row]
+        keep = 1 - self.effectiveness[i]
+        return row, np.log1p(self.alpha * data) - np.log1p(self.alpha * data * keep)
+
+    def gain(self, i: int) -> float:
+        """Guadagno marginale del nodo i in O(grado)."""
+        if self.mitigated[i]:
+            return 0.0
+        row, reduction = self._row_reduction(i)
+        neighbours = self.indices[row]
+        offdiag = neighbours != i
+        own_after = (self.base[i] * (1 - self.effectiveness[i])
+                     * np.exp(self.log_factor[i] - reduction.sum()) * self.org_factor)
+        neighbour_gain = (self.scores[neighbours[offdiag]] * -np.expm1(-reduction[offdiag])).sum()
+        return float(self.scores[i] - own_after + neighbour_gain)
+
+    def apply(self, i: int) -> None:
+        """Applica la mitigazione del nodo i."""
+        row, reduction = self._row_reduction(i)
+        neighbours = self.indices[row]
+        offdiag = neighbours != i
+        keep = 1 - self.effectiveness[i]
+
+        positions = np.arange(row.start, row.stop)
+        self.data[positions] *= keep
+        mirrors = self.mirror[positions[offdiag]]
+        self.data[mirrors] *= keep
+
+        self.log_factor[i] -= reduction.sum()
+        self.log_factor[neighbours[offdiag]] -= reduction[offdiag]
+        self.base[i] *= keep
+        self.mitigated[i] = True
+
+        touched = np.append(neighbours[offdiag], i)
+        self.scores[touched] = (self.base[touched] * np.exp(self.log_factor[touched])
+                                * self.org_factor)
+
+
+class MitigationOptimizer:
+    """
+    Ottimizzatore del portafoglio di mitigazioni per ASSA_GDO.
+    """
+
+    MODES = ('auto', 'exact', 'celf')
+
+    def __init__(self,
+                 assa: Optional[ASSA_GDO] = None,
+                 candidates: Optional[Sequence[str]] = None,
+                 max_exact_candidates: int = 40,
+                 infrastructure=None,
+                 org_factor: float = 1.0):
+        """
+        Inizializza l'ottimizzatore.
+
+        Args:
+            assa: Istanza ASSA_GDO (grafo, org_factor, costi ed efficacia)
+            candidates: Nodi mitigabili (default tutti)
+            max_exact_candidates: Numero massimo di candidati in modalità 'exact'
+            infrastructure: CompactInfrastructure (assa_graph) da usare al posto
+                di assa.G; senza assa, alpha e le stime di costo ed efficacia
+                sono gli attributi di classe di ASSA_GDO
+            org_factor: Fattore organizzativo quando assa non è indicato
+
+        Raises:
+            ValueError: Se mancano sia assa sia infrastructure
+        """
+        if assa is None and infrastructure is None:
+            raise ValueError("Serve un'istanza ASSA_GDO o una CompactInfrastructure")
+        self.assa = assa
+        self.policy = assa if assa is not None else ASSA_GDO
+        self.max_exact_candidates = max_exact_candidates
+        self._compact = infrastructure
+
+        if infrastructure is None:
+            self.engine = assa.sparse_engine()
+        else:
+            if assa is not None:
+                org_factor, alpha = assa.org_factor, assa.alpha
+            else:
+                alpha = ASSA_GDO.ALPHA
+            self.engine = SparseASSA(infrastructure, org_factor=org_factor, alpha=alpha)
+
+        infra = self.engine.infrastructure
+        if candidates is None:
+            self.candidates = np.arange(infra.n_nodes)
+        else:
+            self.candidates = self._positions(candidates)
+
+        # Stime solo per i candidati, vettoriali sui tipi e sui CVSS
+        if infrastructure is None:
+            type_names, type_codes = np.unique(infra.types[self.candidates].astype(str),
+                                               return_inverse=True)
+        else:
+            type_names = infrastructure.type_names
+            type_codes = infrastructure.type_codes[self.candidates]
+        policy = self.policy
+        base_costs = np.array([policy.MITIGATION_BASE_COSTS.get(str(t), policy.DEFAULT_MITIGATION_COST)
+                               for t in type_names], dtype=float)
+        effectiveness = np.array([policy.MITIGATION_EFFECTIVENESS.get(
+                                      str(t), policy.DEFAULT_MITIGATION_EFFECTIVENESS)
+                                  for t in type_names])
+        cvss = np.asarray(infra.cvss)[self.candidates]
+
+        # I nodi non candidati non sono mai selezionati
+        self.costs = np.full(infra.n_nodes, np.inf)
+        self.costs[self.candidates] = np.trunc(base_costs[type_codes] * (1 + cvss / 10))
+        self.effectiveness = np.zeros(infra.n_nodes)
+        self.effectiveness[self.candidates] = effectiveness[type_codes]
+
+    def _positions(self, candidates: Sequence[str]) -> np.ndarray:
+        """Posizioni dei nodi candidati negli array dell'infrastruttura."""
+        if self._compact is None:
+            position = {node_id: i for i, node_id in enumerate(self.engine.infrastructure.node_ids)}
+            missing = [c for c in candidates if c not in position]
+            positions = [position.get(c, -1) for c in candidates]
+        else:
+            # Ricerca binaria sugli id ordinati, senza dizionario su tutti i nodi
+            node_ids = self._compact.node_ids
+            wanted = np.asarray(candidates, dtype=str)
+            if len(node_ids) == 0:
+                raise ValueError(f"Nodi candidati non presenti nel grafo: {wanted[:5].tolist()}")
+            order = np.argsort(node_ids, kind='stable')
+            found = np.searchsorted(node_ids, wanted, sorter=order)
+            positions = order[np.minimum(found, len(order) - 1)]
+            missing = wanted[node_ids[positions] != wanted].tolist()
+        if missing:
+            raise ValueError(f"Nodi candidati non presenti nel grafo: {missing[:5]}")
+        return np.asarray(positions, dtype=int)
+
+    def _node(self, i: int):
+        """Node del nodo i (ricostruito solo per i nodi selezionati)."""
+        if self._compact is not None:
+            return self._compact.node(i)
+        return self.assa.G.nodes[self.engine.infrastructure.node_ids[i]]['data']
+
+    def optimize(self,
+                 budget: float = 100000,
+                 mode: Literal['auto', 'exact', 'celf'] = 'auto') -> Dict:
+        """
+        Seleziona l'insieme di mitigazioni che massimizza la riduzione di ASSA.
+
+        Args:
+            budget: Budget disponibile in euro
+            mode: 'exact' (branch and bound), 'celf' (lazy greedy) o 'auto'
+                (exact fino a 20 candidati)
+
+        Returns:
+            Dictionary nel formato di ASSA_GDO.recommend_mitigations, con
+            ASSA prima e dopo le mitigazioni
+
+        Raises:
+            ValueError: Se modalità non supportata o troppi candidati per 'exact'
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Modalità non supportata: {mode}")
+        if budget <= 0:
+            raise ValueError(f"Budget non valido: {budget}")
+        if mode == 'auto':
+            mode = 'exact' if len(self.candidates) <= 20 else 'celf'
+        if mode == 'exact' and len(self.candidates) > self.max_exact_candidates:
+            raise ValueError(
+                f"Troppi candidati per la modalità exact: {len(self.candidates)} "
+                f"(massimo {self.max_exact_candidates})"
+            )
+
+        state = _MitigationState(self.engine, self.effectiveness)
+        assa_before = state.total
+        selection = self._exact(state, budget) if mode == 'exact' else self._celf(state, budget)
+        return self._report(selection, budget, assa_before, mode)
+
+    def _celf(self, state: _MitigationState, budget: float) -> List[int]:
+        """Lazy greedy costo-beneficio con confronto con la migliore singola."""
+        affordable = self.candidates[self.costs[self.candidates] <= budget]
+        if len(affordable) == 0:
+            return []
+        gains = state.all_gains()[affordable]
+
+        heap = [(-gains[k] / self.costs[i], i, 0) for k, i in enumerate(affordable)]
+        heapq.heapify(heap)
+        selected, spent, round_ = [], 0.0, 0
+        while heap:
+            _, i, evaluated = heapq.heappop(heap)
+            if spent + self.costs[i] > budget:
+                continue
+            if evaluated < round_:
+                gain = state.gain(i)
+                heapq.heappush(heap, (-gain / self.costs[i], i, round_))
+                continue
+            state.apply(i)
+            selected.append(int(i))
+            spent += self.costs[i]
+            round_ += 1
+
+        # Garanzia di approssimazione: confronto con la migliore mitigazione singola
+        best_single = int(affordable[np.argmax(gains)])
+        if best_single not in selected:
+            single_state = _MitigationState(self.engine, self.effectiveness)
+            single_state.apply(best_single)
+            if single_state.total < state.total:
+                logger.info("Mitigazione singola migliore della selezione greedy")
+                return [best_single]
+        return selected
+
+    def _exact(self, state: _MitigationState, budget: float) -> List[int]:
+        """Branch and bound con limite del knapsack frazionario."""
+        gains = state.all_gains()[self.candidates]
+        order = self.candidates[np.argsort(-gains / self.costs[self.candidates], kind='stable')]
+        best = {'reduction': 0.0, 'selection': []}
+        start = state.total
+
+        def bound(position: int, remaining: float) -> float:
+            rest = order[position:]
+            if len(rest) == 0:
+                return 0.0
+            gains = state.all_gains()[rest]
+            costs = self.costs[rest]
+            ratio = np.argsort(-gains / costs, kind='stable')
+            total = 0.0
+            for k in ratio:
+                if costs[k] <= remaining:
+                    total += gains[k]
+                    remaining -= costs[k]
+                else:
+                    total += gains[k] * remaining / costs[k]
+                    break
+            return total
+
+        def search(position: int, remaining: float, chosen: List[int]) -> None:
+            reduction = start - state.total
+            if reduction > best['reduction']:
+                best['reduction'], best['selection'] = reduction, list(chosen)
+            if position == len(order):
+                return
+            if reduction + bound(position, remaining) <= best['reduction'] * (1 + 1e-12):
+                return
+
+            i = order[position]
+            if self.costs[i] <= remaining:
+                snapshot = state.snapshot()
+                state.apply(i)
+                search(position + 1, remaining - self.costs[i], chosen + [int(i)])
+                state.restore(snapshot)
+            search(position + 1, remaining, chosen)
+
+        search(0, budget, [])
+        return best['selection']
+
+    def _report(self, selection: List[int], budget: float, assa_before: float, mode: str) -> Dict:
+        """Report nel formato di recommend_mitigations, con guadagni in ordine di selezione."""
+        state = _MitigationState(self.engine, self.effectiveness)
+        infra = self.engine.infrastructure
+        mitigations = []
+        for i in selection:
+            score = float(state.scores[i])
+            risk_reduction = state.gain(i)
+            state.apply(i)
+            cost = int(self.costs[i])
+            node = self._node(i)
+            mitigations.append({
+                'node': infra.node_ids[i],
+                'type': node.type,
+                'current_score': round(score, 3),
+                'cost': cost,
+                'risk_reduction': round(risk_reduction, 3),
+                'roi': round((risk_reduction * 100000) / cost, 2),
+                'recommendation': self.policy.MITIGATION_RECOMMENDATIONS.get(
+                    node.type, self.policy.DEFAULT_MITIGATION_RECOMMENDATION),
+                'priority': 'CRITICAL' if score > 0.8 else 'HIGH' if score > 0.5 else 'MEDIUM'
+            })
+
+        total_cost = float(sum(self.costs[i] for i in selection))
+        total_risk_reduction = assa_before - state.total
+        return {
+            'mitigations': mitigations,
+            'total_cost': total_cost,
+            'total_risk_reduction': round(total_risk_reduction, 3),
+            'overall_roi': round((total_risk_reduction * 100000) / total_cost, 2) if total_cost > 0 else 0,
+            'budget_utilization': round(total_cost / budget * 100, 1),
+            'assa_before': round(assa_before, 3),
+            'assa_after': round(state.total, 3),
+            'mode': mode
+        }
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+ASSA-GDO Service Lateral Movement
+=================================
+
+Archi impliciti di movimento laterale derivati dai servizi condivisi
+(Node.services): nodi che espongono lo stesso servizio (payment,
+inventory, api, storage, ...) possono compromettersi a vicenda anche
+senza un collegamento di rete esplicito.
+
+Un indice invertito servizio -> nodi evita di materializzare O(m^2)
+coppie per i servizi molto diffusi: un servizio con più di max_pairwise
+nodi è modellato con un nodo hub virtuale collegato a ogni nodo con
+probabilità sqrt(p), così che il percorso nodo -> hub -> nodo abbia
+probabilità p come l'arco diretto. I servizi poco diffusi generano gli
+archi a coppie. Gli archi impliciti che coincidono con archi espliciti
+sono combinati come canali paralleli: 1 - (1 - p1)(1 - p2).
+
+Il risultato è una CompiledInfrastructure aumentata, usata da
+ServiceAwareASSA per i percorsi critici: gli hub non contano come salti
+e sono riportati come servizi attraversati. Lo scoring non dipende
+dalla rappresentazione (coppie o hub): ogni servizio con m nodi
+aggiunge a ciascuno di essi (m - 1) * log1p(alpha * p) al logaritmo del
+fattore di propagazione, come m - 1 vicini con probabilità p, e gli
+archi impliciti sono esclusi dal prodotto sui vicini espliciti.
+
+Author: GIST Framework Research
+License: MIT
+Version: 1.0
+"""
+
+import numpy as np
+import networkx as nx
+from scipy import sparse
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+from assa_graph import CompactInfrastructure
+from assa_sparse import (CRITICAL_TYPES, EXPOSURE_THRESHOLD, CompiledInfrastructure, SparseASSA,
+                         iter_probable_paths, symmetric_adjacency)
+
+logger = logging.getLogger(__name__)
+
+# Probabilità di movimento laterale tra due nodi che condividono il servizio
+DEFAULT_SERVICE_PROBS = {
+    'payment': 0.35,
+    'api': 0.30,
+    'storage': 0.30,
+    'web': 0.25,
+    'inventory': 0.20,
+    'backup': 0.20,
+    'routing': 0.15,
+    'firewall': 0.10,
+    'monitoring': 0.10,
+    'environmental': 0.05,
+}
+
+HUB_TYPE = 'service'
+HUB_PREFIX = 'service:'
+
+
+class ServiceIndex:
+    """
+    Indice invertito servizio -> nodi e archi impliciti di movimento laterale.
+    """
+
+    def __init__(self,
+                 infrastructure,
+                 service_probs: Optional[Dict[str, float]] = None,
+                 default_prob: float = 0.05,
+                 max_pairwise: int = 8):
+        """
+        Costruisce l'indice invertito.
+
+        Args:
+            infrastructure: Grafo networkx con nodi Node o CompactInfrastructure
+            service_probs: Probabilità per servizio (default DEFAULT_SERVICE_PROBS)
+            default_prob: Probabilità per i servizi non configurati
+            max_pairwise: Oltre questo numero di nodi il servizio usa un hub virtuale
+
+        Raises:
+            ValueError: Se probabilità fuori range
+        """
+        if isinstance(infrastructure, nx.Graph):
+            infrastructure = CompactInfrastructure.from_networkx(infrastructure)
+        self.infrastructure = infrastructure
+        self.service_probs = dict(DEFAULT_SERVICE_PROBS if service_probs is None else service_probs)
+        self.default_prob = default_prob
+        self.max_pairwise = max_pairwise
+
+        invalid = {k: v for k, v in self.service_probs.items() if not 0 <= v <= 1}
+        if invalid or not 0 <= default_prob <= 1:
+            raise ValueError(f"Probabilità di servizio fuori range [0,1]: {invalid or default_prob}")
+
+        # Inversione del CSR nodo -> servizi in servizio -> nodi
+        infra = infrastructure
+        n_services = len(infra.service_names)
+        entry_node = np.repeat(np.arange(infra.n_nodes), np.diff(infra.service_indptr))
+        order = np.argsort(infra.service_codes, kind='stable')
+        self.members = entry_node[order]
+        self.indptr = np.zeros(n_services + 1, dtype=np.int64)
+        np.cumsum(np.bincount(infra.service_codes, minlength=n_services), out=self.indptr[1:])
+        self.services = infra.service_names.tolist()
+
+    def probability(self, service: str) -> float:
+        """Probabilità di movimento laterale configurata per un servizio."""
+        return self.service_probs.get(service, self.default_prob)
+
+    def nodes_with(self, service: str) -> List[str]:
+        """Nodi che espongono un servizio."""
+        if service not in self.services:
+            return []
+        s = self.services.index(service)
+        members = self.members[self.indptr[s]:self.indptr[s + 1]]
+        return self.infrastructure.node_ids[members].tolist()
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per servizio: numero di nodi, probabilità e modalità (coppie o hub)."""
+        sizes = np.diff(self.indptr)
+        return {
+            service: {
+                'nodes': int(size),
+                'probability': self.probability(service),
+                'mode': 'hub' if size > self.max_pairwise else 'pairwise'
+            }
+            for service, size in zip(self.services, sizes)
+        }
+
+    def implicit_edges(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        """
+        Archi impliciti da servizi condivisi.
+
+        Returns:
+            (sorgenti, destinazioni, probabilità, servizi con hub); gli hub
+            hanno indici a partire da n_nodes, nell'ordine della lista
+        """
+        n = self.infrastructure.n_nodes
+        sources, targets, probs, hubs = [], [], [], []
+        for s, service in enumerate(self.services):
+            members = np.unique(self.members[self.indptr[s]:self.indptr[s + 1]])
+            p = self.probability(service)
+            if len(members) < 2 or p <= 0:
+                continue
+            if len(members) > self.max_pairwise:
+                hub = n + len(hubs)
+                hubs.append(service)
+                sources.append(members)
+                targets.append(np.full(len(members), hub))
+                probs.append(np.full(len(members), np.sqrt(p)))
+            else:
+                i, j = np.triu_indices(len(members), k=1)
+                sources.append(members[i])
+                targets.append(members[j])
+                probs.append(np.full(len(i), p))
+
+        if not sources:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0), []
+        return (np.concatenate(sources).astype(np.int64), np.concatenate(targets).astype(np.int64),
+                np.concatenate(probs), hubs)
+
+    def member_terms(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Contributo dei servizi condivisi alla propagazione di ciascun nodo.
+
+        Returns:
+            (nodi, vicini impliciti m - 1, probabilità), una voce per
+            coppia (nodo, servizio) con almeno due nodi e p > 0
+        """
+        nodes, counts, probs = [], [], []
+        for s, service in enumerate(self.services):
+            members = np.unique(self.members[self.indptr[s]:self.indptr[s + 1]])
+            p = self.probability(service)
+            if len(members) < 2 or p <= 0:
+                continue
+            nodes.append(members)
+            counts.append(np.full(len(members), len(members) - 1))
+            probs.append(np.full(len(members), p))
+
+        if not nodes:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        return (np.concatenate(nodes).astype(np.int64), np.concatenate(counts).astype(np.int64),
+                np.concatenate(probs))
+
+    def explicit_adjacency(self, n_total: int) -> sparse.csr_matrix:
+        """Adiacenza dei soli collegamenti espliciti, estesa a n_total nodi (hub isolati)."""
+        infra = self.infrastructure
+        indptr = np.concatenate([infra.indptr,
+                                 np.full(n_total - infra.n_nodes, infra.indptr[-1])])
+        return sparse.csr_matrix((np.asarray(infra.probs, dtype=float), infra.indices, indptr),
+                                 shape=(n_total, n_total))
+
+    def augment(self) -> CompiledInfrastructure:
+        """
+        Infrastruttura compilata con archi impliciti e hub virtuali.
+
+        Gli hub hanno tipo 'service', CVSS ed esposizione nulli: non
+        contribuiscono ad ASSA con uno score proprio ma amplificano quello
+        dei nodi collegati e compaiono nei percorsi critici.
+        """
+        infra = self.infrastructure
+        n = infra.n_nodes
+        sources, targets, probs, hubs = self.implicit_edges()
+
+        rows = np.repeat(np.arange(n), np.diff(infra.indptr))
+        explicit = rows <= infra.indices
+        all_sources = np.concatenate([rows[explicit], sources])
+        all_targets = np.concatenate([infra.indices[explicit].astype(np.int64), targets])
+        all_probs = np.concatenate([infra.probs[explicit], probs])
+
+        # Canali paralleli sulla stessa coppia: 1 - prod(1 - p)
+        total = n + len(hubs)
+        low = np.minimum(all_sources, all_targets)
+        high = np.maximum(all_sources, all_targets)
+        keys, inverse = np.unique(low * total + high, return_inverse=True)
+        with np.errstate(divide='ignore'):
+            log_miss = np.bincount(inverse, np.log1p(-all_probs), minlength=len(keys))
+        combined = -np.expm1(log_miss)
+
+        n_hubs = len(hubs)
+        return CompiledInfrastructure(
+            node_ids=infra.node_ids.tolist() + [HUB_PREFIX + service for service in hubs],
+            types=np.concatenate([infra.types.astype(object),
+                                  np.full(n_hubs, HUB_TYPE, dtype=object)]),
+            cvss=np.concatenate([np.asarray(infra.cvss, dtype=float), np.zeros(n_hubs)]),
+            exposure=np.concatenate([np.asarray(infra.exposure, dtype=float), np.zeros(n_hubs)]),
+            adjacency=symmetric_adjacency(keys // total, keys % total, combined, total)
+        )
+
+    def engine(self, org_factor: float = 1.0, alpha: float = 0.73) -> 'ServiceAwareASSA':
+        """Motore ASSA sull'infrastruttura aumentata con i servizi condivisi."""
+        augmented = self.augment()
+        return ServiceAwareASSA(augmented, self.explicit_adjacency(augmented.n_nodes),
+                                self.member_terms(), org_factor=org_factor, alpha=alpha)
+
+
+class ServiceAwareASSA(SparseASSA):
+    """
+    SparseASSA su un'infrastruttura aumentata con hub di servizio.
+
+    Il fattore di propagazione usa i collegamenti espliciti e il
+    contributo analitico dei servizi condivisi, quindi non dipende da
+    max_pairwise; gli score degli hub sono nulli. Nei percorsi critici
+    gli hub sono rimossi dalla sequenza dei nodi e riportati in 'services'.
+    """
+
+    def __init__(self, infrastructure: CompiledInfrastructure,
+                 explicit_adjacency: sparse.csr_matrix,
+                 service_terms: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                 org_factor: float = 1.0, alpha: float = 0.73):
+        """
+        Args:
+            infrastructure: Infrastruttura aumentata (ServiceIndex.augment)
+            explicit_adjacency: Adiacenza dei soli collegamenti espliciti
+                (ServiceIndex.explicit_adjacency)
+            service_terms: (nodi, vicini impliciti, probabilità) da
+                ServiceIndex.member_terms
+            org_factor: Fattore organizzativo
+            alpha: Fattore di amplificazione della propagazione
+        """
+        super().__init__(infrastructure, org_factor=org_factor, alpha=alpha)
+        self.is_hub = np.asarray(self.infrastructure.types == HUB_TYPE, dtype=bool)
+        self.explicit_adjacency = explicit_adjacency
+        self.service_terms = service_terms
+
+    def propagation_factors(self) -> np.ndarray:
+        """
+        Prodotto di (1 + alpha * P_ij) sui vicini espliciti per
+        (1 + alpha * p)^(m - 1) per ogni servizio condiviso con altri m - 1 nodi.
+        """
+        adjacency = self.explicit_adjacency
+        log_terms = sparse.csr_matrix(
+            (np.log1p(self.alpha * adjacency.data), adjacency.indices, adjacency.indptr),
+            shape=adjacency.shape
+        )
+        log_factors = np.asarray(log_terms.sum(axis=1)).ravel()
+        nodes, counts, probs = self.service_terms
+        log_factors += np.bincount(nodes, counts * np.log1p(self.alpha * probs),
+                                   minlength=len(log_factors))
+        return np.exp(log_factors)
+
+    def node_scores(self) -> np.ndarray:
+        """Score per nodo; gli hub (score base nullo) valgono 0."""
+        scores = self.base_scores() * self.propagation_factors() * self.org_factor
+        scores[self.is_hub] = 0.0
+        return scores
+
+    def calculate_assa(self) -> Tuple[float, Dict]:
+        """ASSA sui soli nodi reali (gli hub hanno score nullo)."""
+        scores = self.node_scores()
+        real = np.flatnonzero(~self.is_hub)
+        node_ids = [self.infrastructure.node_ids[i] for i in real]
+        return float(scores[real].sum()), dict(zip(node_ids, scores[real].tolist()))
+
+    def iter_critical_paths(self,
+                            threshold: float = 0.7,
+                            max_hops: int = 5) -> Iterator[Dict]:
+        """
+        Percorsi critici da nodi esposti a server/database, dal più probabile.
+
+        Args:
+            threshold: Soglia di probabilità del percorso (default 0.7)
+            max_hops: Numero massimo di archi tra nodi reali; il passaggio
+                nodo -> hub -> nodo conta come un solo arco
+
+        Yields:
+            Dictionary con path, services, probability e risk_score
+        """
+        infra = self.infrastructure
+        base = self.base_scores().tolist()
+        is_hub = self.is_hub
+        sources = np.flatnonzero(infra.exposure > EXPOSURE_THRESHOLD)
+        is_target = np.isin(infra.types, CRITICAL_TYPES)
+
+        # Nel caso peggiore ogni arco reale passa da un hub
+        search_hops = 2 * max_hops if is_hub.any() else max_hops
+        for path, prob in iter_probable_paths(infra.adjacency, sources, is_target,
+                                              threshold, search_hops):
+            real = [i for i in path if not is_hub[i]]
+            if len(real) - 1 > max_hops:
+                continue
+            total_risk = 0
+            for i in real:
+                total_risk += base[i]
+            yield {
+                'path': [infra.node_ids[i] for i in real],
+                'services': [infra.node_ids[i][len(HUB_PREFIX):] for i in path if is_hub[i]],
+                'probability': prob,
+                'risk_score': total_risk / len(real)
+            }
@@ -14,14 +14,74 @@ Version: 1.0
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from statistics import NormalDist
+from typing import Dict, Iterator, List, Tuple, Optional, Union
+from pandas.api.types import union_categoricals
+import importlib.util
 import json
+import os
+import shutil
 import logging
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CHUNK_GRANULARITIES = ('store_day', 'store_month', 'store')
+
+# Formato colonnare: tabelle, partizioni ed estensione dei file
+DATASET_TABLES = ('transactions', 'security_events')
+PARTITION_COLUMNS = ('store_id', 'month')
+COLUMNAR_FORMATS = {'parquet': '.parquet', 'feather': '.feather'}
+COMPACT_DTYPES = {'amount': np.float32, 'items_count': np.uint8}
+
+
+def _require_pyarrow() -> None:
+    """Verifica che pyarrow, necessario per il formato colonnare, sia installato"""
+    if importlib.util.find_spec('pyarrow') is None:
+        raise ImportError(
+            "Il formato colonnare (Parquet/Feather) richiede pyarrow: pip install pyarrow"
+        )
+
+
+def sample_discrete(rng: np.random.Generator, n: int, probabilities) -> np.ndarray:
+    """
+    n indici da una distribuzione discreta con poche classi
+
+    Inversione della funzione di ripartizione per confronto con le soglie
+    cumulative (una passata vettoriale per classe, uniformi float32): per
+    le distribuzioni del digital twin è più rapida della ricerca binaria e
+    della tabella alias. Le classi oltre la risoluzione float32 della coda
+    sono trascurate.
+
+    Returns:
+        Indici uint8 delle classi
+    """
+    cumulative = np.cumsum(probabilities, dtype=float)
+    thresholds = (cumulative / cumulative[-1])[:-1].astype(np.float32)
+    thresholds = thresholds[thresholds < 1.0]
+    u = rng.random(n, dtype=np.float32)
+    codes = np.zeros(n, dtype=np.uint8)
+    for threshold in thresholds:
+        codes += u >= threshold
+    return codes
+
+
+@lru_cache(maxsize=None)
+def _categorical_dtype(categories: Tuple[str, ...], ordered: bool) -> pd.CategoricalDtype:
+    return pd.CategoricalDtype(list(categories), ordered=ordered)
+
+
+def categorical_column(codes: np.ndarray, categories, ordered: bool = False) -> pd.Categorical:
+    """Colonna categorica da codici, con dtype costruito una sola volta per insieme di categorie"""
+    return pd.Categorical.from_codes(codes, dtype=_categorical_dtype(tuple(categories), ordered))
+
+
 class TransactionGenerator:
     """
     Genera transazioni giornaliere con pattern realistici
@@ -63,8 +123,32 @@ class TransactionGenerator:
             }
         }
 
+    # Fattori di calendario precalcolati (indice: giorno della settimana, mese)
+    DAY_FACTORS = np.array([
+        1.0,    # Lunedì
+        0.85,   # Martedì
+        0.90,   # Mercoledì
+        0.95,   # Giovedì
+        1.15,   # Venerdì
+        1.35,   # Sabato
+        0.75    # Domenica
+    ])
+    SEASONAL_FACTORS = np.array([
+        1.0,                       # indice 0 non usato
+        0.85, 0.80, 0.95, 1.05,
+        1.10, 1.15, 1.20, 1.10,
+        1.05, 1.10, 1.25, 1.35
+    ])
+
+    # Distribuzioni categoriche (metodo di pagamento italiano, tipologia cliente)
+    PAYMENT_METHODS = ['cash', 'card', 'digital_wallet', 'contactless']
+    PAYMENT_PROBABILITIES = [0.31, 0.45, 0.14, 0.10]
+    CUSTOMER_TYPES = ['regular', 'premium', 'occasional', 'business']
+    CUSTOMER_PROBABILITIES = [0.60, 0.15, 0.20, 0.05]
+
     def generate_daily_pattern(self, store_id: str, date: datetime,
-                             store_type: str = 'media') -> pd.DataFrame:
+                             store_type: str = 'media',
+                             rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
         """
         Genera transazioni giornaliere con pattern realistico
 
@@ -72,92 +156,146 @@ class TransactionGenerator:
             store_id: Identificativo del punto vendita
             date: Data per cui generare le transazioni
             store_type: Tipologia di store (micro, piccola, media, grande, enterprise)
+            rng: Generatore casuale (default derivato dallo stato globale di np.random)
 
         Returns:
             DataFrame con transazioni generate
         """
-        profile = self.config['store_profiles'][store_type]
-        base_trans = profile['avg_daily_transactions']
+        return self.generate_period(store_id, date, 1, store_type, rng)
 
-        # Fattori moltiplicativi
-        day_factor = self._get_day_factor(date.weekday())
-        season_factor = self._get_seasonal_factor(date.month)
+    def generate_period(self, store_id: str, start_date: datetime, n_days: int,
+                        store_type: str = 'media',
+                        rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+        """
+        Genera le transazioni di un punto vendita per n_days giorni consecutivi
+
+        Tutte le colonne del periodo (es. un anno di uno store enterprise)
+        sono estratte come array NumPy in poche chiamate vettoriali, con le
+        stesse distribuzioni del modello giornaliero: numero di transazioni
+        normale attorno alla media del profilo per i fattori di calendario,
+        ora bimodale, importo log-normale, articoli Poisson.
 
-        # Numero transazioni con variazione stocastica
-        n_transactions = int(
-            base_trans * day_factor * season_factor *
-            np.random.normal(1.0, profile['variance'])
+        Args:
+            store_id: Identificativo del punto vendita
+            start_date: Primo giorno (ore e minuti sono sostituiti)
+            n_days: Numero di giorni
+            store_type: Tipologia di store
+            rng: Generatore casuale (default derivato dallo stato globale di np.random)
+
+        Returns:
+            DataFrame con transazioni in ordine di giorno; colonne categoriche
+            per store_id, payment_method e customer_type
+        """
+        if rng is None:
+            # Riproducibile con np.random.seed come il generatore originale
+            rng = np.random.default_rng(np.random.randint(2**32, dtype=np.uint64))
+        return self.to_frame(self.generate_columns(start_date, n_days, store_type, rng), store_id)
+
+    def generate_columns(self, start_date: datetime, n_days: int, store_type: str,
+                         rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        """
+        Colonne delle transazioni di generate_period come array NumPy
+
+        Le colonne categoriche sono codici int8 (vedi to_frame); più
+        blocchi di colonne possono essere concatenati prima di costruire
+        un unico DataFrame.
+        """
+        profile = self.config['store_profiles'][store_type]
+
+        # Numero di transazioni per giorno (troncamento come int())
+        days = np.datetime64(start_date.date(), 'D') + np.arange(n_days)
+        weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 era giovedì
+        month = days.astype('datetime64[M]').astype(np.int64) % 12 + 1
+        expected = (profile['avg_daily_transactions'] * self.DAY_FACTORS[weekday]
+                    * self.SEASONAL_FACTORS[month])
+        per_day = np.maximum(
+            (expected * rng.normal(1.0, profile['variance'], n_days)).astype(np.int64), 0
         )
+        n = int(per_day.sum())
 
-        transactions = []
-        for i in range(n_transactions):
-            # Distribuzione oraria bimodale (11-13 e 17-20)
-            hour = self._generate_bimodal_hour()
-            minute = np.random.randint(0, 60)
-
-            transaction = {
-                'store_id': store_id,
-                'timestamp': date.replace(hour=hour, minute=minute),
-                'amount': self._generate_amount_lognormal(
-                    profile['avg_transaction_value']
-                ),
-                'payment_method': self._select_payment_method(),
-                'items_count': max(1, np.random.poisson(4.5)),
-                'customer_type': self._select_customer_type()
-            }
-            transactions.append(transaction)
+        # Timestamp: giorno + ora bimodale + minuto (secondi del giorno di partenza conservati)
+        first = np.datetime64(start_date.replace(hour=0, minute=0), 'ns').astype(np.int64)
+        timestamps = np.repeat(first + np.arange(n_days, dtype=np.int64) * 86_400_000_000_000, per_day)
+        minutes = self._minutes_of_day(rng, n)
+        minutes *= 60_000_000_000
+        timestamps += minutes
 
-        return pd.DataFrame(transactions)
+        return {
+            'timestamp': timestamps.view('datetime64[ns]'),
+            'amount': self._lognormal_amounts(rng, profile['avg_transaction_value'], n),
+            'payment_method': self._categorical(rng, n, self.PAYMENT_PROBABILITIES),
+            'items_count': self._items_counts(rng, n),
+            'customer_type': self._categorical(rng, n, self.CUSTOMER_PROBABILITIES)
+        }
+
+    def to_frame(self, columns: Dict[str, np.ndarray], store_id: str) -> pd.DataFrame:
+        """DataFrame delle transazioni da colonne di generate_columns."""
+        n = len(columns['timestamp'])
+        return pd.DataFrame({
+            'store_id': categorical_column(np.zeros(n, dtype=np.int8), (store_id,)),
+            'timestamp': columns['timestamp'],
+            'amount': columns['amount'],
+            'payment_method': categorical_column(columns['payment_method'], self.PAYMENT_METHODS),
+            'items_count': columns['items_count'],
+            'customer_type': categorical_column(columns['customer_type'], self.CUSTOMER_TYPES)
+        })
 
     def _get_day_factor(self, weekday: int) -> float:
         """Fattore moltiplicativo per giorno della settimana"""
-        factors = {
-            0: 1.0,    # Lunedì
-            1: 0.85,   # Martedì
-            2: 0.90,   # Mercoledì
-            3: 0.95,   # Giovedì
-            4: 1.15,   # Venerdì
-            5: 1.35,   # Sabato
-            6: 0.75    # Domenica
-        }
-        return factors.get(weekday, 1.0)
+        return float(self.DAY_FACTORS[weekday]) if 0 <= weekday < 7 else 1.0
 
     def _get_seasonal_factor(self, month: int) -> float:
         """Fattore stagionale per mese"""
-        factors = {
-            1: 0.85, 2: 0.80, 3: 0.95, 4: 1.05,
-            5: 1.10, 6: 1.15, 7: 1.20, 8: 1.10,
-            9: 1.05, 10: 1.10, 11: 1.25, 12: 1.35
-        }
-        return factors.get(month, 1.0)
+        return float(self.SEASONAL_FACTORS[month]) if 1 <= month <= 12 else 1.0
 
-    def _generate_bimodal_hour(self) -> int:
-        """Distribuzione bimodale picchi 11-13 e 17-20"""
-        if np.random.random() < 0.45:
-            # Picco mattutino
-            return max(8, min(13, int(np.random.normal(11.5, 1.5))))
-        else:
-            # Picco serale
-            return max(16, min(21, int(np.random.normal(18.5, 1.5))))
-
-    def _generate_amount_lognormal(self, mean_amount: float) -> float:
-        """Genera importo con distribuzione log-normale"""
+    @staticmethod
+    def _hour_distribution() -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distribuzione esatta delle ore del modello bimodale: picco mattutino
+        (45%) int(N(11.5, 1.5)) limitato a 8-13, picco serale
+        int(N(18.5, 1.5)) limitato a 16-21
+        """
+        hours, probabilities = [], []
+        for weight, mean, low, high in ((0.45, 11.5, 8, 13), (0.55, 18.5, 16, 21)):
+            normal = NormalDist(mean, 1.5)
+            edges = [0.0] + [normal.cdf(h) for h in range(low + 1, high + 1)] + [1.0]
+            hours.extend(range(low, high + 1))
+            probabilities.extend(weight * np.diff(edges))
+        return np.array(hours), np.array(probabilities)
+
+    @classmethod
+    def _minutes_of_day(cls, rng: np.random.Generator, n: int) -> np.ndarray:
+        """Minuto del giorno: ora bimodale e minuto uniforme"""
+        hours, probabilities = cls._hour_distribution()
+        k = sample_discrete(rng, n, probabilities)
+        return hours[k] * 60 + rng.integers(0, 60, n)
+
+    @staticmethod
+    def _items_counts(rng: np.random.Generator, n: int, mean: float = 4.5) -> np.ndarray:
+        """max(1, Poisson(mean)); la coda oltre 63 articoli è trascurata"""
+        k = np.arange(64)
+        pmf = np.exp(k * np.log(mean) - mean - np.cumsum(np.log(np.maximum(k, 1))))
+        return np.maximum(sample_discrete(rng, n, pmf), 1)
+
+    @staticmethod
+    def _lognormal_amounts(rng: np.random.Generator, mean_amount: float, n: int) -> np.ndarray:
+        """Genera importi con distribuzione log-normale"""
         sigma = 0.6
         mu = np.log(mean_amount) - 0.5 * sigma**2
-        amount = np.random.lognormal(mu, sigma)
-        return round(max(1.0, amount), 2)
-
-    def _select_payment_method(self) -> str:
-        """Seleziona metodo di pagamento secondo distribuzione italiana"""
-        methods = ['cash', 'card', 'digital_wallet', 'contactless']
-        probabilities = [0.31, 0.45, 0.14, 0.10]
-        return np.random.choice(methods, p=probabilities)
-
-    def _select_customer_type(self) -> str:
-        """Seleziona tipologia cliente"""
-        types = ['regular', 'premium', 'occasional', 'business']
-        probabilities = [0.60, 0.15, 0.20, 0.05]
-        return np.random.choice(types, p=probabilities)
+        amounts = rng.standard_normal(n)
+        amounts *= sigma
+        amounts += mu
+        np.exp(amounts, out=amounts)
+        np.maximum(amounts, 1.0, out=amounts)
+        amounts *= 100
+        np.rint(amounts, out=amounts)
+        amounts /= 100
+        return amounts
+
+    @staticmethod
+    def _categorical(rng: np.random.Generator, n: int, probabilities: List[float]) -> np.ndarray:
+        """Codici int8 di un'estrazione categorica vettoriale"""
+        return sample_discrete(rng, n, probabilities).astype(np.int8)
 
 
 class SecurityEventGenerator:
@@ -165,6 +303,10 @@ class SecurityEventGenerator:
     Genera eventi di sicurezza seguendo distribuzione ENISA
     """
 
+    SEVERITY_LEVELS = ['low', 'medium', 'high', 'critical']
+    AFFECTED_SYSTEMS = ['pos', 'server', 'network', 'database', 'iot_device']
+    SYSTEM_PROBABILITIES = [0.35, 0.25, 0.20, 0.15, 0.05]
+
     def __init__(self):
         # Distribuzione threat landscape da ENISA 2023
         self.threat_distribution = {
@@ -178,99 +320,486 @@ class SecurityEventGenerator:
             'other': 0.04
         }
 
+        self.severity_map = {
+            'malware': 'high',
+            'phishing': 'medium',
+            'dos_ddos': 'high',
+            'data_breach': 'critical',
+            'insider_threat': 'medium',
+            'supply_chain': 'high',
+            'physical_attack': 'medium',
+            'other': 'low'
+        }
+
         self.config = {
             'daily_security_events': 8.5,  # Media eventi per punto vendita
             'false_positive_rate': 0.87    # Tasso FP da ENISA
         }
 
-    def generate_security_events(self, n_hours: int, store_id: str) -> pd.DataFrame:
+    def hourly_rates(self) -> np.ndarray:
+        """Rate di Poisson per ora del giorno (notte ridotta, ore di punta aumentate)"""
+        rates = np.full(24, self.config['daily_security_events'] / 24)
+        rates[[2, 3, 4]] *= 0.3        # Ore notturne
+        rates[[9, 10, 14, 15]] *= 1.5  # Ore di punta
+        return rates
+
+    def generate_security_events(self, n_hours: int, store_id: str,
+                                 start: Optional[datetime] = None,
+                                 rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
         """
-        Genera eventi di sicurezza seguendo processo di Poisson
+        Genera eventi di sicurezza seguendo processo di Poisson non omogeneo
+
+        I conteggi di tutte le ore sono estratti insieme e gli attributi
+        degli eventi (minaccia, sistema, esito, escalation) come vettori.
 
         Args:
-            n_hours: Numero di ore da simulare
+            n_hours: Numero di ore da simulare (anche più giorni)
             store_id: Identificativo punto vendita
+            start: Inizio della simulazione, allineato alla mezzanotte
+                (default oggi), così che gli eventi siano unibili alle
+                transazioni dello stesso giorno
+            rng: Generatore casuale (default derivato dallo stato globale di np.random)
 
         Returns:
-            DataFrame con eventi generati
+            DataFrame con eventi generati; source_ip come uint32
+            (vedi format_ip), colonne categoriche per store_id,
+            threat_type, severity (ordinata) e affected_system
         """
-        events = []
-        base_rate = self.config['daily_security_events'] / 24
-
-        for hour in range(n_hours):
-            # Poisson non omogeneo con rate variabile
-            if hour in [2, 3, 4]:  # Ore notturne
-                rate = base_rate * 0.3
-            elif hour in [9, 10, 14, 15]:  # Ore di punta
-                rate = base_rate * 1.5
-            else:
-                rate = base_rate
-
-            n_events = np.random.poisson(rate)
-
-            for _ in range(n_events):
-                # Genera evento secondo distribuzione ENISA
-                threat_type = np.random.choice(
-                    list(self.threat_distribution.keys()),
-                    p=list(self.threat_distribution.values())
-                )
+        if rng is None:
+            rng = np.random.default_rng(np.random.randint(2**32, dtype=np.uint64))
+        start = start or datetime.now()
+        return self.to_frame(self.generate_columns(n_hours, start, rng), store_id)
 
-                event = self._create_security_event(threat_type, hour, store_id)
+    def generate_columns(self, n_hours: int, start: datetime,
+                         rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        """
+        Colonne degli eventi di generate_security_events come array NumPy
 
-                # Determina se true positive o false positive
-                if np.random.random() > self.config['false_positive_rate']:
-                    event['is_incident'] = True
-                    event['severity'] = self._escalate_severity(event['severity'])
-                else:
-                    event['is_incident'] = False
+        Le colonne categoriche sono codici int8 (vedi to_frame).
+        """
+        start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        counts = rng.poisson(self.hourly_rates()[np.arange(n_hours) % 24])
+        n = int(counts.sum())
+        hours = np.repeat(np.arange(n_hours, dtype=np.int64), counts)
 
-                events.append(event)
+        # Istante uniforme all'interno dell'ora
+        offsets = hours * 3_600_000_000 + rng.integers(0, 3_600_000_000, n)
+        timestamps = np.datetime64(start, 'us') + offsets.astype('timedelta64[us]')
 
-        return pd.DataFrame(events)
+        threat = sample_discrete(rng, n, list(self.threat_distribution.values()))
+        base_severity = np.array([self.SEVERITY_LEVELS.index(self.severity_map.get(t, 'low'))
+                                  for t in self.threat_distribution], dtype=np.int8)
 
-    def _create_security_event(self, threat_type: str, hour: int,
-                             store_id: str) -> Dict:
-        """Crea evento di sicurezza specifico"""
-        severity_map = {
-            'malware': 'high',
-            'phishing': 'medium',
-            'dos_ddos': 'high',
-            'data_breach': 'critical',
-            'insider_threat': 'medium',
-            'supply_chain': 'high',
-            'physical_attack': 'medium',
-            'other': 'low'
-        }
+        # True positive con probabilità 1 - FP rate: severità aumentata di un livello
+        is_incident = rng.random(n) > self.config['false_positive_rate']
+        severity = np.minimum(base_severity[threat] + is_incident, len(self.SEVERITY_LEVELS) - 1)
 
         return {
-            'store_id': store_id,
-            'timestamp': datetime.now().replace(hour=hour),
-            'threat_type': threat_type,
-            'severity': severity_map.get(threat_type, 'low'),
-            'source_ip': self._generate_ip(),
-            'affected_system': self._select_affected_system(),
-            'is_incident': False  # Verrà determinato dal chiamante
+            'timestamp': timestamps.astype('datetime64[ns]'),
+            'threat_type': threat.astype(np.int8),
+            'severity': severity.astype(np.int8),
+            'source_ip': self._generate_ips(rng, n),
+            'affected_system': sample_discrete(rng, n, self.SYSTEM_PROBABILITIES).astype(np.int8),
+            'is_incident': is_incident
         }
 
+    def to_frame(self, columns: Dict[str, np.ndarray], store_id: str) -> pd.DataFrame:
+        """DataFrame degli eventi da colonne di generate_columns."""
+        n = len(columns['timestamp'])
+        return pd.DataFrame({
+            'store_id': categorical_column(np.zeros(n, dtype=np.int8), (store_id,)),
+            'timestamp': columns['timestamp'],
+            'threat_type': categorical_column(columns['threat_type'], self.threat_distribution),
+            'severity': categorical_column(columns['severity'], self.SEVERITY_LEVELS, ordered=True),
+            'source_ip': columns['source_ip'],
+            'affected_system': categorical_column(columns['affected_system'], self.AFFECTED_SYSTEMS),
+            'is_incident': columns['is_incident']
+        })
+
     def _escalate_severity(self, base_severity: str) -> str:
         """Escalation della severità per incidenti reali"""
-        escalation = {
-            'low': 'medium',
-            'medium': 'high',
-            'high': 'critical',
-            'critical': 'critical'
+        levels = self.SEVERITY_LEVELS
+        if base_severity not in levels:
+            return base_severity
+        return levels[min(levels.index(base_severity) + 1, len(levels) - 1)]
+
+    @staticmethod
+    def _generate_ips(rng: np.random.Generator, n: int) -> np.ndarray:
+        """IP address casuali (ottetti 1-254) codificati come uint32"""
+        octets = rng.integers(1, 255, size=(n, 4), dtype=np.uint8)
+        return octets.view('>u4').ravel().astype(np.uint32)
+
+    @staticmethod
+    def format_ip(ips) -> np.ndarray:
+        """Notazione puntata di IP codificati come uint32"""
+        ips = np.asarray(ips, dtype=np.uint32)
+        octets = [(ips >> shift) & 0xFF for shift in (24, 16, 8, 0)]
+        dotted = octets[0].astype(str)
+        for octet in octets[1:]:
+            dotted = np.char.add(np.char.add(dotted, '.'), octet.astype(str))
+        return dotted
+
+
+def store_day_rng(entropy: int, store_idx: int, day: int) -> np.random.Generator:
+    """
+    Stream casuale della coppia (store, giorno)
+
+    Il figlio è identificato dallo spawn_key, quindi è lo stesso
+    indipendentemente dall'ordine o dal processo in cui viene creato.
+    """
+    return np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(store_idx, day)))
+
+
+@dataclass
+class DatasetChunk:
+    """Blocco del dataset: transazioni ed eventi di un punto vendita in un periodo"""
+    store_id: str
+    store_type: str
+    start: datetime
+    n_days: int
+    transactions: pd.DataFrame
+    security_events: pd.DataFrame
+
+
+def _generate_chunk(task: Dict) -> DatasetChunk:
+    """Genera un blocco (store, intervallo di giorni) (eseguita nei worker)."""
+    transaction_gen, security_gen = task['transaction_gen'], task['security_gen']
+    transactions, security_events = [], []
+    for day in range(task['first_day'], task['first_day'] + task['n_days']):
+        rng = store_day_rng(task['entropy'], task['store_idx'], day)
+        current_date = task['start_date'] + timedelta(days=day)
+        transactions.append(transaction_gen.generate_columns(current_date, 1, task['store_type'], rng))
+        security_events.append(security_gen.generate_columns(24, current_date, rng))
+
+    # Un solo DataFrame per blocco: i giorni sono concatenati come array
+    return DatasetChunk(
+        store_id=task['store_id'],
+        store_type=task['store_type'],
+        start=task['start_date'] + timedelta(days=task['first_day']),
+        n_days=task['n_days'],
+        transactions=transaction_gen.to_frame(_concat_columns(transactions), task['store_id']),
+        security_events=security_gen.to_frame(_concat_columns(security_events), task['store_id'])
+    )
+
+
+def _concat_columns(blocks: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    return {column: np.concatenate([block[column] for block in blocks]) for column in blocks[0]}
+
+
+def _concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatena mantenendo categoriche le colonne con categorie diverse (es. store_id)."""
+    if not frames:
+        return pd.DataFrame()
+    result = pd.concat(frames, ignore_index=True)
+    for column in frames[0].columns:
+        if (isinstance(frames[0][column].dtype, pd.CategoricalDtype)
+                and not isinstance(result[column].dtype, pd.CategoricalDtype)):
+            result[column] = union_categoricals([frame[column] for frame in frames])
+    return result
+
+
+class ValidationAccumulator:
+    """
+    Statistiche di validazione accumulate blocco per blocco
+
+    Conserva solo conteggi (prime cifre degli importi, transazioni per ora,
+    valori mancanti), quindi la validazione di un dataset generato in
+    streaming usa memoria costante e dà lo stesso risultato della
+    validazione sul dataset completo.
+    """
+
+    def __init__(self):
+        self.first_digits = np.zeros(10, dtype=np.int64)
+        self.hours = np.zeros(24, dtype=np.int64)
+        self.missing = 0
+        self.cells = 0
+
+    def update(self, transactions: pd.DataFrame) -> None:
+        """Aggiunge un blocco di transazioni."""
+        amounts = transactions['amount'].to_numpy(dtype=float)
+        positive = amounts[amounts > 0]
+        # Prima cifra significativa (gli importi non positivi contano come 1)
+        digits = (positive / 10.0 ** np.floor(np.log10(positive))).astype(np.int64)
+        self.first_digits += np.bincount(np.clip(digits, 1, 9), minlength=10)
+        self.first_digits[1] += len(amounts) - len(positive)
+
+        hours = transactions['timestamp'].dt.hour.dropna().to_numpy(dtype=np.int64)
+        self.hours += np.bincount(hours, minlength=24)
+
+        self.missing += int(transactions.isnull().sum().sum())
+        self.cells += transactions.size
+
+    def results(self) -> Dict:
+        """Risultati dei test nel formato di GDODigitalTwin._validate_dataset."""
+        from scipy import stats
+
+        results = {}
+        n = self.first_digits[1:].sum()
+
+        # Test Benford's Law sugli importi
+        benford_expected = [np.log10(1 + 1/d) for d in range(1, 10)]
+        benford_observed = self.first_digits[1:] / n
+        chi2, p_benford = stats.chisquare(benford_observed, benford_expected)
+        results['benford_law'] = {'chi2': chi2, 'p_value': p_benford, 'pass': p_benford > 0.05}
+
+        # Test distribuzione oraria (deve essere non-uniforme)
+        hourly_dist = self.hours[self.hours > 0]
+        chi2_hour, p_hour = stats.chisquare(hourly_dist)
+        results['hourly_distribution'] = {'chi2': chi2_hour, 'p_value': p_hour, 'pass': p_hour < 0.05}
+
+        # Completezza dati
+        missing_rate = self.missing / self.cells
+        results['data_completeness'] = {'missing_rate': missing_rate, 'pass': missing_rate < 0.01}
+
+        # Calcola pass rate complessivo
+        passed = sum(1 for test in results.values() if test['pass'])
+        total = len(results)
+        results['overall_pass_rate'] = passed / total
+
+        return results
+
+
+class DatasetSink(ABC):
+    """
+    Destinazione dei blocchi generati in streaming
+
+    write() riceve ogni blocco appena prodotto e non deve conservarlo;
+    close() riceve i metadati finali (configurazione, conteggi, validazione).
+    """
+
+    @abstractmethod
+    def write(self, chunk: DatasetChunk) -> None:
+        """Scrive un blocco generato"""
+
+    def close(self, metadata: Dict) -> None:
+        pass
+
+
+class CSVSink(DatasetSink):
+    """Accoda i blocchi a transactions.csv e security_events.csv in una directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.files = {
+            name: os.path.join(directory, f"{name}.csv")
+            for name in ('transactions', 'security_events')
         }
-        return escalation.get(base_severity, base_severity)
+        self._header = {name: True for name in self.files}
+
+    def write(self, chunk: DatasetChunk) -> None:
+        self.write_frames(chunk.transactions, chunk.security_events)
+
+    def write_frames(self, transactions: pd.DataFrame, security_events: pd.DataFrame) -> None:
+        """Accoda transazioni ed eventi di uno o più store."""
+        events = security_events
+        frames = {
+            'transactions': transactions,
+            'security_events': events.assign(
+                source_ip=SecurityEventGenerator.format_ip(events['source_ip'])
+            )
+        }
+        for name, frame in frames.items():
+            frame.to_csv(self.files[name], mode='w' if self._header[name] else 'a',
+                         header=self._header[name], index=False)
+            self._header[name] = False
 
-    def _generate_ip(self) -> str:
-        """Genera IP address casuale"""
-        return f"{np.random.randint(1,255)}.{np.random.randint(1,255)}.{np.random.randint(1,255)}.{np.random.randint(1,255)}"
+    def close(self, metadata: Dict) -> None:
+        with open(os.path.join(self.directory, 'metadata.json'), 'w') as f:
+            json.dump(metadata, f, indent=2, default=str)
 
-    def _select_affected_system(self) -> str:
-        """Seleziona sistema affetto"""
-        systems = ['pos', 'server', 'network', 'database', 'iot_device']
-        probabilities = [0.35, 0.25, 0.20, 0.15, 0.05]
-        return np.random.choice(systems, p=probabilities)
+
+class ColumnarSink(DatasetSink):
+    """
+    Dataset colonnare Parquet o Feather partizionato per store e mese
+
+    Layout: <directory>/<tabella>/store_id=<id>/month=<AAAA-MM>/part-*.<ext>
+    (partizionamento hive). Le colonne categoriche sono codificate a
+    dizionario, i timestamp restano datetime64[ns], gli importi sono
+    float32 (centesimi esatti fino a 10^5) e gli articoli uint8. Si
+    rilegge con load_dataset, che sfrutta le partizioni per i filtri su
+    store e date.
+    """
+
+    def __init__(self, directory: str, format: str = 'parquet', compression: str = 'zstd'):
+        """
+        Args:
+            directory: Directory del dataset; le tabelle già presenti sono sostituite
+            format: 'parquet' o 'feather'
+            compression: Codec di compressione (es. 'zstd', 'lz4', 'snappy')
+
+        Raises:
+            ValueError: Se formato non supportato
+            ImportError: Se pyarrow non è installato
+        """
+        _require_pyarrow()
+        import pyarrow.dataset as ds
+
+        if format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Formato non supportato: {format}")
+        self.directory = directory
+        self.format = format
+        self.compression = compression
+        self.parts = 0
+
+        file_format = ds.ParquetFileFormat() if format == 'parquet' else ds.IpcFileFormat()
+        self._file_format = file_format
+        self._write_options = file_format.make_write_options(compression=compression)
+        self._partitioning = ds.partitioning(_partition_schema(), flavor='hive')
+
+        for table in DATASET_TABLES:
+            path = os.path.join(directory, table)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, chunk: DatasetChunk) -> None:
+        self.write_frames(chunk.transactions, chunk.security_events)
+
+    def write_frames(self, transactions: pd.DataFrame, security_events: pd.DataFrame) -> None:
+        """Scrive transazioni ed eventi di uno o più store, ripartiti per store e mese."""
+        import pyarrow.dataset as ds
+
+        extension = COLUMNAR_FORMATS[self.format]
+        for name, frame in zip(DATASET_TABLES, (transactions, security_events)):
+            # Uno store per scrittura: le partizioni aperte sono i suoi mesi,
+            # qualunque sia il numero di store del frame
+            for _, store_frame in frame.groupby('store_id', observed=True, sort=False):
+                table, n_partitions = _columnar_table(store_frame)
+                ds.write_dataset(
+                    table, os.path.join(self.directory, name),
+                    format=self._file_format, file_options=self._write_options,
+                    partitioning=self._partitioning,
+                    basename_template=f"part-{self.parts:06d}-{{i}}{extension}",
+                    existing_data_behavior='overwrite_or_ignore',
+                    max_partitions=n_partitions, max_open_files=n_partitions
+                )
+        self.parts += 1
+
+    def close(self, metadata: Dict) -> None:
+        storage = {'format': self.format, 'compression': self.compression,
+                   'partitioning': list(PARTITION_COLUMNS)}
+        with open(os.path.join(self.directory, 'metadata.json'), 'w') as f:
+            json.dump({**metadata, 'storage': storage}, f, indent=2, default=str)
+
+
+def _partition_schema():
+    import pyarrow as pa
+    return pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS])
+
+
+def _columnar_table(frame: pd.DataFrame):
+    """
+    Tabella Arrow con tipi compatti e colonne di partizione store_id/month
+
+    Returns:
+        (tabella, numero di partizioni store/mese)
+    """
+    import pyarrow as pa
+
+    frame = frame.astype({column: dtype for column, dtype in COMPACT_DTYPES.items()
+                          if column in frame.columns})
+    months, inverse = np.unique(frame['timestamp'].to_numpy().astype('datetime64[M]'),
+                                return_inverse=True)
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.set_column(table.schema.get_field_index('store_id'), 'store_id',
+                             table['store_id'].cast(pa.string()))
+    month = pa.DictionaryArray.from_arrays(pa.array(inverse.astype(np.int32)),
+                                           pa.array(np.datetime_as_string(months, unit='M')))
+    n_partitions = len(frame['store_id'].unique()) * len(months)
+    return table.append_column('month', month.cast(pa.string())), n_partitions
+
+
+def _dataset_categories() -> Dict[str, Dict[str, Tuple[List[str], bool]]]:
+    """Categorie (e ordinamento) delle colonne categoriche di ogni tabella."""
+    security = SecurityEventGenerator()
+    return {
+        'transactions': {
+            'payment_method': (TransactionGenerator.PAYMENT_METHODS, False),
+            'customer_type': (TransactionGenerator.CUSTOMER_TYPES, False)
+        },
+        'security_events': {
+            'threat_type': (list(security.threat_distribution), False),
+            'severity': (security.SEVERITY_LEVELS, True),
+            'affected_system': (security.AFFECTED_SYSTEMS, False)
+        }
+    }
+
+
+def load_dataset(directory: str,
+                 stores: Optional[List[str]] = None,
+                 start: Optional[Union[str, datetime]] = None,
+                 end: Optional[Union[str, datetime]] = None,
+                 tables: Tuple[str, ...] = DATASET_TABLES) -> Dict:
+    """
+    Carica un dataset scritto da ColumnarSink (o da _save_dataset)
+
+    I filtri su store e mese escludono intere partizioni senza leggerle;
+    il filtro sui timestamp è applicato durante la scansione usando le
+    statistiche dei file.
+
+    Args:
+        directory: Directory del dataset
+        stores: store_id da caricare (default tutti)
+        start: Primo istante incluso (default nessun limite)
+        end: Primo istante escluso (default nessun limite)
+        tables: Tabelle da caricare ('transactions', 'security_events')
+
+    Returns:
+        Dictionary nel formato di generate_demo_dataset: una chiave per
+        tabella, in ordine di store_id e periodo, più i metadati salvati
+
+    Raises:
+        ValueError: Se tabella sconosciuta
+        ImportError: Se pyarrow non è installato
+    """
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    unknown = [table for table in tables if table not in DATASET_TABLES]
+    if unknown:
+        raise ValueError(f"Tabelle non riconosciute: {unknown}")
+
+    dataset = {}
+    meta_file = os.path.join(directory, 'metadata.json')
+    if os.path.exists(meta_file):
+        with open(meta_file) as f:
+            dataset.update(json.load(f))
+    file_format = 'ipc' if dataset.get('storage', {}).get('format') == 'feather' else 'parquet'
+
+    conditions = []
+    if stores is not None:
+        conditions.append(ds.field('store_id').isin(list(stores)))
+    if start is not None:
+        start = pd.Timestamp(start).as_unit('ns')
+        conditions.append(ds.field('month') >= start.strftime('%Y-%m'))
+        conditions.append(ds.field('timestamp') >= pa.scalar(start.to_datetime64()))
+    if end is not None:
+        end = pd.Timestamp(end).as_unit('ns')
+        conditions.append(ds.field('month') <= end.strftime('%Y-%m'))
+        conditions.append(ds.field('timestamp') < pa.scalar(end.to_datetime64()))
+    condition = None
+    for expression in conditions:
+        condition = expression if condition is None else condition & expression
+
+    categories = _dataset_categories()
+    partitioning = ds.partitioning(_partition_schema(), flavor='hive')
+    for name in tables:
+        path = os.path.join(directory, name)
+        if not os.path.isdir(path):
+            dataset[name] = pd.DataFrame()
+            continue
+        table = ds.dataset(path, format=file_format, partitioning=partitioning).to_table(
+            filter=condition)
+        frame = table.drop_columns(['month']).to_pandas()
+        frame = frame[['store_id'] + [c for c in frame.columns if c != 'store_id']]
+        frame['store_id'] = frame['store_id'].astype('category')
+        for column, (values, ordered) in categories[name].items():
+            frame[column] = frame[column].astype(_categorical_dtype(tuple(values), ordered))
+        dataset[name] = frame
+
+    return dataset
 
 
 class GDODigitalTwin:
@@ -301,48 +830,41 @@ class GDODigitalTwin:
         }
 
     def generate_demo_dataset(self, n_stores: int = 10, n_days: int = 30,
-                            validate: bool = True, save: bool = False) -> Dict:
+                            validate: bool = True, save: bool = False,
+                            seed: Optional[int] = None, n_jobs: Optional[int] = 1,
+                            start_date: Optional[datetime] = None) -> Dict:
         """
         Genera dataset dimostrativo
 
+        Ogni coppia (store, giorno) ha un proprio stream casuale, figlio del
+        seme principale tramite SeedSequence: i punti vendita possono essere
+        generati su un pool di processi e il risultato è identico bit per bit
+        al variare del numero di worker. Per dataset che non entrano in
+        memoria usare generate_to_sink.
+
         Args:
             n_stores: Numero di punti vendita da simulare
             n_days: Numero di giorni da simulare
             validate: Se True, esegue validazione statistica
             save: Se True, salva i dati su file
+            seed: Seme principale (default derivato dallo stato globale di np.random)
+            n_jobs: Processi (1 = nel processo corrente, None = tutti i core)
+            start_date: Primo giorno simulato (default n_days giorni fa); va
+                fissato insieme al seme per rigenerare lo stesso dataset
 
         Returns:
             Dictionary con dataset generati
         """
         logger.info(f"Generando dataset per {n_stores} store, {n_days} giorni")
 
-        transactions = []
-        security_events = []
-
-        start_date = datetime.now() - timedelta(days=n_days)
-
-        for store_idx in range(n_stores):
-            store_id = f"store_{store_idx:03d}"
-            store_type = self._assign_store_type(store_idx, n_stores)
-
-            for day in range(n_days):
-                current_date = start_date + timedelta(days=day)
-
-                # Genera transazioni giornaliere
-                daily_trans = self.transaction_gen.generate_daily_pattern(
-                    store_id, current_date, store_type
-                )
-                transactions.append(daily_trans)
-
-                # Genera eventi sicurezza
-                daily_events = self.security_gen.generate_security_events(
-                    24, store_id
-                )
-                security_events.append(daily_events)
+        seed, start_date = self._resolve_run(seed, start_date, n_days)
+        chunks = list(self.iter_chunks(self.store_plan(n_stores), n_days, seed=seed,
+                                       start_date=start_date, granularity='store',
+                                       n_jobs=n_jobs))
 
         # Concatena tutti i dati
-        all_transactions = pd.concat(transactions, ignore_index=True)
-        all_security_events = pd.concat(security_events, ignore_index=True)
+        all_transactions = _concat_frames([chunk.transactions for chunk in chunks])
+        all_security_events = _concat_frames([chunk.security_events for chunk in chunks])
 
         dataset = {
             'transactions': all_transactions,
@@ -351,6 +873,8 @@ class GDODigitalTwin:
             'config': {
                 'n_stores': n_stores,
                 'n_days': n_days,
+                'seed': seed,
+                'start_date': start_date.isoformat(),
                 'total_transactions': len(all_transactions),
                 'total_security_events': len(all_security_events)
             }
@@ -366,6 +890,183 @@ class GDODigitalTwin:
 
         return dataset
 
+    def _resolve_run(self, seed: Optional[int], start_date: Optional[datetime],
+                     n_days: int) -> Tuple[int, datetime]:
+        if seed is None:
+            seed = int(np.random.randint(2**32, dtype=np.uint64))
+        if start_date is None:
+            start_date = datetime.now() - timedelta(days=n_days)
+        return seed, start_date
+
+    def store_plan(self, n_stores: int) -> List[Dict]:
+        """Punti vendita del dataset dimostrativo, con tipologia per archetipo."""
+        return [
+            {
+                'store_idx': store_idx,
+                'store_id': f"store_{store_idx:03d}",
+                'store_type': self._assign_store_type(store_idx, n_stores)
+            }
+            for store_idx in range(n_stores)
+        ]
+
+    def census_plan(self, seed: int) -> List[Dict]:
+        """
+        Punti vendita del censimento completo: per ogni archetipo 'count'
+        organizzazioni, ciascuna con un numero di punti vendita estratto
+        uniformemente in 'pv_range'
+
+        Args:
+            seed: Seme principale (lo stesso di iter_chunks/generate_to_sink)
+
+        Returns:
+            Lista di store con store_idx, store_id ('<archetipo>_<org>_<pv>'),
+            store_type e organization
+        """
+        rng = np.random.default_rng(np.random.SeedSequence(seed))
+        stores = []
+        for store_type, archetype in self.config['archetipi'].items():
+            low, high = archetype['pv_range']
+            for org in range(archetype['count']):
+                organization = f"{store_type}_{org:03d}"
+                for pv in range(int(rng.integers(low, high, endpoint=True))):
+                    stores.append({
+                        'store_idx': len(stores),
+                        'store_id': f"{organization}_{pv:04d}",
+                        'store_type': store_type,
+                        'organization': organization
+                    })
+        return stores
+
+    def iter_chunks(self, stores: List[Dict], n_days: int, seed: int, start_date: datetime,
+                    granularity: str = 'store_month', n_jobs: Optional[int] = 1,
+                    max_in_flight: Optional[int] = None) -> Iterator[DatasetChunk]:
+        """
+        Genera il dataset a blocchi, in ordine di store e periodo
+
+        I blocchi usano gli stessi stream (store, giorno) di
+        generate_demo_dataset: il contenuto non dipende né dalla
+        granularità né dal numero di processi. La memoria è limitata dal
+        numero di blocchi in volo per la loro dimensione.
+
+        Args:
+            stores: Punti vendita (store_plan o census_plan)
+            n_days: Numero di giorni da simulare
+            seed: Seme principale
+            start_date: Primo giorno simulato
+            granularity: 'store_day', 'store_month' (mese di calendario) o
+                'store' (intero periodo)
+            n_jobs: Processi (1 = nel processo corrente, None = tutti i core)
+            max_in_flight: Blocchi in elaborazione contemporanea (default 2 * worker)
+
+        Yields:
+            DatasetChunk
+        """
+        if granularity not in CHUNK_GRANULARITIES:
+            raise ValueError(f"Granularità non supportata: {granularity}")
+
+        if granularity == 'store_day':
+            periods = [(day, 1) for day in range(n_days)]
+        elif granularity == 'store_month':
+            days = np.datetime64(start_date.date(), 'D') + np.arange(n_days)
+            months = days.astype('datetime64[M]')
+            starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+            periods = list(zip(starts.tolist(), np.diff(np.r_[starts, n_days]).tolist()))
+        else:
+            periods = [(0, n_days)]
+
+        entropy = np.random.SeedSequence(seed).entropy
+        tasks = (
+            {
+                'store_idx': store['store_idx'],
+                'store_id': store['store_id'],
+                'store_type': store['store_type'],
+                'start_date': start_date,
+                'first_day': first_day,
+                'n_days': length,
+                'entropy': entropy,
+                'transaction_gen': self.transaction_gen,
+                'security_gen': self.security_gen
+            }
+            for store in stores
+            for first_day, length in periods
+        )
+
+        if n_jobs == 1:
+            for task in tasks:
+                yield _generate_chunk(task)
+            return
+
+        workers = n_jobs or os.cpu_count() or 1
+        window = max_in_flight or 2 * workers
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(_generate_chunk, task))
+                # Consegna in ordine; la finestra limita la memoria
+                while len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def generate_to_sink(self, sink: DatasetSink, stores: Union[int, List[Dict], None] = None,
+                         n_days: int = 365, seed: Optional[int] = None,
+                         start_date: Optional[datetime] = None,
+                         granularity: str = 'store_month', n_jobs: Optional[int] = 1,
+                         validate: bool = True) -> Dict:
+        """
+        Genera un dataset in streaming scrivendo ogni blocco sulla sink
+
+        Args:
+            sink: Destinazione dei blocchi (es. CSVSink)
+            stores: Numero di store dimostrativi, lista di store o None per
+                il censimento completo (census_plan)
+            n_days: Numero di giorni da simulare
+            seed: Seme principale (default derivato dallo stato globale di np.random)
+            start_date: Primo giorno simulato (default n_days giorni fa)
+            granularity: Granularità dei blocchi (vedi iter_chunks)
+            n_jobs: Processi di generazione
+            validate: Se True accumula le statistiche di validazione
+
+        Returns:
+            Metadati del dataset (configurazione, conteggi, validazione),
+            passati anche a sink.close()
+        """
+        seed, start_date = self._resolve_run(seed, start_date, n_days)
+        if stores is None:
+            stores = self.census_plan(seed)
+        elif isinstance(stores, int):
+            stores = self.store_plan(stores)
+        logger.info(f"Generazione in streaming: {len(stores):,} store, {n_days} giorni")
+
+        accumulator = ValidationAccumulator() if validate else None
+        n_transactions = n_events = n_chunks = 0
+        for chunk in self.iter_chunks(stores, n_days, seed, start_date, granularity, n_jobs):
+            sink.write(chunk)
+            if accumulator is not None:
+                accumulator.update(chunk.transactions)
+            n_transactions += len(chunk.transactions)
+            n_events += len(chunk.security_events)
+            n_chunks += 1
+
+        metadata = {
+            'generation_timestamp': datetime.now().isoformat(),
+            'config': {
+                'n_stores': len(stores),
+                'n_days': n_days,
+                'seed': seed,
+                'start_date': start_date.isoformat(),
+                'granularity': granularity,
+                'chunks': n_chunks,
+                'total_transactions': n_transactions,
+                'total_security_events': n_events
+            }
+        }
+        if accumulator is not None:
+            metadata['validation'] = accumulator.results()
+            logger.info(f"Validazione: {metadata['validation']['overall_pass_rate']:.1%} test superati")
+        sink.close(metadata)
+        return metadata
+
     def _assign_store_type(self, store_idx: int, total_stores: int) -> str:
         """Assegna tipologia store secondo distribuzione archetipi"""
         # Distribuzione proporzionale
@@ -383,62 +1084,43 @@ class GDODigitalTwin:
 
     def _validate_dataset(self, dataset: Dict) -> Dict:
         """Validazione statistica del dataset"""
-        from scipy import stats
-
-        transactions = dataset['transactions']
-        results = {}
-
-        # Test Benford's Law sugli importi
-        first_digits = transactions['amount'].apply(
-            lambda x: int(str(x).replace('.','').lstrip('0')[0]) if x > 0 else 1
-        )
+        accumulator = ValidationAccumulator()
+        accumulator.update(dataset['transactions'])
+        return accumulator.results()
 
-        benford_expected = [np.log10(1 + 1/d) for d in range(1, 10)]
-        benford_observed = [
-            (first_digits == d).sum() / len(first_digits) for d in range(1, 10)
-        ]
-
-        chi2, p_benford = stats.chisquare(benford_observed, benford_expected)
-        results['benford_law'] = {'chi2': chi2, 'p_value': p_benford, 'pass': p_benford > 0.05}
-
-        # Test distribuzione oraria (deve essere non-uniforme)
-        hourly_dist = transactions['timestamp'].dt.hour.value_counts().sort_index()
-        chi2_hour, p_hour = stats.chisquare(hourly_dist.values)
-        results['hourly_distribution'] = {'chi2': chi2_hour, 'p_value': p_hour, 'pass': p_hour < 0.05}
-
-        # Completezza dati
-        missing_rate = transactions.isnull().sum().sum() / (len(transactions) * len(transactions.columns))
-        results['data_completeness'] = {'missing_rate': missing_rate, 'pass': missing_rate < 0.01}
+    def _save_dataset(self, dataset: Dict, prefix: str = "gdo_dataset",
+                      format: str = 'parquet') -> str:
+        """
+        Salva dataset in formato colonnare partizionato per store e mese
 
-        # Calcola pass rate complessivo
-        passed = sum(1 for test in results.values() if test['pass'])
-        total = len(results)
-        results['overall_pass_rate'] = passed / total
+        Se pyarrow non è installato il dataset è salvato in CSV (CSVSink),
+        come transactions.csv e security_events.csv nella stessa directory.
 
-        return results
+        Args:
+            dataset: Dataset di generate_demo_dataset
+            prefix: Prefisso della directory
+            format: 'parquet', 'feather' (vedi ColumnarSink) o 'csv'
 
-    def _save_dataset(self, dataset: Dict, prefix: str = "gdo_dataset") -> str:
-        """Salva dataset su file"""
+        Returns:
+            Directory del dataset, da rileggere con load_dataset (formati
+            colonnari) o pandas.read_csv
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # Salva transazioni
-        trans_file = f"{prefix}_transactions_{timestamp}.csv"
-        dataset['transactions'].to_csv(trans_file, index=False)
-
-        # Salva eventi sicurezza
-        events_file = f"{prefix}_security_{timestamp}.csv"
-        dataset['security_events'].to_csv(events_file, index=False)
-
-        # Salva metadata
-        meta_file = f"{prefix}_metadata_{timestamp}.json"
-        metadata = {k: v for k, v in dataset.items()
-                   if k not in ['transactions', 'security_events']}
-
-        with open(meta_file, 'w') as f:
-            json.dump(metadata, f, indent=2, default=str)
-
-        logger.info(f"Dataset salvato: {trans_file}, {events_file}, {meta_file}")
-        return meta_file
+        directory = f"{prefix}_{timestamp}"
+
+        if format != 'csv':
+            try:
+                _require_pyarrow()
+            except ImportError:
+                logger.warning("pyarrow non installato: dataset salvato in CSV")
+                format = 'csv'
+        sink = CSVSink(directory) if format == 'csv' else ColumnarSink(directory, format=format)
+        sink.write_frames(dataset['transactions'], dataset['security_events'])
+        sink.close({k: v for k, v in dataset.items()
+                    if k not in ['transactions', 'security_events']})
+
+        logger.info(f"Dataset salvato: {directory}")
+        return directory
 
 
 if __name__ == "__main__":
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+GIST Peer Benchmark
+===================
+
+Indice percentile per il confronto di un'organizzazione con una
+popolazione (sintetica o storica) di assessment GIST: posizione
+complessiva, per archetipo e per singola componente.
+
+Ogni distribuzione è mantenuta come array ordinato più un piccolo buffer
+ordinato di inserimenti recenti, fuso periodicamente: le query di rango e
+percentile costano O(log n) e l'inserimento incrementale non richiede
+di riordinare la popolazione.
+
+Author: GIST Framework Research
+License: MIT
+Version: 1.0
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Literal, Union, Sequence
+import logging
+
+from gist_calculator import GISTCalculator
+
+logger = logging.getLogger(__name__)
+
+ALL_GROUP = 'all'
+
+
+class SortedColumn:
+    """
+    Distribuzione ordinata con inserimento incrementale.
+
+    I nuovi valori entrano in un buffer ordinato; quando il buffer supera
+    max(min_buffer, sqrt(n)) viene fuso nell'array principale in O(n).
+    """
+
+    __slots__ = ('main', 'buffer', 'min_buffer')
+
+    def __init__(self, values: Optional[np.ndarray] = None, min_buffer: int = 4096):
+        self.main = np.sort(np.asarray(values, dtype=float)) if values is not None else np.empty(0)
+        self.buffer = np.empty(0)
+        self.min_buffer = min_buffer
+
+    def __len__(self) -> int:
+        return len(self.main) + len(self.buffer)
+
+    def insert(self, values: np.ndarray) -> None:
+        """Inserisce nuovi valori nella distribuzione."""
+        self.buffer = np.sort(np.concatenate([self.buffer, np.asarray(values, dtype=float)]))
+        if len(self.buffer) > max(self.min_buffer, int(np.sqrt(len(self.main)))):
+            self.compact()
+
+    def compact(self) -> None:
+        """Fonde il buffer nell'array principale."""
+        if len(self.buffer):
+            positions = np.searchsorted(self.main, self.buffer)
+            self.main = np.insert(self.main, positions, self.buffer)
+            self.buffer = np.empty(0)
+
+    def count_below(self, values: np.ndarray) -> np.ndarray:
+        """Numero di elementi strettamente minori di ciascun valore."""
+        return (np.searchsorted(self.main, values, side='left')
+                + np.searchsorted(self.buffer, values, side='left'))
+
+    def count_not_above(self, values: np.ndarray) -> np.ndarray:
+        """Numero di elementi minori o uguali a ciascun valore."""
+        return (np.searchsorted(self.main, values, side='right')
+                + np.searchsorted(self.buffer, values, side='right'))
+
+
+class PeerBenchmarkIndex:
+    """
+    Indice percentile del GIST Score e delle componenti per archetipo.
+    """
+
+    def __init__(self,
+                 calculator: Optional[GISTCalculator] = None,
+                 method: Literal['sum', 'prod'] = 'sum'):
+        """
+        Inizializza un indice vuoto.
+
+        Args:
+            calculator: Calcolatore GIST (default: nuovo GISTCalculator)
+            method: Formula usata per lo score della popolazione
+        """
+        self.calculator = calculator or GISTCalculator()
+        self.method = method
+        self.components = list(self.calculator.WEIGHTS.keys())
+        self.metrics = ['score'] + self.components
+        self.groups = [ALL_GROUP] + list(self.calculator.ARCHETIPI_WEIGHTS.keys())
+        self._columns = {
+            (group, metric): SortedColumn()
+            for group in self.groups for metric in self.metrics
+        }
+
+    @classmethod
+    def from_population(cls,
+                        population: Union[np.ndarray, pd.DataFrame],
+                        archetypes: Optional[Sequence[str]] = None,
+                        calculator: Optional[GISTCalculator] = None,
+                        method: Literal['sum', 'prod'] = 'sum') -> 'PeerBenchmarkIndex':
+        """
+        Costruisce l'indice da una popolazione di assessment.
+
+        Args:
+            population: Punteggi componenti, array (n, 4) o DataFrame (con
+                colonna opzionale 'archetype')
+            archetypes: Archetipo per riga (alternativo alla colonna 'archetype')
+            calculator: Calcolatore GIST (default: nuovo GISTCalculator)
+            method: Formula usata per lo score
+
+        Returns:
+            Indice popolato
+        """
+        index = cls(calculator, method)
+        index.insert(population, archetypes)
+        for column in index._columns.values():
+            column.compact()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._columns[(ALL_GROUP, 'score')])
+
+    def insert(self,
+               population: Union[np.ndarray, pd.DataFrame],
+               archetypes: Optional[Sequence[str]] = None) -> None:
+        """
+        Aggiunge assessment all'indice senza ricostruirlo.
+
+        Args:
+            population: Punteggi componenti, array (n, 4) o DataFrame
+            archetypes: Archetipo per riga (opzionale)
+
+        Raises:
+            ValueError: Se input non validi o archetipi sconosciuti
+        """
+        if archetypes is None and isinstance(population, pd.DataFrame) \
+                and 'archetype' in population.columns:
+            archetypes = population['archetype'].to_numpy()
+
+        matrix, _ = self.calculator._as_component_matrix(population)
+        self.calculator._validate_batch(matrix)
+        values = {'score': self.calculator._score_matrix(matrix, self.method)}
+        for j, component in enumerate(self.components):
+            values[component] = matrix[:, j]
+
+        # Verifica completa prima di modificare le distribuzioni
+        if archetypes is not None:
+            archetypes = np.asarray(archetypes)
+            if len(archetypes) != len(matrix):
+                raise ValueError("Numero di archetipi diverso dal numero di righe")
+            unknown = set(np.unique(archetypes)) - set(self.groups[1:])
+            if unknown:
+                raise ValueError(f"Archetipi non riconosciuti: {unknown}")
+
+        for metric, column in values.items():
+            self._columns[(ALL_GROUP, metric)].insert(column)
+
+        if archetypes is None:
+            return
+
+        for archetype in np.unique(archetypes):
+            mask = archetypes == archetype
+            for metric, column in values.items():
+                self._columns[(archetype, metric)].insert(column[mask])
+
+    def percentile(self,
+                   values: Union[float, np.ndarray],
+                   metric: str = 'score',
+                   archetype: Optional[str] = None) -> Union[float, np.ndarray]:
+        """
+        Percentile (0-100) dei valori nella distribuzione richiesta.
+
+        Usa la definizione a rango medio: metà dei valori uguali conta
+        come inferiore.
+
+        Args:
+            values: Valore o array di valori da posizionare
+            metric: 'score' o nome di una componente
+            archetype: Archetipo di confronto (None = intera popolazione)
+
+        Returns:
+            Percentile per ciascun valore
+        """
+        column = self._column(metric, archetype)
+        values = np.asarray(values, dtype=float)
+        if len(column) == 0:
+            return np.full(values.shape, np.nan) if values.ndim else np.nan
+        below = column.count_below(values)
+        ties = column.count_not_above(values) - below
+        result = 100.0 * (below + 0.5 * ties) / len(column)
+        return result if values.ndim else float(result)
+
+    def rank(self,
+             values: Union[float, np.ndarray],
+             metric: str = 'score',
+             archetype: Optional[str] = None) -> Union[int, np.ndarray]:
+        """
+        Rango (1 = migliore) dei valori nella distribuzione richiesta.
+
+        Returns:
+            Numero di elementi strettamente superiori più uno
+        """
+        column = self._column(metric, archetype)
+        values = np.asarray(values, dtype=float)
+        result = len(column) - column.count_not_above(values) + 1
+        return result if values.ndim else int(result)
+
+    def benchmark(self, scores: Dict[str, float], archetype: Optional[str] = None) -> Dict:
+        """
+        Posiziona un'organizzazione rispetto alla popolazione.
+
+        Args:
+            scores: Punteggi delle componenti (0-100)
+            archetype: Archetipo dell'organizzazione (opzionale)
+
+        Returns:
+            Dizionario con score, percentili e ranghi complessivi e per archetipo
+        """
+        self.calculator._validate_inputs(scores)
+        row = np.array([[scores[k] for k in self.components]], dtype=float)
+        values = {'score': float(self.calculator._score_matrix(row, self.method)[0])}
+        values.update({k: float(scores[k]) for k in self.components})
+
+        groups = [ALL_GROUP] + ([archetype] if archetype else [])
+        result = {'score': round(values['score'], 2), 'method': self.method}
+        for group in groups:
+            size = len(self._column('score', group))
+            result[group] = {
+                'population': size,
+                'metrics': {
+                    metric: {
+                        'value': round(value, 2),
+                        'percentile': round(self.percentile(value, metric, group), 1),
+                        'rank': self.rank(value, metric, group)
+                    }
+                    for metric, value in values.items()
+                }
+            }
+        return result
+
+    def _column(self, metric: str, archetype: Optional[str]) -> SortedColumn:
+        group = archetype or ALL_GROUP
+        if (group, metric) not in self._columns:
+            raise ValueError(f"Distribuzione non disponibile: archetipo={group}, metrica={metric}")
+        return self._columns[(group, metric)]
+
+    def save(self, filename: str) -> str:
+        """
+        Salva l'indice in formato .npz (array ordinati già fusi).
+
+        Returns:
+            Path del file salvato
+        """
+        arrays = {}
+        for (group, metric), column in self._columns.items():
+            column.compact()
+            arrays[f"{group}__{metric}"] = column.main
+        np.savez(filename, method=np.array(self.method), **arrays)
+        logger.info(f"Indice benchmark salvato: {filename}")
+        return filename
+
+    @classmethod
+    def load(cls, filename: str, calculator: Optional[GISTCalculator] = None) -> 'PeerBenchmarkIndex':
+        """Carica un indice salvato con save()."""
+        with np.load(filename) as data:
+            index = cls(calculator, str(data['method']))
+            for (group, metric), column in index._columns.items():
+                key = f"{group}__{metric}"
+                if key in data:
+                    column.main = data[key]
+        return index
+
+
+if __name__ == "__main__":
+    # Popolazione sintetica per archetipo
+    rng = np.random.default_rng(7)
+    means = {'micro': 35, 'piccola': 45, 'media': 55, 'grande': 65, 'enterprise': 75}
+    frames = []
+    for archetype, share in GISTCalculator.ARCHETIPI_WEIGHTS.items():
+        n = int(1_000_000 * share)
+        frame = pd.DataFrame(
+            np.clip(rng.normal(means[archetype], 12, size=(n, 4)), 0, 100),
+            columns=list(GISTCalculator.WEIGHTS.keys())
+        )
+        frame['archetype'] = archetype
+        frames.append(frame)
+
+    index = PeerBenchmarkIndex.from_population(pd.concat(frames, ignore_index=True))
+    report = index.benchmark(
+        {'physical': 55, 'architectural': 60, 'security': 52, 'compliance': 58},
+        archetype='media'
+    )
+
+    print(f"GIST Score: {report['score']}")
+    for group in ('all', 'media'):
+        overall = report[group]['metrics']['score']
+        print(f"{group:6s}: percentile {overall['percentile']}, "
+              f"rango {overall['rank']:,}/{report[group]['population']:,}")
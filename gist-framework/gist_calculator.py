@@ -15,15 +15,130 @@ Version: 1.0
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional, Literal
+from typing import Any, Dict, List, Tuple, Optional, Literal, Union, Iterator
+from collections.abc import Mapping
 from datetime import datetime
 import json
 import logging
 
+from gist_history import CalculationHistory
+from gist_uncertainty import ComponentDistribution, is_uncertain, propagate_uncertainty
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Risultato di un calcolo con componenti incerte: dizionario con le chiavi
+# 'timestamp', 'organization', 'method', 'mode', 'score_mean', 'score_std',
+# 'score_interval', 'interval_probability', 'maturity_probabilities' e
+# 'derived_metric_intervals' (vedi GISTCalculator.calculate_score_uncertain)
+UncertainResult = Dict[str, Any]
+
+
+def _round(values, decimals: int):
+    """
+    Arrotondamento comune ai calcoli scalari e vettoriali: np.round per
+    entrambi, così calculate_score e calculate_scores_batch coincidono.
+    """
+    rounded = np.round(values, decimals)
+    return float(rounded) if np.ndim(rounded) == 0 else rounded
+
+class GISTResult(Mapping):
+    """
+    Risultato compatto di un calcolo GIST.
+
+    Score e livello di maturità sono calcolati subito; gap, raccomandazioni
+    e metriche derivate vengono calcolati solo al primo accesso, con i pesi
+    e il gamma in vigore alla creazione del risultato. Supporta
+    l'accesso in stile dizionario (result['score']) per compatibilità con
+    il formato precedente.
+    """
+
+    __slots__ = ('created_at', 'organization', 'raw_score', 'method',
+                 'maturity_level', 'maturity_description',
+                 '_calculator', '_scores', '_components', '_gaps',
+                 '_recommendations', '_derived_metrics')
+
+    KEYS = ('timestamp', 'organization', 'score', 'method', 'maturity_level',
+            'maturity_description', 'components', 'component_weights',
+            'gaps', 'recommendations', 'derived_metrics')
+
+    def __init__(self, calculator: 'GISTCalculator', scores: Dict[str, float],
+                 raw_score: float, method: str, maturity: Dict[str, str]):
+        self.created_at = datetime.now()
+        self.organization = calculator.organization
+        self.raw_score = raw_score
+        self.method = method
+        self.maturity_level = maturity['level']
+        self.maturity_description = maturity['description']
+        # Pesi e gamma congelati: una calibrazione successiva non modifica il risultato
+        self._calculator = calculator._calibration_snapshot()
+        self._scores = dict(scores)
+        self._components = None
+        self._gaps = None
+        self._recommendations = None
+        self._derived_metrics = None
+
+    @property
+    def timestamp(self) -> str:
+        return self.created_at.isoformat()
+
+    @property
+    def score(self) -> float:
+        return _round(self.raw_score, 2)
+
+    @property
+    def components(self) -> Dict[str, float]:
+        if self._components is None:
+            self._components = {k: _round(v, 2) for k, v in self._scores.items()}
+        return self._components
+
+    @property
+    def component_weights(self) -> Dict[str, float]:
+        return dict(self._calculator.WEIGHTS)
+
+    @property
+    def gaps(self) -> Dict:
+        if self._gaps is None:
+            self._gaps = self._calculator._analyze_gaps(self._scores)
+        return self._gaps
+
+    @property
+    def recommendations(self) -> List[Dict]:
+        if self._recommendations is None:
+            self._recommendations = self._calculator._generate_recommendations(
+                self._scores, self.raw_score
+            )
+        return self._recommendations
+
+    @property
+    def derived_metrics(self) -> Dict:
+        if self._derived_metrics is None:
+            self._derived_metrics = self._calculator._calculate_derived_metrics(
+                self._scores, self.raw_score
+            )
+        return self._derived_metrics
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        return (f"GISTResult(score={self.score}, method='{self.method}', "
+                f"maturity_level='{self.maturity_level}')")
+
+    def to_dict(self) -> Dict:
+        """Converte il risultato nel dizionario completo (per export JSON)."""
+        return {key: getattr(self, key) for key in self.KEYS}
+
+
 class GISTCalculator:
     """
     Calcolatore del GIST Score per organizzazioni GDO.
@@ -39,6 +154,8 @@ class GISTCalculator:
     }
 
     GAMMA = 0.95  # Esponente per rendimenti decrescenti
+    # Gamma massimo ammesso: i solutori assumono uno score concavo (gamma < 1)
+    MAX_GAMMA = 0.99
 
     MATURITY_LEVELS = [
         (0, 25, "Iniziale", "Infrastruttura legacy, sicurezza reattiva"),
@@ -47,6 +164,16 @@ class GISTCalculator:
         (75, 100, "Ottimizzato", "Trasformazione completa, sicurezza adattiva")
     ]
 
+    # Cifre decimali delle metriche derivate nei risultati
+    DERIVED_METRICS_DECIMALS = {
+        'estimated_availability': 3,
+        'estimated_assa_score': 0,
+        'estimated_mttr_hours': 1,
+        'compliance_coverage_percent': 1,
+        'expected_incidents_per_year': 1,
+        'cost_efficiency_index': 3
+    }
+
     # Archetipi per calcolo aggregato (calibrati su 234 organizzazioni)
     ARCHETIPI_WEIGHTS = {
         'micro': 87/234,
@@ -56,34 +183,136 @@ class GISTCalculator:
         'enterprise': 7/234
     }
 
-    def __init__(self, organization_name: str = ""):
+    def __init__(self, organization_name: str = "",
+                 history_capacity: int = 10000,
+                 history_spill_path: Optional[str] = None):
         """
         Inizializza il calcolatore GIST.
 
         Args:
             organization_name: Nome dell'organizzazione (opzionale)
+            history_capacity: Numero massimo di calcoli mantenuti in memoria
+            history_spill_path: Directory Parquet o file SQLite (.db) dove
+                riversare i calcoli più vecchi (opzionale)
         """
         self.organization = organization_name
-        self.history = []
+        self.calibration_version = None
+        self._snapshot = None
+        self.history = CalculationHistory(
+            components=list(self.WEIGHTS.keys()),
+            maturity_labels=[level[2] for level in self.MATURITY_LEVELS],
+            capacity=history_capacity,
+            spill_path=history_spill_path
+        )
+
+    @classmethod
+    def from_calibration(cls, filename: str, organization_name: str = "", **kwargs) -> 'GISTCalculator':
+        """
+        Crea un calcolatore con pesi e gamma di un profilo di calibrazione.
+
+        Args:
+            filename: Profilo JSON prodotto da gist_calibration
+            organization_name: Nome dell'organizzazione (opzionale)
+
+        Returns:
+            Calcolatore configurato con il profilo
+        """
+        calculator = cls(organization_name, **kwargs)
+        calculator.load_calibration(filename)
+        return calculator
+
+    def load_calibration(self, filename: str) -> Dict:
+        """
+        Applica a questa istanza pesi e gamma di un profilo di calibrazione.
+
+        Args:
+            filename: Profilo JSON prodotto da gist_calibration
+
+        Returns:
+            Profilo caricato
+
+        Raises:
+            ValueError: Se il profilo non è compatibile
+        """
+        with open(filename, 'r') as f:
+            profile = json.load(f)
+
+        if profile.get('schema_version') != 1:
+            raise ValueError(f"Versione profilo non supportata: {profile.get('schema_version')}")
+        weights = profile['weights']
+        if set(weights) != set(self.WEIGHTS):
+            raise ValueError(f"Componenti del profilo non valide: {set(weights)}")
+        if abs(sum(weights.values()) - 1) > 1e-3 or min(weights.values()) < 0:
+            raise ValueError("I pesi del profilo devono essere non negativi con somma 1")
+        if not 0 < profile['gamma'] <= self.MAX_GAMMA:
+            raise ValueError(f"Gamma non valido nel profilo: {profile['gamma']}")
+
+        # Attributi d'istanza: le costanti di classe restano invariate
+        self.WEIGHTS = {k: float(weights[k]) for k in self.WEIGHTS}
+        self.GAMMA = float(profile['gamma'])
+        self.calibration_version = profile['version']
+        logger.info(f"Calibrazione {profile['version']} caricata da {filename}")
+        return profile
+
+    def _calibration_snapshot(self) -> 'GISTCalculator':
+        """
+        Copia leggera con i pesi e il gamma correnti, per i calcoli
+        differiti di GISTResult; ricreata solo quando cambiano.
+        """
+        snapshot = self._snapshot
+        if (snapshot is None or snapshot.WEIGHTS != self.WEIGHTS
+                or snapshot.GAMMA != self.GAMMA
+                or snapshot.calibration_version != self.calibration_version):
+            snapshot = object.__new__(type(self))
+            snapshot.organization = self.organization
+            snapshot.calibration_version = self.calibration_version
+            snapshot.WEIGHTS = dict(self.WEIGHTS)
+            snapshot.GAMMA = self.GAMMA
+            self._snapshot = snapshot
+        return snapshot
 
     def calculate_score(self,
-                       scores: Dict[str, float],
+                       scores: Dict[str, Union[float, ComponentDistribution]],
                        method: Literal['sum', 'prod'] = 'sum',
-                       save_history: bool = True) -> Dict:
+                       save_history: bool = True,
+                       *,
+                       mode: Literal['sampling', 'delta'] = 'sampling',
+                       n_samples: int = 10000,
+                       interval: float = 0.90,
+                       seed: Optional[int] = None) -> Union[GISTResult, UncertainResult]:
         """
         Calcola il GIST Score con metodo specificato.
 
         Args:
-            scores: Dizionario con punteggi delle componenti (0-100)
+            scores: Dizionario con punteggi delle componenti (0-100) o
+                distribuzioni dei punteggi
             method: 'sum' per sommatoria, 'prod' per produttoria
-            save_history: Se True, salva il calcolo nella storia
+            save_history: Se True, salva il calcolo nella storia (solo
+                per punteggi puntuali)
+            mode, n_samples, interval, seed: Opzioni di propagazione per
+                componenti incerte (vedi calculate_score_uncertain)
 
         Returns:
-            Dizionario con risultati completi del calcolo
+            Il tipo dipende dagli input:
+            - punteggi puntuali: GISTResult con score e livello di maturità
+              (gap, raccomandazioni e metriche derivate sono calcolati al
+              primo accesso);
+            - almeno una componente distribuzione (gist_uncertainty):
+              UncertainResult con la distribuzione dello score, come
+              calculate_score_uncertain; il calcolo non viene salvato nella
+              storia, che registra solo score puntuali.
+
+            Chi ha sempre bisogno di un GISTResult può verificare gli input
+            con gist_uncertainty.is_uncertain; chi lavora con componenti
+            incerte può chiamare direttamente calculate_score_uncertain.
 
         Raises:
             ValueError: Se input non validi
         """
+        if is_uncertain(scores):
+            return self.calculate_score_uncertain(scores, method, mode=mode, n_samples=n_samples,
+                                                  interval=interval, seed=seed)
+
         # Validazione input
         self._validate_inputs(scores)
 
@@ -98,35 +327,271 @@ class GISTCalculator:
         # Determina livello di maturità
         maturity = self._get_maturity_level(gist_score)
 
-        # Genera analisi dei gap
-        gaps = self._analyze_gaps(scores)
+        # Gap, raccomandazioni e metriche derivate sono calcolati su richiesta
+        result = GISTResult(self, scores, gist_score, method, maturity)
 
-        # Genera raccomandazioni
-        recommendations = self._generate_recommendations(scores, gist_score)
+        # Salva nella storia se richiesto
+        if save_history:
+            self.history.append(result)
+
+        return result
+
+    def calculate_score_uncertain(self,
+                                  scores: Dict[str, Union[float, ComponentDistribution]],
+                                  method: Literal['sum', 'prod'] = 'sum',
+                                  mode: Literal['sampling', 'delta'] = 'sampling',
+                                  n_samples: int = 10000,
+                                  interval: float = 0.90,
+                                  seed: Optional[int] = None) -> UncertainResult:
+        """
+        Calcola la distribuzione del GIST Score da componenti incerte.
 
-        # Calcola metriche derivate
-        derived_metrics = self._calculate_derived_metrics(scores, gist_score)
+        Args:
+            scores: Per componente, valore puntuale o distribuzione
+                (Interval, Triangular, Normal, Empirical)
+            method: 'sum' per sommatoria, 'prod' per produttoria
+            mode: 'sampling' (Monte Carlo) o 'delta' (analitico, solo 'sum')
+            n_samples: Numero di campioni in modalità 'sampling'
+            interval: Probabilità centrale degli intervalli riportati
+            seed: Seme per la riproducibilità
+
+        Returns:
+            UncertainResult con statistiche dello score, probabilità dei
+            livelli di maturità e intervalli delle metriche derivate
+        """
+        row = self.calculate_scores_uncertain_batch(
+            [scores], method, mode, n_samples, interval, seed
+        ).iloc[0]
 
-        # Prepara risultato
-        result = {
+        labels = [level[2] for level in self.MATURITY_LEVELS]
+        metrics = self.DERIVED_METRICS_DECIMALS
+        return {
             'timestamp': datetime.now().isoformat(),
             'organization': self.organization,
-            'score': round(gist_score, 2),
             'method': method,
-            'maturity_level': maturity['level'],
-            'maturity_description': maturity['description'],
-            'components': {k: round(v, 2) for k, v in scores.items()},
-            'component_weights': self.WEIGHTS,
-            'gaps': gaps,
-            'recommendations': recommendations,
-            'derived_metrics': derived_metrics
+            'mode': mode,
+            'score_mean': round(float(row['score_mean']), 2),
+            'score_std': round(float(row['score_std']), 2),
+            'score_interval': (round(float(row['score_low']), 2),
+                               round(float(row['score_high']), 2)),
+            'interval_probability': interval,
+            'maturity_probabilities': {
+                label: round(float(row[f'p_{label}']), 4) for label in labels
+            },
+            'derived_metric_intervals': {
+                name: (round(float(row[f'{name}_low']), decimals),
+                       round(float(row[f'{name}_high']), decimals))
+                for name, decimals in metrics.items()
+            }
         }
 
-        # Salva nella storia se richiesto
-        if save_history:
-            self.history.append(result)
+    def calculate_scores_uncertain_batch(self,
+                                         fleet: List[Dict[str, Union[float, ComponentDistribution]]],
+                                         method: Literal['sum', 'prod'] = 'sum',
+                                         mode: Literal['sampling', 'delta'] = 'sampling',
+                                         n_samples: int = 2000,
+                                         interval: float = 0.90,
+                                         seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Propaga l'incertezza delle componenti per un'intera flotta.
 
-        return result
+        Returns:
+            DataFrame con una riga per organizzazione (vedi
+            gist_uncertainty.propagate_uncertainty)
+        """
+        return propagate_uncertainty(self, fleet, method, mode, n_samples, interval, seed)
+
+    def calculate_scores_batch(self,
+                               data: Union[np.ndarray, pd.DataFrame],
+                               method: Literal['sum', 'prod'] = 'sum') -> pd.DataFrame:
+        """
+        Calcola il GIST Score per un lotto di organizzazioni in forma vettoriale.
+
+        Produce gli stessi score, livelli di maturità e metriche derivate di
+        calculate_score applicato riga per riga, senza costruire gap,
+        raccomandazioni né salvare nella storia.
+
+        Args:
+            data: Array (n, 4) con colonne nell'ordine di WEIGHTS, oppure
+                DataFrame con colonne physical/architectural/security/compliance
+            method: 'sum' per sommatoria, 'prod' per produttoria
+
+        Returns:
+            DataFrame con componenti, score, livello di maturità e metriche derivate
+
+        Raises:
+            ValueError: Se input non validi
+        """
+        matrix, index = self._as_component_matrix(data)
+        self._validate_batch(matrix)
+
+        gist_scores = self._score_matrix(matrix, method)
+
+        # Lookup a intervalli sui limiti inferiori dei livelli di maturità
+        edges = np.array([level[0] for level in self.MATURITY_LEVELS[1:]], dtype=float)
+        codes = np.searchsorted(edges, gist_scores, side='right')
+
+        components = list(self.WEIGHTS.keys())
+        columns = {k: _round(matrix[:, j], 2) for j, k in enumerate(components)}
+        columns['score'] = _round(gist_scores, 2)
+        columns['method'] = method
+        columns['maturity_level'] = pd.Categorical.from_codes(
+            codes, categories=[level[2] for level in self.MATURITY_LEVELS]
+        )
+        columns['maturity_description'] = pd.Categorical.from_codes(
+            codes, categories=[level[3] for level in self.MATURITY_LEVELS]
+        )
+
+        derived = self._derived_metrics_arrays(
+            matrix[:, components.index('compliance')],
+            matrix[:, components.index('security')],
+            gist_scores
+        )
+        for name, values in derived.items():
+            columns[name] = _round(values, self.DERIVED_METRICS_DECIMALS[name])
+
+        return pd.DataFrame(columns, index=index)
+
+    def solve_minimum_effort(self,
+                             scores: Dict[str, float],
+                             target: Union[str, float],
+                             method: Literal['sum', 'prod'] = 'sum',
+                             effort: Optional[Dict[str, float]] = None,
+                             bounds: Optional[Dict[str, Tuple[float, float]]] = None) -> Dict:
+        """
+        Trova il vettore di componenti a sforzo minimo che raggiunge un target.
+
+        Args:
+            scores: Punteggi attuali delle componenti (0-100)
+            target: Score minimo da raggiungere oppure nome di un livello di
+                maturità (es. 'Avanzato')
+            method: 'sum' per sommatoria, 'prod' per produttoria
+            effort: Sforzo per punto di ciascuna componente (default 1)
+            bounds: Limiti (minimo, massimo) per componente (default (0, 100))
+
+        Returns:
+            Dizionario con componenti obiettivo, incrementi, sforzo e stato
+            ('already_met', 'solved' o 'infeasible')
+
+        Raises:
+            ValueError: Se input non validi
+        """
+        self._validate_inputs(scores)
+        row = np.array([[scores[k] for k in self.WEIGHTS]], dtype=float)
+        solution = self.solve_minimum_effort_batch(row, target, method, effort, bounds).iloc[0]
+
+        components = list(self.WEIGHTS.keys())
+        return {
+            'target_score': float(solution['target_score']),
+            'method': method,
+            'status': solution['status'],
+            'score': float(solution['score']),
+            'maturity_level': self._get_maturity_level(float(solution['score']))['level'],
+            'components': {k: float(solution[k]) for k in components},
+            'increments': {k: round(float(solution[k]) - scores[k], 2) for k in components},
+            'effort': float(solution['effort'])
+        }
+
+    def solve_minimum_effort_batch(self,
+                                   data: Union[np.ndarray, pd.DataFrame],
+                                   target: Union[str, float, np.ndarray],
+                                   method: Literal['sum', 'prod'] = 'sum',
+                                   effort: Optional[Dict[str, float]] = None,
+                                   bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+                                   iterations: int = 60) -> pd.DataFrame:
+        """
+        Risolve il problema inverso per molte organizzazioni in forma vettoriale.
+
+        Minimizza sum_k effort_k * (x_k - s_k) con f(x) >= target e
+        max(s_k, min_k) <= x_k <= max_k. Il vincolo è separabile e concavo
+        (la produttoria in scala logaritmica): per un moltiplicatore mu ogni
+        componente ha soluzione in forma chiusa, e mu è trovato per bisezione
+        indipendentemente per ogni organizzazione.
+
+        Args:
+            data: Punteggi attuali, array (n, 4) o DataFrame
+            target: Score minimo (scalare o array (n,)) o nome livello di maturità
+            method: 'sum' per sommatoria, 'prod' per produttoria
+            effort: Sforzo per punto di ciascuna componente (default 1)
+            bounds: Limiti (minimo, massimo) per componente (default (0, 100))
+            iterations: Iterazioni di bisezione
+
+        Returns:
+            DataFrame con componenti obiettivo (arrotondate per eccesso al
+            centesimo), score raggiunto, sforzo e stato per organizzazione
+
+        Raises:
+            ValueError: Se input non validi
+        """
+        if method not in ('sum', 'prod'):
+            raise ValueError(f"Metodo non supportato: {method}")
+
+        matrix, index = self._as_component_matrix(data)
+        self._validate_batch(matrix)
+        target_scores = np.broadcast_to(
+            np.asarray(self._resolve_target(target), dtype=float), (len(matrix),)
+        )
+
+        # Tabelle separabili per componente: peso, sforzo per punto, limiti
+        components = list(self.WEIGHTS.keys())
+        weights = np.array(list(self.WEIGHTS.values()))
+        effort = effort or {}
+        bounds = bounds or {}
+        unit_effort = np.array([effort.get(k, 1.0) for k in components], dtype=float)
+        if (unit_effort <= 0).any():
+            raise ValueError("Lo sforzo per punto deve essere positivo")
+        lower = np.maximum(matrix, [bounds.get(k, (0, 100))[0] for k in components])
+        upper = np.array([min(bounds.get(k, (0, 100))[1], 100) for k in components], dtype=float)
+        if (lower > upper).any():
+            raise ValueError("Limiti incompatibili con i punteggi attuali")
+
+        base_scores = self._score_matrix(lower, method)
+        max_scores = self._score_matrix(np.broadcast_to(upper, matrix.shape), method)
+        already_met = base_scores >= target_scores
+        feasible = max_scores >= target_scores
+
+        def allocation(log_mu):
+            mu = np.exp(log_mu)[:, None]
+            with np.errstate(divide='ignore', over='ignore'):
+                if method == 'sum':
+                    # w * gamma * x^(gamma-1) = effort / mu
+                    x = (unit_effort / (mu * weights * self.GAMMA)) ** (1.0 / (self.GAMMA - 1.0))
+                else:
+                    # w / x = effort / mu  (vincolo in scala logaritmica)
+                    x = mu * weights / unit_effort
+            return np.clip(x, lower, upper)
+
+        lo = np.full(len(matrix), -60.0)
+        hi = np.full(len(matrix), 60.0)
+        for _ in range(iterations):
+            mid = 0.5 * (lo + hi)
+            reached = self._score_matrix(allocation(mid), method) >= target_scores
+            lo = np.where(reached, lo, mid)
+            hi = np.where(reached, mid, hi)
+
+        solution = allocation(hi)
+        solution = np.minimum(np.ceil(solution * 100 - 1e-9) / 100, upper)
+        solution = np.maximum(solution, lower)
+        solution = np.where(already_met[:, None], lower, solution)
+        solution = np.where(feasible[:, None], solution, upper)
+
+        columns = {k: solution[:, j] for j, k in enumerate(components)}
+        columns['target_score'] = target_scores
+        columns['score'] = np.round(self._score_matrix(solution, method), 2)
+        columns['effort'] = np.round(((solution - matrix) * unit_effort).sum(axis=1), 2)
+        columns['status'] = np.where(
+            already_met, 'already_met', np.where(feasible, 'solved', 'infeasible')
+        )
+        return pd.DataFrame(columns, index=index)
+
+    def _resolve_target(self, target: Union[str, float, np.ndarray]):
+        """Converte un livello di maturità nel suo score minimo."""
+        if isinstance(target, str):
+            for min_score, _, level, _ in self.MATURITY_LEVELS:
+                if level == target:
+                    return min_score
+            raise ValueError(f"Livello di maturità sconosciuto: {target}")
+        return target
 
     def calcola_aggregato(self, risultati_archetipi: Dict[str, float]) -> float:
         """
@@ -165,6 +630,73 @@ class GISTCalculator:
         max_possible = 100 ** sum(self.WEIGHTS.values())
         return (product / max_possible) * 100
 
+    def _score_matrix(self, matrix: np.ndarray, method: str) -> np.ndarray:
+        """
+        Calcola il GIST Score (non arrotondato) per ogni riga della matrice.
+
+        Le componenti sono accumulate nello stesso ordine della versione
+        scalare, così da ottenere risultati identici bit a bit.
+        """
+        weights = list(self.WEIGHTS.values())
+        columns = np.ascontiguousarray(matrix.T)
+
+        if method == 'sum':
+            total = np.zeros(columns.shape[1])
+            for weight, column in zip(weights, columns):
+                total += weight * column ** self.GAMMA
+            return total
+        elif method == 'prod':
+            product = np.ones(columns.shape[1])
+            for weight, column in zip(weights, columns):
+                product *= column ** weight
+            max_possible = 100 ** sum(weights)
+            return (product / max_possible) * 100
+        else:
+            raise ValueError(f"Metodo non supportato: {method}")
+
+    def _as_component_matrix(self,
+                             data: Union[np.ndarray, pd.DataFrame]
+                             ) -> Tuple[np.ndarray, Optional[pd.Index]]:
+        """Converte l'input batch in matrice float (n, 4) ordinata come WEIGHTS."""
+        components = list(self.WEIGHTS.keys())
+
+        if isinstance(data, pd.DataFrame):
+            missing = set(components) - set(data.columns)
+            if missing:
+                raise ValueError(f"Componenti mancanti: {missing}")
+            frame = data[components]
+            if not all(pd.api.types.is_numeric_dtype(t) for t in frame.dtypes):
+                raise ValueError("Le colonne delle componenti devono essere numeriche")
+            return frame.to_numpy(dtype=float), data.index
+
+        matrix = np.asarray(data)
+        if matrix.ndim != 2 or matrix.shape[1] != len(components):
+            raise ValueError(
+                f"Attesa matrice (n, {len(components)}) con colonne {components}, "
+                f"ricevuta forma {matrix.shape}"
+            )
+        if not (np.issubdtype(matrix.dtype, np.number) or matrix.dtype == bool):
+            raise ValueError(
+                f"I punteggi devono essere numerici, ricevuto dtype {matrix.dtype}"
+            )
+        return matrix.astype(float, copy=False), None
+
+    def _validate_batch(self, matrix: np.ndarray):
+        """
+        Valida in forma vettoriale il range dei punteggi di un lotto.
+
+        Raises:
+            ValueError: Se almeno un punteggio è fuori range o non finito
+        """
+        invalid = ~((matrix >= 0) & (matrix <= 100))
+        if invalid.any():
+            row, col = np.argwhere(invalid)[0]
+            component = list(self.WEIGHTS.keys())[col]
+            raise ValueError(
+                f"Punteggio {component}={matrix[row, col]} fuori range [0,100] "
+                f"(riga {row})"
+            )
+
     def _validate_inputs(self, scores: Dict[str, float]):
         """
         Valida completezza e correttezza degli input.
@@ -334,6 +866,22 @@ class GISTCalculator:
         Returns:
             Dizionario con metriche operative stimate
         """
+        metrics = self._derived_metrics_arrays(
+            scores['compliance'], scores['security'], gist_score
+        )
+        return {
+            name: _round(value, self.DERIVED_METRICS_DECIMALS[name])
+            for name, value in metrics.items()
+        }
+
+    @staticmethod
+    def _derived_metrics_arrays(compliance, security, gist_score) -> Dict:
+        """
+        Formule delle metriche derivate, valide sia per scalari che per array.
+
+        Returns:
+            Dizionario con metriche operative stimate (non arrotondate)
+        """
         # Formule empiriche calibrate su dati di settore
         availability = 99.0 + (gist_score / 100) * 0.95  # 99.0% - 99.95%
 
@@ -344,21 +892,21 @@ class GISTCalculator:
         mttr_hours = 24 * np.exp(-gist_score / 30)
 
         # Compliance coverage
-        compliance_coverage = 50 + (scores['compliance'] / 100) * 50
+        compliance_coverage = 50 + (compliance / 100) * 50
 
         # Security incidents annuali attesi
-        incidents_per_year = 100 * np.exp(-scores['security'] / 25)
+        incidents_per_year = 100 * np.exp(-security / 25)
 
         # Cost efficiency index
         cost_efficiency = gist_score / 100 * 0.8 + 0.2
 
         return {
-            'estimated_availability': round(availability, 3),
-            'estimated_assa_score': round(assa_score, 0),
-            'estimated_mttr_hours': round(mttr_hours, 1),
-            'compliance_coverage_percent': round(compliance_coverage, 1),
-            'expected_incidents_per_year': round(incidents_per_year, 1),
-            'cost_efficiency_index': round(cost_efficiency, 3)
+            'estimated_availability': availability,
+            'estimated_assa_score': assa_score,
+            'estimated_mttr_hours': mttr_hours,
+            'compliance_coverage_percent': compliance_coverage,
+            'expected_incidents_per_year': incidents_per_year,
+            'cost_efficiency_index': cost_efficiency
         }
 
     def compare_scenarios(self,
@@ -394,7 +942,7 @@ class GISTCalculator:
 
         return df
 
-    def export_report(self, result: Dict, filename: str = None) -> str:
+    def export_report(self, result: Union[GISTResult, Dict], filename: str = None) -> str:
         """
         Esporta report dettagliato in formato JSON.
 
@@ -410,31 +958,31 @@ class GISTCalculator:
             org_name = self.organization.replace(" ", "_") if self.organization else "org"
             filename = f"gist_report_{org_name}_{timestamp}.json"
 
+        if isinstance(result, GISTResult):
+            result = result.to_dict()
+
         with open(filename, 'w') as f:
             json.dump(result, f, indent=2, default=str)
 
         logger.info(f"Report salvato: {filename}")
         return filename
 
-    def get_history_summary(self) -> pd.DataFrame:
-        """Ritorna summary della storia dei calcoli"""
-        if not self.history:
-            return pd.DataFrame()
-
-        summary_data = []
-        for entry in self.history:
-            summary_data.append({
-                'Timestamp': entry['timestamp'],
-                'Score': entry['score'],
-                'Method': entry['method'],
-                'Maturity': entry['maturity_level'],
-                'Physical': entry['components']['physical'],
-                'Architectural': entry['components']['architectural'],
-                'Security': entry['components']['security'],
-                'Compliance': entry['components']['compliance']
-            })
+    def get_history_summary(self,
+                            start: Optional[Union[str, datetime]] = None,
+                            end: Optional[Union[str, datetime]] = None,
+                            include_spilled: bool = False) -> pd.DataFrame:
+        """
+        Ritorna summary della storia dei calcoli.
 
-        return pd.DataFrame(summary_data)
+        Args:
+            start: Timestamp minimo incluso (opzionale)
+            end: Timestamp massimo escluso (opzionale)
+            include_spilled: Se True, include i calcoli riversati su disco
+
+        Returns:
+            DataFrame con una riga per calcolo, in ordine cronologico
+        """
+        return self.history.summary(start, end, include_spilled)
 
 
 def run_demo():
@@ -527,5 +1075,51 @@ def run_demo():
     print(f"\nReport completo salvato: {report_file}")
 
 
+def main(argv: Optional[List[str]] = None):
+    """Entry point del comando gist-calc."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='gist-calc',
+        description="Calcolo del GIST Score: demo o scoring in streaming di export CSV/Parquet"
+    )
+    parser.add_argument('input', nargs='?', help="Export di assessment (.csv o .parquet)")
+    parser.add_argument('output', nargs='?', help="File .ndjson o directory Parquet di output")
+    parser.add_argument('--demo', action='store_true', help="Esegue la demo")
+    parser.add_argument('--method', choices=['sum', 'prod'], default='sum')
+    parser.add_argument('--format', choices=['ndjson', 'parquet'], default=None,
+                        help="Formato di output (default dedotto dall'estensione)")
+    parser.add_argument('--partition-by', nargs='+', default=None,
+                        help="Colonne di partizionamento dell'output Parquet")
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Processi di scoring (0 = tutti i core)")
+    parser.add_argument('--calibration', default=None,
+                        help="Profilo di calibrazione JSON da applicare")
+    args = parser.parse_args(argv)
+
+    if args.demo or args.input is None:
+        run_demo()
+        return
+    if args.output is None:
+        parser.error("specificare il percorso di output")
+
+    from gist_pipeline import score_file
+
+    calculator = (GISTCalculator.from_calibration(args.calibration)
+                  if args.calibration else GISTCalculator())
+    stats = score_file(
+        args.input, args.output,
+        method=args.method,
+        calculator=calculator,
+        output_format=args.format,
+        partition_by=args.partition_by,
+        chunk_size=args.chunk_size,
+        n_jobs=args.jobs or None
+    )
+    print(f"Righe valutate: {stats['rows']:,} in {stats['elapsed_seconds']}s "
+          f"({stats['rows_per_second']:,.0f} righe/s) -> {stats['output']}")
+
+
 if __name__ == "__main__":
-    run_demo()
\ No newline at end of file
+    main()
\ No newline at end of file
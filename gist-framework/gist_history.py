@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+GIST Calculation History
+========================
+
+Storia dei calcoli GIST in formato colonnare: array NumPy preallocati,
+capacità massima in memoria con eviction dei record più vecchi e
+riversamento opzionale su disco (Parquet o SQLite).
+
+Author: GIST Framework Research
+License: MIT
+Version: 1.0
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Sequence, Union, Iterator
+from datetime import datetime
+import glob
+import os
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+TimeBound = Optional[Union[str, datetime, np.datetime64, pd.Timestamp]]
+
+
+class CalculationHistory:
+    """
+    Storia append-only dei calcoli GIST con memoria limitata.
+
+    I record sono mantenuti in una finestra contigua di array preallocati
+    (dimensione 2 * capacity): quando la finestra raggiunge la fine degli
+    array viene compattata all'inizio, con costo ammortizzato O(1) per
+    inserimento. Così la finestra attiva è sempre una vista contigua e
+    l'estrazione del summary non richiede copie.
+
+    I timestamp in memoria sono mantenuti non decrescenti, perché il
+    filtro temporale di summary() è una ricerca binaria: un record con
+    timestamp precedente all'ultimo (orologio di sistema che torna indietro
+    al cambio dell'ora legale o per una correzione NTP) è registrato con il
+    timestamp dell'ultimo record.
+    """
+
+    METHODS = ('sum', 'prod')
+
+    SPILL_FORMATS = ('parquet', 'sqlite')
+
+    def __init__(self,
+                 components: Sequence[str],
+                 maturity_labels: Sequence[str],
+                 capacity: int = 10000,
+                 spill_path: Optional[str] = None,
+                 spill_format: Optional[str] = None,
+                 spill_block: Optional[int] = None):
+        """
+        Inizializza la storia colonnare.
+
+        Args:
+            components: Nomi delle componenti GIST, in ordine
+            maturity_labels: Etichette dei livelli di maturità
+            capacity: Numero massimo di record mantenuti in memoria
+            spill_path: Directory (Parquet) o file (SQLite) per i record evicti;
+                se None i record più vecchi vengono scartati
+            spill_format: 'parquet' o 'sqlite' (default dedotto da spill_path)
+            spill_block: Record riversati su disco per ogni eviction
+                (default capacity // 10)
+
+        Raises:
+            ValueError: Se parametri non validi
+        """
+        if capacity < 1:
+            raise ValueError(f"Capacità non valida: {capacity}")
+
+        if spill_path is not None and spill_format is None:
+            spill_format = 'sqlite' if spill_path.endswith(('.db', '.sqlite')) else 'parquet'
+        if spill_format is not None and spill_format not in self.SPILL_FORMATS:
+            raise ValueError(f"Formato di spill non supportato: {spill_format}")
+
+        self.components = list(components)
+        self.maturity_labels = list(maturity_labels)
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.spill_format = spill_format if spill_path is not None else None
+        self.spill_block = max(1, spill_block or capacity // 10) if spill_path else 1
+
+        self._maturity_codes = {label: i for i, label in enumerate(self.maturity_labels)}
+        self._method_codes = {method: i for i, method in enumerate(self.METHODS)}
+
+        self._allocate()
+
+        self._lo = 0
+        self._hi = 0
+        self._last_timestamp = None
+        self.total_appended = 0
+        self.total_spilled = 0
+        self._spill_parts = (
+            len(glob.glob(os.path.join(spill_path, 'part-*.parquet')))
+            if self.spill_format == 'parquet' else 0
+        )
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.summary().to_dict('records'))
+
+    def append(self, result) -> None:
+        """
+        Aggiunge un risultato GIST alla storia.
+
+        Args:
+            result: GISTResult (o dizionario con le stesse chiavi)
+        """
+        timestamp = getattr(result, 'created_at', None) or result['timestamp']
+        timestamp = np.datetime64(timestamp, 'us')
+        if self._last_timestamp is not None and timestamp < self._last_timestamp:
+            logger.debug(f"Timestamp {timestamp} precede {self._last_timestamp}: allineato")
+            timestamp = self._last_timestamp
+
+        if self._hi - self._lo == self.capacity:
+            self._evict()
+        if self._hi == len(self._scores):
+            self._compact()
+
+        i = self._hi
+        self._timestamps[i] = timestamp
+        self._scores[i] = result['score']
+        self._methods[i] = self._method_codes[result['method']]
+        self._maturity[i] = self._maturity_codes[result['maturity_level']]
+        components = result['components']
+        for j, name in enumerate(self.components):
+            self._components[i, j] = components[name]
+
+        self._hi += 1
+        self._last_timestamp = timestamp
+        self.total_appended += 1
+
+    def clear(self) -> None:
+        """Svuota la storia in memoria (i record già riversati restano su disco)."""
+        # La finestra riparte dalla posizione corrente: i summary già
+        # restituiti non vengono sovrascritti
+        self._lo = self._hi
+
+    def summary(self, start: TimeBound = None, end: TimeBound = None,
+                include_spilled: bool = False) -> pd.DataFrame:
+        """
+        Ritorna il summary dei calcoli, opzionalmente filtrato per intervallo.
+
+        I timestamp sono monotoni (garantiti da append()): il filtro
+        temporale è una ricerca binaria. Le colonne sono viste in sola
+        lettura sulla finestra in memoria, senza copie: append() scrive solo
+        oltre la finestra e _compact() la sposta su nuovi array, quindi un
+        summary già restituito non viene mai modificato.
+
+        Args:
+            start: Estremo inferiore incluso (None = nessun limite)
+            end: Estremo superiore escluso (None = nessun limite)
+            include_spilled: Se True, include i record riversati su disco
+
+        Returns:
+            DataFrame con Timestamp, Score, Method, Maturity e componenti
+        """
+        lo, hi = self._lo, self._hi
+        timestamps = self._timestamps[lo:hi]
+        if start is not None:
+            lo += int(np.searchsorted(timestamps, np.datetime64(pd.Timestamp(start), 'us'), side='left'))
+        if end is not None:
+            hi = self._lo + int(np.searchsorted(timestamps, np.datetime64(pd.Timestamp(end), 'us'), side='left'))
+        df = self._frame(lo, max(lo, hi))
+
+        if include_spilled:
+            spilled = self.load_spilled(start, end)
+            df = pd.concat([spilled, df], ignore_index=True)
+
+        return df
+
+    def load_spilled(self, start: TimeBound = None, end: TimeBound = None) -> pd.DataFrame:
+        """
+        Carica i record riversati su disco nell'intervallo richiesto.
+
+        Returns:
+            DataFrame con lo stesso schema di summary()
+        """
+        if self.spill_path is None or not os.path.exists(self.spill_path):
+            return self.summary().iloc[0:0]
+
+        if self.spill_format == 'sqlite':
+            query = "SELECT * FROM gist_history"
+            clauses, params = [], []
+            if start is not None:
+                clauses.append("Timestamp >= ?")
+                params.append(pd.Timestamp(start).isoformat())
+            if end is not None:
+                clauses.append("Timestamp < ?")
+                params.append(pd.Timestamp(end).isoformat())
+            if clauses:
+                query += " WHERE " + " AND ".join(clauses)
+            query += " ORDER BY Timestamp"
+            with sqlite3.connect(self.spill_path) as conn:
+                df = pd.read_sql_query(query, conn, params=params)
+            df['Timestamp'] = pd.to_datetime(df['Timestamp']).astype('datetime64[us]')
+        else:
+            filters = []
+            if start is not None:
+                filters.append(('Timestamp', '>=', pd.Timestamp(start)))
+            if end is not None:
+                filters.append(('Timestamp', '<', pd.Timestamp(end)))
+            df = pd.read_parquet(self.spill_path, filters=filters or None)
+            df = df.sort_values('Timestamp', kind='stable').reset_index(drop=True)
+
+        df['Method'] = pd.Categorical(df['Method'], categories=list(self.METHODS))
+        df['Maturity'] = pd.Categorical(df['Maturity'], categories=self.maturity_labels)
+        return df
+
+    def _frame(self, lo: int, hi: int) -> pd.DataFrame:
+        """DataFrame di viste in sola lettura sulle righe [lo, hi) degli array."""
+        def view(array):
+            array = array[lo:hi]
+            array.flags.writeable = False
+            return array
+
+        columns = {
+            'Timestamp': view(self._timestamps),
+            'Score': view(self._scores),
+            'Method': pd.Categorical.from_codes(view(self._methods),
+                                                categories=list(self.METHODS)),
+            'Maturity': pd.Categorical.from_codes(view(self._maturity),
+                                                  categories=self.maturity_labels),
+        }
+        components = view(self._components)
+        for j, name in enumerate(self.components):
+            columns[name.capitalize()] = components[:, j]
+        return pd.DataFrame(columns, copy=False)
+
+    def _allocate(self) -> None:
+        """Alloca array vuoti di dimensione 2 * capacity."""
+        size = 2 * self.capacity
+        self._timestamps = np.empty(size, dtype='datetime64[us]')
+        self._scores = np.empty(size, dtype=np.float64)
+        self._methods = np.empty(size, dtype=np.uint8)
+        self._maturity = np.empty(size, dtype=np.uint8)
+        self._components = np.empty((size, len(self.components)), dtype=np.float64)
+
+    def _evict(self) -> None:
+        """Rimuove i record più vecchi, riversandoli su disco se configurato."""
+        n_evict = min(self.spill_block, self._hi - self._lo)
+        if self.spill_path is not None:
+            self._spill(self._frame(self._lo, self._lo + n_evict))
+            self.total_spilled += n_evict
+        self._lo += n_evict
+
+    def _compact(self) -> None:
+        """
+        Copia la finestra attiva all'inizio di nuovi array preallocati.
+
+        Gli array precedenti non vengono più scritti e restano validi per
+        i summary già restituiti.
+        """
+        old = (self._timestamps, self._scores, self._methods,
+               self._maturity, self._components)
+        lo, hi = self._lo, self._hi
+        n = hi - lo
+        self._allocate()
+        for array, previous in zip((self._timestamps, self._scores, self._methods,
+                                    self._maturity, self._components), old):
+            array[:n] = previous[lo:hi]
+        self._lo = 0
+        self._hi = n
+
+    def _spill(self, block: pd.DataFrame) -> None:
+        """Scrive un blocco di record evicti sul backend configurato."""
+        block = block.astype({'Method': str, 'Maturity': str})
+
+        if self.spill_format == 'sqlite':
+            block = block.assign(Timestamp=block['Timestamp'].map(pd.Timestamp.isoformat))
+            with sqlite3.connect(self.spill_path) as conn:
+                block.to_sql('gist_history', conn, if_exists='append', index=False)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_gist_history_ts ON gist_history (Timestamp)"
+                )
+        else:
+            os.makedirs(self.spill_path, exist_ok=True)
+            part = os.path.join(self.spill_path, f"part-{self._spill_parts:06d}.parquet")
+            block.to_parquet(part, index=False)
+            self._spill_parts += 1
+
+        logger.debug(f"Riversati {len(block)} record di storia su {self.spill_path}")
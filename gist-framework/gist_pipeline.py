@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+GIST Scoring Pipeline
+=====================
+
+Pipeline in streaming file-to-file per lo scoring di export di assessment
+(una riga per punto vendita per ciclo di valutazione) in formato CSV o
+Parquet. L'input è letto a blocchi, ogni blocco è valutato con il kernel
+vettoriale di GISTCalculator, eventualmente su un pool di processi, e i
+risultati sono scritti in ordine su NDJSON o Parquet partizionato.
+
+La memoria è limitata dalla dimensione del blocco per il numero di
+blocchi in volo, indipendentemente dalla dimensione del file.
+
+Author: GIST Framework Research
+License: MIT
+Version: 1.0
+"""
+
+import pandas as pd
+from typing import Dict, Iterator, List, Optional, Literal
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import os
+import time
+import logging
+
+from gist_calculator import GISTCalculator
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ('ndjson', 'parquet')
+
+
+def read_chunks(input_path: str, chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+    """
+    Legge un file CSV o Parquet a blocchi.
+
+    Args:
+        input_path: File .csv (anche compresso) o .parquet
+        chunk_size: Righe per blocco
+
+    Yields:
+        DataFrame di al più chunk_size righe
+    """
+    if input_path.endswith(('.parquet', '.pq')):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(input_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size)
+
+
+def _score_chunk(task: Dict) -> pd.DataFrame:
+    """Valuta un blocco di assessment (eseguita nei worker)."""
+    calculator = GISTCalculator(history_capacity=1)
+    calculator.WEIGHTS = task['weights']
+    calculator.GAMMA = task['gamma']
+
+    chunk = task['chunk']
+    scored = calculator.calculate_scores_batch(chunk, method=task['method'])
+    passthrough = chunk.drop(columns=list(calculator.WEIGHTS.keys()))
+    return pd.concat([passthrough, scored], axis=1)
+
+
+class _ResultWriter:
+    """Scrittura ordinata dei blocchi valutati su NDJSON o Parquet."""
+
+    def __init__(self, output_path: str, output_format: str,
+                 partition_by: Optional[List[str]] = None):
+        self.output_path = output_path
+        self.output_format = output_format
+        self.partition_by = partition_by or []
+        self.parts = 0
+
+        if output_format == 'ndjson':
+            if self.partition_by:
+                raise ValueError("Il partizionamento è supportato solo per l'output Parquet")
+            self._handle = open(output_path, 'w')
+        else:
+            os.makedirs(output_path, exist_ok=True)
+            self._handle = None
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self.output_format == 'ndjson':
+            text = frame.to_json(orient='records', lines=True, date_format='iso')
+            if text:
+                self._handle.write(text if text.endswith('\n') else text + '\n')
+        elif self.partition_by:
+            for keys, group in frame.groupby(self.partition_by, sort=False, observed=True):
+                keys = keys if isinstance(keys, tuple) else (keys,)
+                directory = os.path.join(self.output_path, *[
+                    f"{column}={value}" for column, value in zip(self.partition_by, keys)
+                ])
+                os.makedirs(directory, exist_ok=True)
+                group.drop(columns=self.partition_by).to_parquet(
+                    os.path.join(directory, f"part-{self.parts:06d}.parquet"), index=False
+                )
+        else:
+            frame.to_parquet(
+                os.path.join(self.output_path, f"part-{self.parts:06d}.parquet"), index=False
+            )
+        self.parts += 1
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+
+
+def score_file(input_path: str,
+               output_path: str,
+               method: Literal['sum', 'prod'] = 'sum',
+               calculator: Optional[GISTCalculator] = None,
+               output_format: Optional[str] = None,
+               partition_by: Optional[List[str]] = None,
+               chunk_size: int = 100000,
+               n_jobs: Optional[int] = 1,
+               max_in_flight: Optional[int] = None) -> Dict:
+    """
+    Valuta un export di assessment scrivendo i risultati in streaming.
+
+    Args:
+        input_path: File CSV o Parquet con colonne physical/architectural/
+            security/compliance (le altre colonne sono riportate in output)
+        output_path: File NDJSON o directory Parquet di destinazione
+        method: 'sum' per sommatoria, 'prod' per produttoria
+        calculator: Calcolatore con pesi/gamma da usare (default standard)
+        output_format: 'ndjson' o 'parquet' (default dedotto da output_path)
+        partition_by: Colonne di partizionamento dell'output Parquet
+        chunk_size: Righe per blocco
+        n_jobs: Processi di scoring (1 = nel processo corrente, None = tutti i core)
+        max_in_flight: Blocchi in elaborazione contemporanea (default 2 * worker)
+
+    Returns:
+        Statistiche di esecuzione (righe, blocchi, durata, throughput)
+
+    Raises:
+        ValueError: Se formato non supportato o input non validi
+    """
+    if output_format is None:
+        output_format = 'ndjson' if output_path.endswith(('.ndjson', '.jsonl')) else 'parquet'
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Formato di output non supportato: {output_format}")
+
+    calculator = calculator or GISTCalculator()
+    template = {'method': method, 'weights': dict(calculator.WEIGHTS), 'gamma': calculator.GAMMA}
+
+    start = time.perf_counter()
+    writer = _ResultWriter(output_path, output_format, partition_by)
+    n_rows = 0
+    try:
+        if n_jobs == 1:
+            for chunk in read_chunks(input_path, chunk_size):
+                result = _score_chunk(dict(template, chunk=chunk))
+                writer.write(result)
+                n_rows += len(result)
+        else:
+            workers = n_jobs or os.cpu_count() or 1
+            window = max_in_flight or 2 * workers
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in read_chunks(input_path, chunk_size):
+                    pending.append(pool.submit(_score_chunk, dict(template, chunk=chunk)))
+                    # Scrittura in ordine di lettura; la finestra limita la memoria
+                    while len(pending) >= window:
+                        result = pending.popleft().result()
+                        writer.write(result)
+                        n_rows += len(result)
+                while pending:
+                    result = pending.popleft().result()
+                    writer.write(result)
+                    n_rows += len(result)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'input': input_path,
+        'output': output_path,
+        'format': output_format,
+        'rows': n_rows,
+        'chunks': writer.parts,
+        'elapsed_seconds': round(elapsed, 2),
+        'rows_per_second': round(n_rows / elapsed, 1) if elapsed > 0 else 0.0
+    }
+    logger.info(f"Scoring completato: {n_rows:,} righe in {elapsed:.1f}s -> {output_path}")
+    return stats
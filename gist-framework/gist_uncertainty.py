@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+GIST Uncertainty Propagation
+============================
+
+Propagazione dell'incertezza dai punteggi delle componenti al GIST Score.
+
+Gli auditor forniscono spesso intervalli (es. security 45-55) invece di
+valori puntuali: ogni componente può essere descritta da una
+distribuzione (intervallo, triangolare, normale o campioni empirici).
+La propagazione avviene per campionamento vettoriale oppure, per la
+formula standard, con il metodo delta (approssimazione analitica al
+secondo ordine per la media e al primo ordine per la varianza).
+
+Author: GIST Framework Research
+License: MIT
+Version: 1.0
+"""
+
+import numpy as np
+import pandas as pd
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, Literal, Optional, Sequence, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ComponentDistribution(ABC):
+    """Distribuzione di un punteggio di componente sul range [0, 100]."""
+
+    @abstractmethod
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Estrae size campioni del punteggio"""
+
+    @property
+    @abstractmethod
+    def mean(self) -> float:
+        """Valore atteso del punteggio"""
+
+    @property
+    @abstractmethod
+    def variance(self) -> float:
+        """Varianza del punteggio"""
+
+    def _check_range(self, *values: float):
+        for value in values:
+            if not 0 <= value <= 100:
+                raise ValueError(f"Parametro {value} fuori range [0,100] in {self}")
+
+
+@dataclass(frozen=True)
+class Interval(ComponentDistribution):
+    """Punteggio uniforme nell'intervallo [low, high]."""
+    low: float
+    high: float
+
+    def __post_init__(self):
+        self._check_range(self.low, self.high)
+        if self.low > self.high:
+            raise ValueError(f"Intervallo non valido: {self}")
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.uniform(self.low, self.high, size)
+
+    @property
+    def mean(self) -> float:
+        return (self.low + self.high) / 2
+
+    @property
+    def variance(self) -> float:
+        return (self.high - self.low) ** 2 / 12
+
+
+@dataclass(frozen=True)
+class Triangular(ComponentDistribution):
+    """Distribuzione triangolare (minimo, moda, massimo)."""
+    low: float
+    mode: float
+    high: float
+
+    def __post_init__(self):
+        self._check_range(self.low, self.mode, self.high)
+        if not self.low <= self.mode <= self.high:
+            raise ValueError(f"Distribuzione triangolare non valida: {self}")
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.low == self.high:
+            return np.full(size, float(self.low))
+        return rng.triangular(self.low, self.mode, self.high, size)
+
+    @property
+    def mean(self) -> float:
+        return (self.low + self.mode + self.high) / 3
+
+    @property
+    def variance(self) -> float:
+        a, c, b = self.low, self.mode, self.high
+        return (a * a + b * b + c * c - a * b - a * c - b * c) / 18
+
+
+@dataclass(frozen=True)
+class Normal(ComponentDistribution):
+    """Distribuzione normale, troncata per clipping al range [0, 100]."""
+    mu: float
+    sigma: float
+
+    def __post_init__(self):
+        self._check_range(self.mu)
+        if self.sigma < 0:
+            raise ValueError(f"Deviazione standard negativa: {self}")
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return np.clip(rng.normal(self.mu, self.sigma, size), 0, 100)
+
+    @property
+    def mean(self) -> float:
+        return self.mu
+
+    @property
+    def variance(self) -> float:
+        return self.sigma ** 2
+
+
+@dataclass(frozen=True, eq=False)
+class Empirical(ComponentDistribution):
+    """Campioni empirici (es. valutazioni di più auditor), ricampionati."""
+    samples: np.ndarray = field(repr=False)
+
+    def __post_init__(self):
+        values = np.asarray(self.samples, dtype=float)
+        if values.ndim != 1 or len(values) == 0:
+            raise ValueError("Servono campioni empirici monodimensionali non vuoti")
+        if values.min() < 0 or values.max() > 100:
+            raise ValueError("Campioni empirici fuori range [0,100]")
+        object.__setattr__(self, 'samples', values)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.choice(self.samples, size)
+
+    @property
+    def mean(self) -> float:
+        return float(self.samples.mean())
+
+    @property
+    def variance(self) -> float:
+        return float(self.samples.var())
+
+
+ComponentInput = Union[float, ComponentDistribution]
+
+
+def is_uncertain(scores: Dict[str, ComponentInput]) -> bool:
+    """True se almeno una componente è una distribuzione."""
+    return any(isinstance(v, ComponentDistribution) for v in scores.values())
+
+
+def propagate_uncertainty(calculator,
+                          fleet: Sequence[Dict[str, ComponentInput]],
+                          method: Literal['sum', 'prod'] = 'sum',
+                          mode: Literal['sampling', 'delta'] = 'sampling',
+                          n_samples: int = 2000,
+                          interval: float = 0.90,
+                          seed: Optional[int] = None) -> pd.DataFrame:
+    """
+    Propaga l'incertezza delle componenti al GIST Score per più organizzazioni.
+
+    Args:
+        calculator: GISTCalculator con pesi, gamma e livelli di maturità
+        fleet: Per organizzazione, dizionario componente -> valore o distribuzione
+        method: 'sum' per sommatoria, 'prod' per produttoria
+        mode: 'sampling' (Monte Carlo) o 'delta' (analitico, solo 'sum')
+        n_samples: Campioni per organizzazione in modalità 'sampling'
+        interval: Probabilità centrale degli intervalli riportati
+        seed: Seme per la riproducibilità
+
+    Returns:
+        DataFrame con media, deviazione standard e intervallo dello score,
+        probabilità dei livelli di maturità e intervalli delle metriche derivate
+
+    Raises:
+        ValueError: Se input non validi o modalità non supportata
+    """
+    if method not in ('sum', 'prod'):
+        raise ValueError(f"Metodo non supportato: {method}")
+    if mode not in ('sampling', 'delta'):
+        raise ValueError(f"Modalità non supportata: {mode}")
+    if mode == 'delta' and method != 'sum':
+        raise ValueError("Il metodo delta è disponibile solo per la formula 'sum'")
+    if not 0 < interval < 1:
+        raise ValueError(f"Intervallo di probabilità non valido: {interval}")
+
+    components = list(calculator.WEIGHTS.keys())
+    for scores in fleet:
+        point = {k: v.mean if isinstance(v, ComponentDistribution) else v
+                 for k, v in scores.items()}
+        calculator._validate_inputs(point)
+
+    q_low, q_high = (1 - interval) / 2, (1 + interval) / 2
+    labels = [level[2] for level in calculator.MATURITY_LEVELS]
+    edges = np.array([level[0] for level in calculator.MATURITY_LEVELS[1:]], dtype=float)
+
+    if mode == 'sampling':
+        columns = _propagate_sampling(calculator, fleet, components, method,
+                                      n_samples, q_low, q_high, labels, edges, seed)
+    else:
+        columns = _propagate_delta(calculator, fleet, components,
+                                   q_low, q_high, labels, edges)
+    return pd.DataFrame(columns)
+
+
+def _propagate_sampling(calculator, fleet, components, method, n_samples,
+                        q_low, q_high, labels, edges, seed) -> Dict:
+    """Propagazione Monte Carlo vettoriale su tutta la flotta."""
+    rng = np.random.default_rng(seed)
+    samples = np.empty((len(fleet), n_samples, len(components)))
+    for i, scores in enumerate(fleet):
+        for j, component in enumerate(components):
+            value = scores[component]
+            if isinstance(value, ComponentDistribution):
+                samples[i, :, j] = value.sample(rng, n_samples)
+            else:
+                samples[i, :, j] = value
+
+    flat = samples.reshape(-1, len(components))
+    scores = calculator._score_matrix(flat, method).reshape(len(fleet), n_samples)
+
+    columns = {
+        'score_mean': scores.mean(axis=1),
+        'score_std': scores.std(axis=1),
+    }
+    low, median, high = np.quantile(scores, [q_low, 0.5, q_high], axis=1)
+    columns.update({'score_low': low, 'score_median': median, 'score_high': high})
+
+    codes = np.searchsorted(edges, scores, side='right')
+    for code, label in enumerate(labels):
+        columns[f'p_{label}'] = (codes == code).mean(axis=1)
+
+    derived = calculator._derived_metrics_arrays(
+        samples[:, :, components.index('compliance')],
+        samples[:, :, components.index('security')],
+        scores
+    )
+    for name, values in derived.items():
+        low, high = np.quantile(values, [q_low, q_high], axis=1)
+        columns[f'{name}_low'] = low
+        columns[f'{name}_high'] = high
+    return columns
+
+
+def _propagate_delta(calculator, fleet, components, q_low, q_high, labels, edges) -> Dict:
+    """Metodo delta per la formula standard, con approssimazione normale."""
+    from scipy import stats
+
+    means = np.array([[_moments(s[k])[0] for k in components] for s in fleet])
+    variances = np.array([[_moments(s[k])[1] for k in components] for s in fleet])
+    weights = np.array(list(calculator.WEIGHTS.values()))
+    gamma = calculator.GAMMA
+
+    # Derivate di w * s^gamma valutate nella media (clip per evitare 0^(gamma-2))
+    mu = np.maximum(means, 1e-6)
+    first = weights * gamma * mu ** (gamma - 1)
+    second = weights * gamma * (gamma - 1) * mu ** (gamma - 2)
+
+    score_mean = calculator._score_matrix(means, 'sum') + 0.5 * (second * variances).sum(axis=1)
+    score_std = np.sqrt((first ** 2 * variances).sum(axis=1))
+
+    z_low, z_high = stats.norm.ppf([q_low, q_high])
+    columns = {
+        'score_mean': score_mean,
+        'score_std': score_std,
+        'score_low': score_mean + z_low * score_std,
+        'score_median': score_mean,
+        'score_high': score_mean + z_high * score_std,
+    }
+
+    bounds = np.concatenate([[-np.inf], edges, [np.inf]])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cdf = stats.norm.cdf((bounds[None, :] - score_mean[:, None]) / score_std[:, None])
+    # Organizzazioni senza incertezza: distribuzione degenere sullo score
+    point = score_std == 0
+    cdf[point] = (bounds[None, :] <= score_mean[point, None]).astype(float)
+    for code, label in enumerate(labels):
+        columns[f'p_{label}'] = cdf[:, code + 1] - cdf[:, code]
+
+    # Le metriche derivate sono monotone: intervalli dalle trasformate degli estremi
+    def component_bounds(name):
+        j = components.index(name)
+        std = np.sqrt(variances[:, j])
+        return (np.clip(means[:, j] + z_low * std, 0, 100),
+                np.clip(means[:, j] + z_high * std, 0, 100))
+
+    compliance = component_bounds('compliance')
+    security = component_bounds('security')
+    at_low = calculator._derived_metrics_arrays(compliance[0], security[0], columns['score_low'])
+    at_high = calculator._derived_metrics_arrays(compliance[1], security[1], columns['score_high'])
+    for name in at_low:
+        columns[f'{name}_low'] = np.minimum(at_low[name], at_high[name])
+        columns[f'{name}_high'] = np.maximum(at_low[name], at_high[name])
+    return columns
+
+
+def _moments(value: ComponentInput):
+    """Media e varianza di un valore puntuale o di una distribuzione."""
+    if isinstance(value, ComponentDistribution):
+        return value.mean, value.variance
+    return float(value), 0.0
@@ -32,6 +32,28 @@ setup(
         "Source Code": "https://github.com/your-org/gist-framework",
     },
     packages=find_packages(),
+    # Moduli di primo livello (senza package): richiesti dagli entry point
+    py_modules=[
+        "gist_calculator",
+        "gist_history",
+        "gist_uncertainty",
+        "gist_pipeline",
+        "gist_sensitivity",
+        "gist_planner",
+        "gist_benchmark",
+        "gist_calibration",
+        "assa_gdo_calculator",
+        "assa_sparse",
+        "assa_graph",
+        "assa_incremental",
+        "assa_mitigation",
+        "assa_percolation",
+        "assa_attack_graph",
+        "assa_services",
+        "assa_segmentation",
+        "assa_fleet",
+        "gdo_digital_twin",
+    ],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Information Technology",
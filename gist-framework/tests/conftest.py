@@ -0,0 +1,10 @@
+"""
+Configurazione pytest: i moduli del framework sono file di primo livello
+(senza package), quindi la directory del progetto va resa importabile
+anche quando i test sono lanciati con `pytest tests/`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
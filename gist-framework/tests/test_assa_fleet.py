@@ -0,0 +1,33 @@
+"""
+Test della valutazione ASSA di flotta (FleetEvaluator)
+"""
+
+import pytest
+
+from assa_fleet import CHECKPOINT_SUFFIX, FleetEvaluator
+from assa_gdo_calculator import create_sample_infrastructure
+from assa_graph import CompactInfrastructure
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    infrastructure = CompactInfrastructure.from_networkx(create_sample_infrastructure())
+    paths = [infrastructure.save(str(tmp_path / f'org_{k}.npz')) for k in range(3)]
+    return [{'path': path, 'org_factor': 1.0 + 0.1 * k} for k, path in enumerate(paths)]
+
+
+def test_resume_refuses_checkpoint_with_different_options(manifest, tmp_path):
+    output = str(tmp_path / 'fleet.csv')
+    report = FleetEvaluator(manifest, budget=20000).run(output, keep_checkpoint=True)
+    assert (report['status'] == 'ok').all()
+    assert (report['mitigation_count'] > 0).all()
+
+    with pytest.raises(ValueError):
+        FleetEvaluator(manifest, budget=5000).run(output)
+
+    resumed = FleetEvaluator(manifest, budget=20000).run(output)
+    assert resumed.drop(columns='elapsed_seconds').equals(report.drop(columns='elapsed_seconds'))
+    assert not (tmp_path / ('fleet.csv' + CHECKPOINT_SUFFIX)).exists()
+
+    fresh = FleetEvaluator(manifest, budget=5000).run(output, resume=False)
+    assert (fresh['mitigation_cost'] <= 5000).all()
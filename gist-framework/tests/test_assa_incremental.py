@@ -0,0 +1,52 @@
+"""
+Test del mantenimento incrementale ASSA-GDO (IncrementalASSA)
+"""
+
+import pytest
+
+from assa_gdo_calculator import ASSA_GDO, Node, create_sample_infrastructure
+from assa_incremental import IncrementalASSA
+
+
+def test_incremental_total_matches_full_recalculation():
+    G = create_sample_infrastructure()
+    state = IncrementalASSA(G)
+
+    hub = Node('switch_edge', 'network', 6.8, 0.6, {'admin': 0.5}, ['routing'])
+    changes = [
+        {'operation': 'add_node', 'node': hub,
+         'edges': {'pos_001': 0.5, 'pos_002': 0.5, 'iot_sensor_1': 0.2, 'network_core': 0.9}},
+        {'operation': 'update_node', 'node': 'pos_001', 'cvss_score': 3.1},
+        {'operation': 'set_edge', 'u': 'pos_002', 'v': 'server_main', 'propagation_prob': 0.25},
+        {'operation': 'set_edge', 'u': 'pos_001', 'v': 'network_core', 'propagation_prob': 0.15},
+        {'operation': 'remove_edge', 'u': 'server_main', 'v': 'db_primary'},
+        {'operation': 'remove_node', 'node': 'network_core'},
+        {'operation': 'set_edge', 'u': 'iot_sensor_2', 'v': 'switch_edge'},
+        {'operation': 'update_node', 'node': 'switch_edge', 'exposure': 0.9},
+    ]
+    assert state.apply_stream(changes) == len(changes)
+
+    incremental_total = state.total
+    expected_total, expected_scores = ASSA_GDO(G).calculate_assa()
+    assert incremental_total == pytest.approx(expected_total, rel=1e-12)
+    assert state.rebuild() == pytest.approx(0.0, abs=1e-12)
+    assert state.total == pytest.approx(expected_total, rel=1e-12)
+
+    _, scores = state.calculate_assa()
+    assert scores.keys() == expected_scores.keys()
+    for node_id, score in expected_scores.items():
+        assert scores[node_id] == pytest.approx(score, rel=1e-12)
+
+
+def test_removed_node_slots_are_reused():
+    G = create_sample_infrastructure()
+    state = IncrementalASSA(G)
+    n_slots = len(state._ids)
+
+    for k in range(50):
+        node = Node(f'pos_tmp_{k}', 'pos', 5.0, 0.7, {'user': 0.3}, ['payment'])
+        state.add_node(node, {'network_core': 0.6, 'pos_001': 0.2})
+        state.remove_node(node.id)
+
+    assert len(state._ids) == n_slots + 1
+    assert state.total == pytest.approx(ASSA_GDO(G).calculate_assa()[0], rel=1e-12)
@@ -0,0 +1,70 @@
+"""
+Test del calcolatore GIST (GISTCalculator)
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from gist_calculator import GISTCalculator
+from gist_calibration import GISTCalibrator
+from gist_uncertainty import Interval, Triangular
+
+
+def _profile(tmp_path, gamma):
+    profile = {
+        'schema_version': 1,
+        'version': 'test',
+        'weights': dict(GISTCalculator.WEIGHTS),
+        'gamma': gamma
+    }
+    filename = tmp_path / 'profile.json'
+    filename.write_text(json.dumps(profile))
+    return str(filename)
+
+
+@pytest.mark.parametrize('gamma', [0.0, 1.0, 1.3])
+def test_load_calibration_rejects_non_concave_gamma(tmp_path, gamma):
+    calculator = GISTCalculator()
+    with pytest.raises(ValueError):
+        calculator.load_calibration(_profile(tmp_path, gamma))
+    assert calculator.GAMMA == GISTCalculator.GAMMA
+
+
+def test_calibrator_rejects_gamma_bounds_above_max():
+    with pytest.raises(ValueError):
+        GISTCalibrator(gamma_bounds=(0.5, 1.5))
+    assert GISTCalibrator().gamma_bounds[1] < 1
+
+
+@pytest.mark.parametrize('method', ['sum', 'prod'])
+def test_batch_matches_scalar_path(method):
+    calculator = GISTCalculator()
+    components = list(calculator.WEIGHTS)
+    rng = np.random.default_rng(1)
+    matrix = np.round(rng.uniform(0, 100, (2000, len(components))), 1)
+    matrix[:10] = rng.integers(0, 101, (10, len(components)))
+
+    batch = calculator.calculate_scores_batch(matrix, method)
+    for i, row in enumerate(matrix):
+        result = calculator.calculate_score(dict(zip(components, row.tolist())), method,
+                                            save_history=False)
+        expected = batch.iloc[i]
+        assert result['score'] == expected['score']
+        assert result['maturity_level'] == expected['maturity_level']
+        assert result['components'] == {k: expected[k] for k in components}
+        assert result['derived_metrics'] == {k: expected[k] for k in result['derived_metrics']}
+
+
+def test_calculate_score_forwards_uncertainty_options():
+    calculator = GISTCalculator()
+    scores = {'physical': Interval(60, 80), 'architectural': 70,
+              'security': Triangular(40, 50, 65), 'compliance': 75}
+
+    result = calculator.calculate_score(scores, n_samples=5000, seed=3)
+    expected = calculator.calculate_score_uncertain(scores, n_samples=5000, seed=3)
+    result.pop('timestamp'), expected.pop('timestamp')
+    assert result == expected
+    assert calculator.calculate_score(scores, mode='delta')['mode'] == 'delta'
+    assert len(calculator.history) == 0
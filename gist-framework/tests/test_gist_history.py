@@ -0,0 +1,66 @@
+"""
+Test della storia colonnare dei calcoli GIST (CalculationHistory)
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from gist_history import CalculationHistory
+
+START = datetime(2024, 1, 1)
+
+
+def _record(hour):
+    return {
+        'timestamp': START + timedelta(hours=hour),
+        'score': float(hour),
+        'method': 'sum',
+        'maturity_level': 'Iniziale',
+        'components': {'physical': hour, 'security': hour},
+    }
+
+
+def _history(**kwargs):
+    return CalculationHistory(['physical', 'security'], ['Iniziale', 'Avanzato'], **kwargs)
+
+
+def test_summary_views_survive_append_compact_and_clear():
+    history = _history(capacity=4)
+    for hour in range(3):
+        history.append(_record(hour))
+    summary = history.summary()
+    assert np.shares_memory(summary['Score'].to_numpy(), history._scores)
+
+    for hour in range(3, 30):
+        history.append(_record(hour))
+    history.clear()
+    history.append(_record(30))
+
+    assert summary['Score'].tolist() == [0.0, 1.0, 2.0]
+    assert summary['Physical'].tolist() == [0.0, 1.0, 2.0]
+    assert history.summary()['Score'].tolist() == [30.0]
+
+
+def test_append_clamps_out_of_order_timestamp():
+    # Orologio che torna indietro (ora legale, NTP): il record non è rifiutato
+    history = _history(capacity=4)
+    history.append(_record(5))
+    history.append(_record(4))
+    history.append(_record(6))
+
+    summary = history.summary()
+    assert summary['Score'].tolist() == [5.0, 4.0, 6.0]
+    assert summary['Timestamp'].is_monotonic_increasing
+    assert history.summary(start=START + timedelta(hours=5))['Score'].tolist() == [5.0, 4.0, 6.0]
+
+
+def test_spill_keeps_range_queries_complete(tmp_path):
+    history = _history(capacity=4, spill_path=str(tmp_path / 'spill'), spill_block=2)
+    for hour in range(20):
+        history.append(_record(hour))
+
+    assert history.total_spilled == 16
+    window = history.summary(start=START + timedelta(hours=5),
+                             end=START + timedelta(hours=18), include_spilled=True)
+    assert window['Score'].tolist() == [float(hour) for hour in range(5, 18)]
@@ -0,0 +1,45 @@
+"""
+Test di riproducibilità del Digital Twin al variare di worker e granularità
+"""
+
+from datetime import datetime
+
+import pytest
+
+from gdo_digital_twin import CHUNK_GRANULARITIES, GDODigitalTwin, _concat_frames
+
+SEED = 20240131
+START = datetime(2024, 1, 27)
+N_STORES = 3
+N_DAYS = 8  # a cavallo tra gennaio e febbraio
+
+
+@pytest.fixture(scope='module')
+def reference():
+    twin = GDODigitalTwin()
+    return twin.generate_demo_dataset(n_stores=N_STORES, n_days=N_DAYS, validate=False,
+                                      seed=SEED, start_date=START, n_jobs=1)
+
+
+def test_demo_dataset_independent_of_worker_count(reference):
+    twin = GDODigitalTwin()
+    parallel = twin.generate_demo_dataset(n_stores=N_STORES, n_days=N_DAYS, validate=False,
+                                          seed=SEED, start_date=START, n_jobs=2)
+
+    assert parallel['transactions'].equals(reference['transactions'])
+    assert parallel['security_events'].equals(reference['security_events'])
+    assert parallel['config'] == reference['config']
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+@pytest.mark.parametrize('granularity', CHUNK_GRANULARITIES)
+def test_iter_chunks_matches_demo_dataset(reference, granularity, n_jobs):
+    twin = GDODigitalTwin()
+    chunks = list(twin.iter_chunks(twin.store_plan(N_STORES), N_DAYS, seed=SEED,
+                                   start_date=START, granularity=granularity,
+                                   n_jobs=n_jobs))
+
+    transactions = _concat_frames([chunk.transactions for chunk in chunks])
+    security_events = _concat_frames([chunk.security_events for chunk in chunks])
+    assert transactions.equals(reference['transactions'])
+    assert security_events.equals(reference['security_events'])
@@ -0,0 +1,65 @@
+"""
+Test del formato colonnare del Digital Twin (ColumnarSink, load_dataset)
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from gdo_digital_twin import GDODigitalTwin, _concat_frames, load_dataset, store_day_rng
+
+
+def _dataset(twin, n_stores, start, n_days):
+    """Dataset minimo: n_stores store micro, n_days giorni da start."""
+    transactions, security_events = [], []
+    for store_idx in range(n_stores):
+        rng = store_day_rng(0, store_idx, 0)
+        store_id = f"store_{store_idx:04d}"
+        columns = twin.transaction_gen.generate_columns(start, n_days, 'micro', rng)
+        transactions.append(twin.transaction_gen.to_frame(columns, store_id))
+        columns = twin.security_gen.generate_columns(24 * n_days, start, rng)
+        security_events.append(twin.security_gen.to_frame(columns, store_id))
+    return {
+        'transactions': _concat_frames(transactions),
+        'security_events': _concat_frames(security_events),
+        'config': {'n_stores': n_stores, 'n_days': n_days}
+    }
+
+
+def test_save_dataset_more_than_1024_partitions(tmp_path):
+    # 520 store su due mesi: 1040 partizioni store/mese per tabella
+    twin = GDODigitalTwin()
+    dataset = _dataset(twin, 520, datetime(2024, 1, 31), 2)
+
+    directory = twin._save_dataset(dataset, prefix=str(tmp_path / 'gdo'))
+    loaded = load_dataset(directory)
+
+    for name in ('transactions', 'security_events'):
+        expected = dataset[name]
+        if 'amount' in expected:
+            expected = expected.assign(amount=expected['amount'].astype(np.float32))
+        assert loaded[name].equals(expected)
+    assert loaded['config'] == dataset['config']
+    assert len(list((tmp_path.glob('gdo_*/transactions/store_id=*/month=*')))) == 1040
+
+
+def test_load_dataset_filters(tmp_path):
+    twin = GDODigitalTwin()
+    dataset = _dataset(twin, 4, datetime(2024, 1, 30), 4)
+    directory = twin._save_dataset(dataset, prefix=str(tmp_path / 'gdo'), format='feather')
+
+    loaded = load_dataset(directory, stores=['store_0001', 'store_0003'],
+                          start='2024-01-31', end='2024-02-02')
+
+    transactions = dataset['transactions']
+    mask = (transactions['store_id'].isin(['store_0001', 'store_0003'])
+            & (transactions['timestamp'] >= '2024-01-31')
+            & (transactions['timestamp'] < '2024-02-02'))
+    expected = transactions[mask].reset_index(drop=True)
+    result = loaded['transactions']
+    assert len(result) == mask.sum() > 0
+    assert result['store_id'].astype(str).tolist() == expected['store_id'].astype(str).tolist()
+    assert result['timestamp'].equals(expected['timestamp'])